@@ -0,0 +1,164 @@
+"""
+Activation Jobs - Background Model Hot Swap
+Runs model activations in a background thread so the current model keeps
+serving while the new one loads and warms up. Job state is written to
+disk, so any gunicorn worker can answer a progress poll.
+"""
+
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ActivationJob:
+    """Progress of one model activation"""
+
+    def __init__(self, model_name: str, job_id: Optional[str] = None):
+        self.id = job_id or uuid.uuid4().hex[:12]
+        self.model_name = model_name
+        self.status = 'queued'
+        self.progress = 0.0
+        self.message = 'Waiting to start'
+        self.error = None
+        self.pid = os.getpid()
+        self.created_at = datetime.now().isoformat()
+        self.finished_at = None
+        self.done = threading.Event()
+        self._on_change = None
+
+    def update(self, status: str, progress: float, message: str):
+        """Advance the job and persist its state"""
+        self.status = status
+        self.progress = round(progress, 2)
+        self.message = message
+        logger.info(f"Activation {self.id} [{self.model_name}] {status}: {message}")
+        if self._on_change:
+            self._on_change(self)
+
+    def to_dict(self) -> Dict:
+        return {
+            'job_id': self.id,
+            'model_name': self.model_name,
+            'status': self.status,
+            'progress': self.progress,
+            'message': self.message,
+            'error': self.error,
+            'pid': self.pid,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at
+        }
+
+
+class ActivationJobManager:
+    """Runs one activation at a time and keeps job records on disk"""
+
+    def __init__(self, jobs_dir: str = "./models/activation_jobs"):
+        """
+        Initialize job manager.
+
+        Args:
+            jobs_dir: Directory for job state files (shared by all workers)
+        """
+        self.jobs_dir = Path(jobs_dir)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._running = None
+
+    def _persist(self, job: ActivationJob):
+        try:
+            self.jobs_dir.mkdir(parents=True, exist_ok=True)
+            temp_path = self.jobs_dir / f".{job.id}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(job.to_dict(), f)
+            os.replace(temp_path, self.jobs_dir / f"{job.id}.json")
+        except Exception as e:
+            logger.error(f"Error saving activation job {job.id}: {e}")
+
+    def running_job(self) -> Optional[ActivationJob]:
+        """The activation currently in progress in this worker (or None)"""
+        with self._lock:
+            if self._running is not None and not self._running.done.is_set():
+                return self._running
+            return None
+
+    def start(self, model_name: str, run: Callable[[ActivationJob], None]) -> ActivationJob:
+        """
+        Start an activation in a background thread.
+
+        Args:
+            model_name: Model to activate
+            run: Callable doing the work; reports progress via job.update()
+
+        Returns:
+            The new job
+
+        Raises:
+            RuntimeError: If another activation is still running
+        """
+        with self._lock:
+            if self._running is not None and not self._running.done.is_set():
+                raise RuntimeError(f"Activation {self._running.id} is still running")
+            job = ActivationJob(model_name)
+            job._on_change = self._persist
+            self._jobs[job.id] = job
+            self._running = job
+
+        self._persist(job)
+
+        def worker():
+            try:
+                run(job)
+                job.finished_at = datetime.now().isoformat()
+                job.update('completed', 1.0, f'Model {model_name} is serving traffic')
+            except Exception as e:
+                logger.error(f"Activation {job.id} failed: {e}", exc_info=True)
+                job.error = str(e)
+                job.finished_at = datetime.now().isoformat()
+                job.update('failed', job.progress, 'Activation failed - previous model keeps serving')
+            finally:
+                job.done.set()
+
+        threading.Thread(target=worker, name=f'activation-{job.id}', daemon=True).start()
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Get job state from this worker or from the shared job directory"""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+
+        path = self.jobs_dir / f"{os.path.basename(job_id)}.json"
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error reading activation job {job_id}: {e}")
+            return None
+
+
+# Global job manager instance
+activation_jobs = None
+
+
+def init_activation_jobs(jobs_dir: str = "./models/activation_jobs"):
+    """Initialize the global activation job manager"""
+    global activation_jobs
+    activation_jobs = ActivationJobManager(jobs_dir)
+    logger.info(f"Activation jobs initialized at {jobs_dir}")
+
+
+def get_activation_jobs() -> ActivationJobManager:
+    """Get the global activation job manager (initialize if needed)"""
+    global activation_jobs
+    if activation_jobs is None:
+        init_activation_jobs()
+    return activation_jobs
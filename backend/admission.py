@@ -0,0 +1,249 @@
+"""
+Admission Control - Load Shedding for Synthesis
+Every synthesis request gets a cost estimate (seconds of inference, from
+the cost model) before it is queued. The estimated work of all admitted, unfinished requests on
+this instance - summed over all gunicorn workers - divided by the number
+of parallel inference lanes is the wait a new request would see. If that
+wait exceeds the SLO the request is rejected right away (429 + Retry-After)
+instead of piling up in the listen backlog until a timeout kills it.
+
+Outstanding work is shared through a small memory-mapped file with one
+slot per worker process: a worker only writes its own slot, admission
+decisions sum all slots of live processes under an flock. A slot records
+the pid and start time of its process, so work of a dead worker is
+dropped even after its pid was reused. The gunicorn master empties the
+file at startup (reset_state()).
+"""
+
+import fcntl
+import logging
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_SLOT = struct.Struct('<qqqd')  # pid, process start time, requests, outstanding seconds
+MAX_SLOTS = 256
+STATE_FILE = 'admission.state'
+
+
+class Overloaded(Exception):
+    """Raised when the estimated queue wait exceeds the SLO"""
+
+    def __init__(self, estimated_wait: float, retry_after: int):
+        super().__init__(f"Estimated wait {estimated_wait:.1f}s exceeds the SLO")
+        self.estimated_wait = estimated_wait
+        self.retry_after = retry_after
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _process_start(pid: int) -> int:
+    """Start time of a process in clock ticks since boot (0 if unknown)"""
+    try:
+        with open(f'/proc/{pid}/stat', 'rb') as stat:
+            # Fields after the command name, which may contain spaces; starttime is field 22
+            return int(stat.read().rsplit(b')', 1)[1].split()[19])
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def _slot_alive(pid: int, started: int) -> bool:
+    """Whether the process that wrote a slot still runs (not another one with its pid)"""
+    if not _pid_alive(pid):
+        return False
+    return not started or _process_start(pid) in (0, started)
+
+
+def reset_state(state_path: str):
+    """Empty the shared state file. Slots left by an earlier run are stale (gunicorn on_starting)."""
+    try:
+        with open(state_path, 'r+b') as state:
+            fcntl.flock(state, fcntl.LOCK_EX)
+            state.truncate(0)
+    except FileNotFoundError:
+        pass
+
+
+class AdmissionController:
+    """Tracks outstanding work and rejects requests that could not start within the SLO"""
+
+    def __init__(self, slo_seconds: float = 10.0, capacity: int = 1, state_path: Optional[str] = None):
+        """
+        Initialize admission control. The shared state file is opened on first use.
+
+        Args:
+            slo_seconds: Longest acceptable estimated wait before inference starts (0 disables shedding)
+            capacity: Requests this instance synthesizes in parallel
+            state_path: Shared state file of all workers (default: private to the creating
+                process, in the temp directory)
+        """
+        self.slo = slo_seconds
+        self.capacity = max(1, capacity)
+        self.state_path = state_path or os.path.join(tempfile.gettempdir(),
+                                                     f'plattdeutsch-tts-admission-{os.getpid()}')
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._map = None
+        self._slot = None
+        self._pid = None
+        self._started = 0
+
+        self.admitted = 0
+        self.rejected = 0
+
+    # ------------------------------------------------------------------
+    # Shared state
+    # ------------------------------------------------------------------
+
+    def _ensure_slot(self):
+        """Open the state file and claim a slot (again after fork)"""
+        if self._map is not None and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._started = _process_start(self._pid)
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        self._file = open(self.state_path, 'a+b')
+        with self._locked():
+            if os.fstat(self._file.fileno()).st_size < MAX_SLOTS * _SLOT.size:
+                self._file.truncate(MAX_SLOTS * _SLOT.size)
+            self._map = mmap.mmap(self._file.fileno(), MAX_SLOTS * _SLOT.size)
+            self._slot = self._claim_slot()
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive access to the state file across processes"""
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def _read(self, slot: int):
+        return _SLOT.unpack_from(self._map, slot * _SLOT.size)
+
+    def _write(self, slot: int, pid: int, started: int, requests: int, outstanding: float):
+        _SLOT.pack_into(self._map, slot * _SLOT.size, pid, started, requests, outstanding)
+
+    def _claim_slot(self) -> int:
+        """Take a free slot, or one left behind by a dead process"""
+        for slot in range(MAX_SLOTS):
+            pid, started, _, _ = self._read(slot)
+            if pid == 0 or pid == self._pid or not _slot_alive(pid, started):
+                self._write(slot, self._pid, self._started, 0, 0.0)
+                return slot
+        raise RuntimeError(f"No free admission slot in {self.state_path}")
+
+    def _totals(self):
+        """(requests, outstanding seconds) of all live processes"""
+        requests, outstanding = 0, 0.0
+        for slot in range(MAX_SLOTS):
+            pid, started, slot_requests, slot_outstanding = self._read(slot)
+            if pid == 0 or not slot_requests:
+                continue
+            if pid != self._pid and not _slot_alive(pid, started):
+                # Work of a worker that died is not coming back
+                self._write(slot, 0, 0, 0, 0.0)
+                continue
+            requests += slot_requests
+            outstanding += slot_outstanding
+        return requests, outstanding
+
+    def _add(self, requests: int, seconds: float):
+        _, _, own_requests, own_outstanding = self._read(self._slot)
+        self._write(self._slot, self._pid, self._started, max(0, own_requests + requests),
+                    max(0.0, own_outstanding + seconds) if own_requests + requests > 0 else 0.0)
+
+    # ------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------
+
+    def admit(self, cost: float, force: bool = False) -> float:
+        """
+        Register a request's estimated cost as outstanding work.
+
+        Args:
+            cost: Predicted inference seconds
+            force: Admit regardless of the SLO (background work that is already accepted)
+
+        Returns:
+            The registered cost, to be passed to finish()
+
+        Raises:
+            Overloaded: If the estimated wait exceeds the SLO
+        """
+        with self._lock:
+            self._ensure_slot()
+            with self._locked():
+                _, outstanding = self._totals()
+                wait = outstanding / self.capacity
+                if not force and self.slo > 0 and wait > self.slo:
+                    self.rejected += 1
+                    # Time until the backlog has drained back to the SLO
+                    raise Overloaded(wait, max(1, math.ceil(wait - self.slo)))
+                self._add(1, cost)
+                self.admitted += 1
+        return cost
+
+    def finish(self, cost: float):
+        """
+        Remove an admitted request from the outstanding work.
+
+        Args:
+            cost: Value returned by admit()
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            with self._locked():
+                self._add(-1, -cost)
+
+    def get_stats(self) -> Dict:
+        """Instance-wide queue state and this worker's counters"""
+        with self._lock:
+            self._ensure_slot()
+            with self._locked():
+                requests, outstanding = self._totals()
+        return {
+            'queue_depth': requests,
+            'outstanding_seconds': round(outstanding, 3),
+            'estimated_wait_seconds': round(outstanding / self.capacity, 3),
+            'slo_seconds': self.slo,
+            'capacity': self.capacity,
+            'admitted': self.admitted,
+            'rejected': self.rejected
+        }
+
+
+# Global admission controller instance
+admission = None
+
+
+def init_admission(slo_seconds: float = 10.0, capacity: int = 1, **kwargs):
+    """Initialize the global admission controller"""
+    global admission
+    admission = AdmissionController(slo_seconds, capacity, **kwargs)
+    logger.info(f"Admission control initialized (slo={slo_seconds}s, capacity={capacity})")
+
+
+def get_admission() -> AdmissionController:
+    """Get the global admission controller (initialize if needed)"""
+    global admission
+    if admission is None:
+        init_admission()
+    return admission
@@ -12,16 +12,49 @@ import json
 import logging
 import tempfile
 import shutil
+import threading
+import time
 from pathlib import Path
 from io import BytesIO
 from datetime import datetime
-from functools import wraps
+from functools import partial, wraps
+from contextlib import contextmanager
 
 import numpy as np
-from flask import Flask, request, send_file, jsonify, send_from_directory
+from flask import (Flask, Response, request, send_file, jsonify, send_from_directory, stream_with_context,
+                   g, has_request_context)
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 
+from audio_cache import init_audio_cache, get_audio_cache
+from disk_cache import init_disk_cache, get_disk_cache
+from inference_scheduler import init_inference_scheduler, get_inference_scheduler
+from inference_pool import init_inference_pool, get_inference_pool
+from inference_processes import init_inference_processes, get_inference_processes, RemoteModel
+from admission import init_admission, get_admission, Overloaded, STATE_FILE as ADMISSION_STATE
+from clients import init_clients, get_clients, Client
+from cost_model import init_cost_model, get_cost_model
+from activation_jobs import init_activation_jobs, get_activation_jobs
+from model_sync import init_model_sync, get_model_sync, read_generation
+from synthesis_jobs import init_synthesis_jobs, get_synthesis_jobs, JobQueueFull
+from mp3_handler import get_mp3_handler, wav_to_pcm16, AUDIO_FORMATS
+from audio_processing import (as_float32, peak_scale, quantize, audio_to_pcm16, allocate_wav,
+                              wav_stream_header, encode_wav as encode_wav_pcm16)
+from model_manager import (write_active_pointer, read_active_pointer, clear_active_pointer,
+                           remove_legacy_active_copies)
+from model_artifacts import (slim_checkpoint, convert_to_safetensors, safetensors_available,
+                             load_safetensors_state, resolve_model_files, remove_derived_artifacts,
+                             quantization_available, quantize_vits, save_quantized_weights,
+                             load_quantized_weights, ORIGINAL_CHECKPOINT, QUANTIZED_WEIGHTS,
+                             MODEL_VARIANTS)
+from vits_inference import get_vits
+from cpu_affinity import worker_cpu_layout
+from metrics import (metrics_available, generate_metrics, stage_timer, observe_stage, observe_input,
+                     observe_audio, request_started, request_finished, set_model_load_time,
+                     track_phonemization, instrument_frontend, server_timing)
+from onnx_engine import (OnnxTTS, export_onnx, has_onnx_artifacts, onnxruntime_available,
+                         set_num_threads as set_onnx_threads, ONNX_MODEL, ONNX_FRONTEND)
+
 # Configure logging for production
 logging.basicConfig(
     level=logging.INFO,
@@ -54,13 +87,115 @@ class Config:
     
     # Static files (built frontend)
     STATIC_FOLDER = os.environ.get('STATIC_FOLDER', '../frontend/dist')
+    
+    # In-memory audio cache budget per worker (0 disables caching)
+    AUDIO_CACHE_MAX_BYTES = int(os.environ.get('AUDIO_CACHE_MAX_BYTES', 64 * 1024 * 1024))  # 64MB
+    
+    # Persistent audio cache on the model volume, shared by all workers (0 disables)
+    DISK_CACHE_MAX_BYTES = int(os.environ.get('DISK_CACHE_MAX_BYTES', 2 * 1024 * 1024 * 1024))  # 2GB
+    DISK_CACHE_SEGMENT_BYTES = int(os.environ.get('DISK_CACHE_SEGMENT_BYTES', 64 * 1024 * 1024))  # 64MB
+    
+    # Model calls run on a per-worker inference pool, off the HTTP threads. At most
+    # INFERENCE_MAX_PENDING synthesis requests are admitted per worker (more get 503),
+    # so the remaining GUNICORN_THREADS always serve health, status and static files
+    INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', 1))
+    INFERENCE_MAX_PENDING = int(os.environ.get(
+        'INFERENCE_MAX_PENDING', max(1, int(os.environ.get('GUNICORN_THREADS', 8)) - 2)))
+    INFERENCE_TIMEOUT = float(os.environ.get('INFERENCE_TIMEOUT', 110))  # Below gunicorn timeout
+    # Minimum share of inference seconds for bulk work (batch chunks, job sentences)
+    # while interactive requests are waiting too
+    INFERENCE_BULK_SHARE = float(os.environ.get('INFERENCE_BULK_SHARE', 0.1))
+    
+    # Dedicated model processes under gunicorn (0 = every web worker holds the model).
+    # Web workers then stay light and send text to these replicas over a local socket
+    INFERENCE_PROCESSES = int(os.environ.get('INFERENCE_PROCESSES', 0))
+    BUSY_RETRY_AFTER = int(os.environ.get('BUSY_RETRY_AFTER', 5))
+    
+    # Admission control: /api/tts answers 429 when the estimated wait for inference on
+    # this instance exceeds the SLO (0 disables). Capacity = parallel inference lanes
+    # (0 = INFERENCE_PROCESSES, or WEB_CONCURRENCY x INFERENCE_WORKERS)
+    ADMISSION_SLO_SECONDS = float(os.environ.get('ADMISSION_SLO_SECONDS', 15))
+    ADMISSION_CAPACITY = int(os.environ.get('ADMISSION_CAPACITY', 0))
+    ADMISSION_SECONDS_PER_CHAR = float(os.environ.get('ADMISSION_SECONDS_PER_CHAR', 0.01))
+    
+    # Cost model predicting inference seconds from characters, phonemes and length_scale,
+    # refitted from observed timings per model and instance type (ADMISSION_SECONDS_PER_CHAR
+    # is its starting point). INSTANCE_TYPE defaults to architecture and core count
+    INSTANCE_TYPE = os.environ.get('INSTANCE_TYPE', '')
+    COST_MODEL_FORGETTING = float(os.environ.get('COST_MODEL_FORGETTING', 0.98))
+    
+    # API clients for fair scheduling: "name:key[:weight[:bulk]],..." sent as X-API-Key.
+    # Inference is shared by weight; bulk clients and batch/job work queue behind interactive
+    API_CLIENTS = os.environ.get('API_CLIENTS', '')
+    PUBLIC_CLIENT_WEIGHT = float(os.environ.get('PUBLIC_CLIENT_WEIGHT', 1.0))
+    
+    # Micro-batching of concurrent requests. Requests enter the batcher from the inference
+    # pool in fair order, so INFERENCE_WORKERS is the number of requests merged at once
+    BATCH_INFERENCE = os.environ.get('BATCH_INFERENCE', 'false').lower() == 'true'
+    BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 8))
+    BATCH_MAX_WAIT_MS = float(os.environ.get('BATCH_MAX_WAIT_MS', 20))
+    BATCH_TIMEOUT = float(os.environ.get('BATCH_TIMEOUT', 110))  # Below gunicorn timeout
+    
+    # POST /api/tts/batch
+    BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', 500))
+    
+    # POST /api/tts/jobs (long-form synthesis on a background pool)
+    MAX_JOB_TEXT_LENGTH = int(os.environ.get('MAX_JOB_TEXT_LENGTH', 200000))
+    SYNTHESIS_JOB_WORKERS = int(os.environ.get('SYNTHESIS_JOB_WORKERS', 1))
+    SYNTHESIS_JOB_MAX_PENDING = int(os.environ.get('SYNTHESIS_JOB_MAX_PENDING', 20))
+    SYNTHESIS_JOB_TTL_HOURS = float(os.environ.get('SYNTHESIS_JOB_TTL_HOURS', 24))
+    
+    # Strip training-only state from uploaded checkpoints (original moved to archive/)
+    SLIM_CHECKPOINTS = os.environ.get('SLIM_CHECKPOINTS', 'true').lower() == 'true'
+    ARCHIVE_ORIGINAL_CHECKPOINT = os.environ.get('ARCHIVE_ORIGINAL_CHECKPOINT', 'true').lower() == 'true'
+    
+    # Also write model.safetensors at upload; workers memory-map it instead of unpickling
+    SAFETENSORS_WEIGHTS = os.environ.get('SAFETENSORS_WEIGHTS', 'true').lower() == 'true'
+    
+    # Hot swap: how long to wait for in-flight requests before releasing the old model
+    SWAP_DRAIN_TIMEOUT = float(os.environ.get('SWAP_DRAIN_TIMEOUT', 120))
+    WARMUP_TEXT = os.environ.get('WARMUP_TEXT', 'Moin, dit is en Test.')
+    
+    # Seconds between checks for activations made by other workers (0 disables)
+    MODEL_SYNC_INTERVAL = float(os.environ.get('MODEL_SYNC_INTERVAL', 2))
+    
+    # int8 variant: also quantize Conv1d layers (not only Linear)
+    QUANTIZE_CONV = os.environ.get('QUANTIZE_CONV', 'true').lower() == 'true'
+    
+    # Inference engine: 'torch' (Coqui) or 'onnx' (ONNX Runtime, no torch in the workers)
+    TTS_ENGINE = os.environ.get('TTS_ENGINE', 'torch').lower()
+    # Export model.onnx at upload (always done when TTS_ENGINE=onnx)
+    ONNX_EXPORT = os.environ.get('ONNX_EXPORT', 'false').lower() == 'true'
+    
+    # Torch intra-op threads per worker (0 = CPU count divided by worker count)
+    TORCH_NUM_THREADS = int(os.environ.get('TORCH_NUM_THREADS', 0))
+    
+    # Prometheus metrics on /metrics (needs prometheus_client)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    
+    # Allow clients to request a per-request trace ({"debug": true}) in X-TTS-Trace
+    DEBUG_TRACE_ENABLED = os.environ.get('DEBUG_TRACE_ENABLED', 'true').lower() == 'true'
+    
+    # Pin each gunicorn worker to its own set of cores
+    CPU_AFFINITY = os.environ.get('CPU_AFFINITY', 'true').lower() == 'true'
 
 
 # =============================================================================
 # GLOBAL STATE
 # =============================================================================
 
+SAMPLE_RATE = 22050
+MAX_TEXT_LENGTH = 1000
+SENTENCE_PAUSE_SAMPLES = 10000  # Silence between sentences, as inserted by Coqui's synthesizer
+
 tts_model = None
+model_preloaded = False  # Loaded in the gunicorn master and inherited on fork
+worker_layout = None  # CPU set and thread count of this worker (set after fork)
+inference_process = False  # This process is a model replica of the inference process pool
+
+# Requests lease the serving model; a hot swap releases the old one when its leases end
+_model_cond = threading.Condition()
+_model_leases = {}  # id(model) -> in-flight requests
 model_info = {
     'loaded': False,
     'name': None,
@@ -87,6 +222,248 @@ def normalize_text(text: str) -> str:
     return text.strip()
 
 
+def split_sentences(text: str, max_chars: int = 200) -> list:
+    """Split normalized text into sentences; long sentences are split at clause marks."""
+    import re
+    
+    sentences = []
+    for sentence in re.split(r"(?<=[.!?])\s+", text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            sentences.append(sentence)
+            continue
+        
+        # Break overly long sentences after commas/semicolons/colons
+        current = ""
+        for clause in re.split(r"(?<=[,;:])\s+", sentence):
+            if current and len(current) + len(clause) + 1 > max_chars:
+                sentences.append(current)
+                current = clause
+            else:
+                current = f"{current} {clause}".strip()
+        if current:
+            sentences.append(current)
+    
+    return sentences
+
+
+# =============================================================================
+# SYNTHESIS HELPERS
+# =============================================================================
+
+def validate_tts_text(data, max_length: int = MAX_TEXT_LENGTH) -> tuple:
+    """Extract the text field from a request payload. Returns (text, error)."""
+    if not data or 'text' not in data:
+        return None, 'Missing required field: text'
+    
+    text = str(data.get('text', '')).strip()
+    
+    if not text:
+        return None, 'Text cannot be empty'
+    
+    if len(text) > max_length:
+        return None, f'Text too long (max {max_length} characters)'
+    
+    return text, None
+
+
+def parse_synthesis_params(data: dict) -> dict:
+    """Read synthesis parameters (with defaults) and clamp them to valid ranges."""
+    # Get parameters with defaults
+    temperature = float(data.get('temperature', 0.7))
+    length_scale = float(data.get('length_scale', 1.03))
+    noise_scale = float(data.get('noise_scale', 0.78))
+    noise_scale_w = float(data.get('noise_scale_w', 0.92))
+    
+    # Clamp parameters
+    return {
+        'temperature': max(0.1, min(1.0, temperature)),
+        'length_scale': max(0.5, min(2.0, length_scale)),
+        'noise_scale': max(0.0, min(1.0, noise_scale)),
+        'noise_scale_w': max(0.0, min(1.0, noise_scale_w))
+    }
+
+
+def current_client() -> Client:
+    """API client of the current request (the public client outside of requests)."""
+    if has_request_context() and g.get('client') is not None:
+        return g.client
+    return get_clients().public
+
+
+def predict_seconds(characters: int, length_scale: float = 1.0, phonemes: int = None) -> float:
+    """Predicted inference seconds of a normalized text with the serving model."""
+    return get_cost_model().predict(model_info.get('fingerprint'), characters, length_scale, phonemes)
+
+
+def observe_synthesis(characters: int, phonemes: int, length_scale: float, seconds: float):
+    """Refit the cost model of the serving model with a measured (unbatched) model call."""
+    if not Config.BATCH_INFERENCE:
+        get_cost_model().observe(model_info.get('fingerprint'), characters, phonemes, length_scale, seconds)
+
+
+def run_inference(fn, cost: float, client: Client = None, bulk: bool = False, stats: dict = None,
+                  **kwargs):
+    """
+    Run a model call with `cost` predicted seconds on the inference pool, in
+    fair order with the calls of other clients. Bulk calls and bulk clients
+    queue behind interactive ones.
+    """
+    client = client or current_client()
+    return get_inference_pool().run(
+        fn,
+        timeout=Config.INFERENCE_TIMEOUT,
+        stats=stats,
+        client=client.name,
+        weight=client.weight,
+        bulk=bulk or client.bulk,
+        cost=cost,
+        **kwargs
+    )
+
+
+def synthesize(model, text: str, params: dict, stats: dict = None, client: Client = None,
+               bulk: bool = False):
+    """
+    Run the model on normalized text on the inference pool, or batched with
+    concurrent requests if enabled (the batching thread then does the inference).
+    If given, stats['queue_wait'] receives the seconds spent waiting for inference.
+    """
+    if not Config.BATCH_INFERENCE:
+        return run_inference(
+            model.tts,
+            predict_seconds(len(text), params['length_scale']),
+            client=client,
+            bulk=bulk,
+            stats=stats,
+            text=text,
+            length_scale=params['length_scale'],
+            noise_scale=params['noise_scale'],
+            noise_scale_w=params['noise_scale_w']
+        )
+    
+    # The pool decides in fair order which requests join the next batches
+    batch_stats = {}
+    waves = run_inference(
+        partial(get_inference_scheduler().submit, model, split_sentences(text),
+                params['length_scale'], params['noise_scale'], params['noise_scale_w'],
+                timeout=Config.BATCH_TIMEOUT, stats=batch_stats),
+        predict_seconds(len(text), params['length_scale']),
+        client=client,
+        bulk=bulk,
+        stats=stats
+    )
+    if stats is not None:
+        stats['queue_wait'] = stats.get('queue_wait', 0.0) + batch_stats.get('queue_wait', 0.0)
+    pause = np.zeros(SENTENCE_PAUSE_SAMPLES, dtype=np.float32)
+    parts = []
+    for index, wave in enumerate(waves):
+        if index:
+            parts.append(pause)
+        parts.append(wave)
+    return np.concatenate(parts)
+
+
+def admission_capacity() -> int:
+    """Requests this instance synthesizes in parallel."""
+    if Config.ADMISSION_CAPACITY > 0:
+        return Config.ADMISSION_CAPACITY
+    if Config.INFERENCE_PROCESSES > 0:
+        return Config.INFERENCE_PROCESSES
+    return int(os.environ.get('WEB_CONCURRENCY', 2)) * Config.INFERENCE_WORKERS
+
+
+@contextmanager
+def admitted(cost: float, force: bool = False):
+    """Count a synthesis of `cost` predicted seconds as outstanding work. Raises Overloaded unless forced."""
+    admission = get_admission()
+    admission.admit(cost, force=force)
+    try:
+        yield
+    finally:
+        admission.finish(cost)
+
+
+def encode_wav(wav_int16: np.ndarray, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """Encode 16-bit PCM as a WAV file."""
+    return encode_wav_pcm16(wav_int16, sample_rate)
+
+
+def audio_file_response(audio: bytes, spec: dict) -> Response:
+    """Serve encoded audio as a download straight from its buffer (no file-like copy)."""
+    response = Response(audio, mimetype=spec['mimetype'])
+    response.headers['Content-Disposition'] = f"attachment; filename=output.{spec['extension']}"
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def synthesize_job_sentence(sentence: str, params: dict) -> np.ndarray:
+    """Synthesize one sentence of a background job with the serving model."""
+    with model_lease() as model:
+        if model is None:
+            raise RuntimeError('No TTS model is active')
+        # Accepted jobs are not shed, but their sentences occupy inference like requests do
+        with admitted(predict_seconds(len(sentence), params['length_scale']), force=True):
+            stats = {}
+            started = time.perf_counter()
+            with track_phonemization() as frontend:
+                wav = synthesize(model, sentence, params, stats, client=get_clients().get(params.get('client')),
+                                 bulk=True)
+            observe_synthesis(len(sentence), frontend['tokens'], params['length_scale'],
+                              time.perf_counter() - started - stats.get('queue_wait', 0.0))
+        return audio_to_pcm16(wav)
+
+
+def wants_debug_trace(data: dict) -> bool:
+    """Client opted into the per-request trace (body "debug": true or ?debug=1)."""
+    flag = data.get('debug') if isinstance(data, dict) else None
+    if flag is None:
+        flag = request.args.get('debug')
+    return str(flag).lower() in ('1', 'true', 'yes')
+
+
+def negotiate_audio_format(data: dict) -> tuple:
+    """Output format from the 'format' field/query parameter or the Accept header. Returns (format, error)."""
+    requested = (data or {}).get('format') or request.args.get('format')
+    return get_mp3_handler().negotiate_format(requested, request.accept_mimetypes)
+
+
+def encode_audio(wav_int16: np.ndarray, audio_format: str) -> bytes:
+    """Encode 16-bit PCM in the negotiated output format."""
+    if audio_format == 'wav':
+        return encode_wav(wav_int16)
+    return get_mp3_handler().encode(wav_int16, audio_format, SAMPLE_RATE)
+
+
+def audio_cache_key(text: str, params: dict, audio_format: str = 'wav') -> str:
+    """Cache key for normalized text, clamped parameters, the active model and output format."""
+    return get_audio_cache().make_key(text, params['length_scale'], params['noise_scale'],
+                                      params['noise_scale_w'], model_info.get('fingerprint'),
+                                      audio_format)
+
+
+def lookup_cached_audio(cache_key: str) -> tuple:
+    """Look up audio in memory, then on disk. Returns (audio, 'HIT'/'HIT-DISK') or (None, None)."""
+    cache = get_audio_cache()
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached, 'HIT'
+    
+    cached = get_disk_cache().get(cache_key)
+    if cached is not None:
+        cache.put(cache_key, cached)
+        return cached, 'HIT-DISK'
+    return None, None
+
+
+def store_cached_audio(cache_key: str, audio: bytes):
+    """Store encoded audio in the memory and disk caches."""
+    get_audio_cache().put(cache_key, audio)
+    get_disk_cache().put(cache_key, audio, model_info.get('name'))
+
+
 # =============================================================================
 # TTS API PATCH
 # =============================================================================
@@ -100,6 +477,7 @@ def patch_tts_api():
             return
         
         TTS._check_arguments = _no_check_arguments
+        patch_safetensors_loading()
         logger.info("TTS API patched successfully")
         return True
     except ImportError:
@@ -107,6 +485,34 @@ def patch_tts_api():
         return False
 
 
+def patch_safetensors_loading():
+    """Let Coqui's Vits.load_checkpoint memory-map .safetensors weights and load int8 weights."""
+    from TTS.tts.models.vits import Vits
+    
+    original_load_checkpoint = Vits.load_checkpoint
+    if getattr(original_load_checkpoint, '_safetensors', False):
+        return
+    
+    def load_checkpoint(self, config, checkpoint_path, eval=False, strict=True, cache=False):
+        if Path(checkpoint_path).name == QUANTIZED_WEIGHTS:
+            load_quantized_weights(self, Path(checkpoint_path), strict=strict)
+            if eval:
+                self.eval()
+            return
+        if not str(checkpoint_path).endswith('.safetensors'):
+            return original_load_checkpoint(self, config, checkpoint_path, eval=eval,
+                                            strict=strict, cache=cache)
+        
+        state = load_safetensors_state(Path(checkpoint_path))
+        # assign=True keeps the mmap-backed tensors instead of copying into fresh memory
+        self.load_state_dict(state, strict=strict, assign=True)
+        if eval:
+            self.eval()
+    
+    load_checkpoint._safetensors = True
+    Vits.load_checkpoint = load_checkpoint
+
+
 # =============================================================================
 # MODEL MANAGEMENT
 # =============================================================================
@@ -118,7 +524,12 @@ def get_model_paths():
         'base': base,
         'active': base / 'active',
         'inactive': base / 'inactive',
-        'metadata': base / 'metadata.json'
+        'metadata': base / 'metadata.json',
+        'audio_cache': base / 'audio_cache',
+        'activation_jobs': base / 'activation_jobs',
+        'synthesis_jobs': base / 'synthesis_jobs',
+        'cost_model': base / 'cost_model.json',
+        'admission': base / ADMISSION_STATE
     }
 
 
@@ -153,36 +564,242 @@ def save_model_metadata(metadata):
         logger.error(f"Error saving metadata: {e}")
 
 
-def load_model_from_path(model_path: Path, config_path: Path):
-    """Load TTS model from specific paths."""
-    global tts_model, model_info
+def compute_model_fingerprint(model_path: Path, config_path: Path, variant: str = 'float') -> str:
+    """Fingerprint model files by name, size and modification time."""
+    import hashlib
     
-    try:
-        logger.info(f"Loading model from {model_path}")
-        
-        if not model_path.exists():
-            raise FileNotFoundError(f"Model file not found: {model_path}")
-        if not config_path.exists():
-            raise FileNotFoundError(f"Config file not found: {config_path}")
-        
-        # Apply TTS API patch
-        if not patch_tts_api():
-            raise RuntimeError("Failed to patch TTS API")
-        
-        from TTS.api import TTS
-        
-        tts_model = TTS(
-            model_path=str(model_path),
-            config_path=str(config_path),
-            gpu=False
-        )
-        
-        model_info = {
+    parts = [model_path.parent.name]
+    if variant != 'float':
+        parts.append(variant)
+    for path in (model_path, config_path):
+        stat = path.stat()
+        parts.append(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.sha1("|".join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+def resolve_engine(model_dir: Path, engine: str = None) -> str:
+    """Engine that will serve a model: ONNX needs exported artifacts and onnxruntime."""
+    engine = engine or Config.TTS_ENGINE
+    if engine != 'onnx':
+        return 'torch'
+    if not onnxruntime_available():
+        logger.warning("TTS_ENGINE=onnx but onnxruntime is not installed - using torch")
+        return 'torch'
+    if not has_onnx_artifacts(model_dir):
+        logger.warning(f"No {ONNX_MODEL} for {model_dir.name} (re-upload to export it) - using torch")
+        return 'torch'
+    return 'onnx'
+
+
+def expected_fingerprint(model_dir: Path, variant: str = 'float') -> str:
+    """Fingerprint build_model() would give a model directory, or None if it has no weights."""
+    if variant == 'float' and resolve_engine(model_dir) == 'onnx':
+        return compute_model_fingerprint(model_dir / ONNX_MODEL, model_dir / ONNX_FRONTEND, 'onnx')
+    model_path, config_path = resolve_model_files(model_dir, variant)
+    if not model_path.exists():
+        return None
+    return compute_model_fingerprint(model_path, config_path, variant)
+
+
+def serves_remotely() -> bool:
+    """True in web workers whose model runs in the inference processes."""
+    return get_inference_processes() is not None and not inference_process
+
+
+def build_model(model_path: Path, config_path: Path, variant: str = 'float', engine: str = None,
+                remote: bool = None) -> tuple:
+    """
+    Load a TTS model from specific paths without installing it. Returns (model, info).
+    In web workers backed by inference processes (remote) only a RemoteModel for
+    the model's files is created; the processes load the weights themselves.
+    """
+    if serves_remotely() if remote is None else remote:
+        return _remote_model(model_path.parent, variant)
+    
+    start = time.perf_counter()
+    model, info = _load_model(model_path, config_path, variant, engine)
+    info['load_seconds'] = round(time.perf_counter() - start, 3)
+    
+    # Front-end time is reported as its own stage in /metrics
+    instrument_frontend(model_frontend(model))
+    return model, info
+
+
+def model_frontend(model):
+    """Text front end (text_to_ids) of a loaded model; None for remote models."""
+    if getattr(model, 'engine', None) == 'onnx':
+        return model.frontend
+    return getattr(get_vits(model), 'tokenizer', None)
+
+
+def _remote_model(model_dir: Path, variant: str) -> tuple:
+    if variant not in MODEL_VARIANTS:
+        raise ValueError(f"Unknown model variant: {variant}")
+    fingerprint = expected_fingerprint(model_dir, variant)
+    if fingerprint is None:
+        raise FileNotFoundError(f"No {variant} weights found in {model_dir}")
+    
+    model = RemoteModel(get_inference_processes(), fingerprint, Config.INFERENCE_TIMEOUT)
+    info = {
+        'loaded': True,
+        'name': model_dir.name,
+        'variant': variant,
+        'engine': resolve_engine(model_dir),
+        'remote': True,
+        'loaded_at': datetime.now().isoformat(),
+        'error': None,
+        'fingerprint': fingerprint,
+        'load_seconds': 0.0
+    }
+    return model, info
+
+
+def _load_model(model_path: Path, config_path: Path, variant: str, engine: str) -> tuple:
+    if variant not in MODEL_VARIANTS:
+        raise ValueError(f"Unknown model variant: {variant}")
+    
+    if resolve_engine(model_path.parent, engine) == 'onnx':
+        if variant != 'float':
+            raise ValueError("The ONNX engine serves the float variant only")
+        model_dir = model_path.parent
+        logger.info(f"Loading ONNX model from {model_dir / ONNX_MODEL}")
+        model = OnnxTTS(model_dir)
+        info = {
             'loaded': True,
-            'name': model_path.parent.name,
+            'name': model_dir.name,
+            'variant': variant,
+            'engine': 'onnx',
             'loaded_at': datetime.now().isoformat(),
-            'error': None
+            'error': None,
+            'fingerprint': compute_model_fingerprint(model_dir / ONNX_MODEL, model_dir / ONNX_FRONTEND, 'onnx')
         }
+        return model, info
+    
+    if variant == 'int8' and not quantization_available():
+        raise RuntimeError("int8 quantization is not supported by this torch build/CPU")
+    
+    # Prefer the slim inference artifact written at upload time
+    if model_path.name == ORIGINAL_CHECKPOINT:
+        model_path, config_path = resolve_model_files(model_path.parent, variant)
+    
+    logger.info(f"Loading model from {model_path}")
+    
+    if not model_path.exists():
+        raise FileNotFoundError(f"Model file not found: {model_path}")
+    if not config_path.exists():
+        raise FileNotFoundError(f"Config file not found: {config_path}")
+    
+    # Apply TTS API patch
+    if not patch_tts_api():
+        raise RuntimeError("Failed to patch TTS API")
+    
+    from TTS.api import TTS
+    
+    model = TTS(
+        model_path=str(model_path),
+        config_path=str(config_path),
+        gpu=False
+    )
+    
+    if variant == 'int8' and model_path.name != QUANTIZED_WEIGHTS:
+        # First int8 activation: quantize the float model and keep the artifact
+        vits = get_vits(model)
+        if vits is None:
+            raise RuntimeError("int8 variant requires a Coqui VITS model")
+        quantize_vits(vits, include_conv=Config.QUANTIZE_CONV)
+        save_quantized_weights(model_path.parent, vits, include_conv=Config.QUANTIZE_CONV)
+        model_path, config_path = resolve_model_files(model_path.parent, variant)
+    
+    info = {
+        'loaded': True,
+        'name': model_path.parent.name,
+        'variant': variant,
+        'engine': 'torch',
+        'loaded_at': datetime.now().isoformat(),
+        'error': None,
+        'fingerprint': compute_model_fingerprint(model_path, config_path, variant)
+    }
+    return model, info
+
+
+def export_onnx_model(model_dir: Path) -> dict:
+    """Load a model with Coqui and export its inference path to ONNX."""
+    model, _ = build_model(model_dir / ORIGINAL_CHECKPOINT, model_dir / 'config.json', engine='torch', remote=False)
+    vits = get_vits(model)
+    if vits is None:
+        raise RuntimeError("ONNX export requires a Coqui VITS model")
+    return export_onnx(model_dir, vits)
+
+
+def install_model(model, info: dict):
+    """Switch request traffic to a model with a single reference swap. Returns the previous model."""
+    global tts_model, model_info
+    
+    with _model_cond:
+        previous = tts_model
+        tts_model = model
+        model_info = info
+    
+    # Cached audio belongs to the previous model
+    get_audio_cache().clear()
+    set_model_load_time(info)
+    return previous
+
+
+def acquire_model_lease(model=None):
+    """Register an in-flight request on a model (default: the serving model)."""
+    with _model_cond:
+        if model is None:
+            model = tts_model
+        if model is not None:
+            _model_leases[id(model)] = _model_leases.get(id(model), 0) + 1
+    return model
+
+
+def release_model_lease(model):
+    """End an in-flight request on a model."""
+    if model is None:
+        return
+    with _model_cond:
+        remaining = _model_leases.get(id(model), 0) - 1
+        if remaining > 0:
+            _model_leases[id(model)] = remaining
+        else:
+            _model_leases.pop(id(model), None)
+            _model_cond.notify_all()
+
+
+@contextmanager
+def model_lease(model=None):
+    """Hold a lease on the serving model for the duration of a block."""
+    model = acquire_model_lease(model)
+    try:
+        yield model
+    finally:
+        release_model_lease(model)
+
+
+def wait_for_model_release(model, timeout: float) -> bool:
+    """Wait until no request uses the model any more."""
+    with _model_cond:
+        return _model_cond.wait_for(lambda: id(model) not in _model_leases, timeout)
+
+
+def warm_up_model(model):
+    """Run one short synthesis so weights are paged in and the front end is initialized."""
+    if isinstance(model, RemoteModel):
+        # The inference processes warm up their own copy when they switch
+        return
+    model.tts(text=normalize_text(Config.WARMUP_TEXT))
+
+
+def load_model_from_path(model_path: Path, config_path: Path, variant: str = 'float'):
+    """Load TTS model from specific paths."""
+    global tts_model, model_info
+    
+    try:
+        model, info = build_model(model_path, config_path, variant)
+        install_model(model, info)
         
         logger.info(f"✓ Model loaded successfully: {model_info['name']}")
         return True
@@ -209,8 +826,13 @@ def try_load_active_model():
     # Check for active model
     active_dir = paths['active']
     
-    # Look for model files in active directory
-    model_dirs = [d for d in active_dir.iterdir() if d.is_dir()] if active_dir.exists() else []
+    # The active pointer names a model in inactive/; directories copied into
+    # active/ by older releases are still honoured
+    active_name = read_active_pointer(active_dir)
+    if active_name and (paths['inactive'] / active_name).is_dir():
+        model_dirs = [paths['inactive'] / active_name]
+    else:
+        model_dirs = [d for d in active_dir.iterdir() if d.is_dir()] if active_dir.exists() else []
     
     if not model_dirs:
         logger.info("No active model found - application starting in model-less mode")
@@ -226,8 +848,267 @@ def try_load_active_model():
     model_dir = model_dirs[0]
     model_path = model_dir / 'best_model.pth'
     config_path = model_dir / 'config.json'
+    variant = get_model_metadata().get('active_variant') or 'float'
     
-    return load_model_from_path(model_path, config_path)
+    return load_model_from_path(model_path, config_path, variant)
+
+
+def _report_progress(status: str, progress: float, message: str):
+    logger.info(f"Model swap {status}: {message}")
+
+
+def release_previous_model(previous, report=_report_progress):
+    """Drop the previous model once its in-flight requests have finished."""
+    import gc
+    
+    if previous is None:
+        return
+    report('draining', 0.9, 'Waiting for in-flight requests on the previous model')
+    if not wait_for_model_release(previous, Config.SWAP_DRAIN_TIMEOUT):
+        logger.warning("Previous model still in use after drain timeout - releasing reference anyway")
+    del previous
+    gc.collect()
+
+
+def swap_in_model(model_name: str, report=_report_progress, variant: str = 'float'):
+    """
+    Load and warm up a model from inactive/ while the current one keeps
+    serving, then switch traffic to it. Returns the previous model.
+    """
+    source_dir = get_model_paths()['inactive'] / model_name
+    
+    report('loading', 0.1, f'Loading {model_name} ({variant}) while the current model keeps serving')
+    model, info = build_model(source_dir / ORIGINAL_CHECKPOINT, source_dir / 'config.json', variant)
+    
+    report('warming_up', 0.6, 'Running warm-up synthesis')
+    warm_up_model(model)
+    
+    report('swapping', 0.8, 'Switching traffic to the new model')
+    return install_model(model, info)
+
+
+def hot_swap_model(job, model_name: str, variant: str = 'float'):
+    """
+    Activation job body: load and warm up the new model while the current one
+    keeps serving, swap the reference, then release the old model once its
+    in-flight requests have finished.
+    """
+    paths = get_model_paths()
+    model_sync = get_model_sync()
+    
+    with model_sync.lock:
+        previous = swap_in_model(model_name, job.update, variant)
+        
+        # Only a successfully loaded model becomes the active pointer
+        write_active_pointer(paths['active'], model_name)
+        remove_legacy_active_copies(paths['active'])
+        metadata = get_model_metadata()
+        metadata['active_model'] = model_name
+        metadata['active_variant'] = variant
+        save_model_metadata(metadata)
+        
+        # Other workers pick the new model up from the published generation
+        model_sync.publish(model_name, variant)
+    
+    release_previous_model(previous, job.update)
+
+
+def sync_worker_model(state: dict):
+    """
+    Make this worker serve the model of a generation published by another worker.
+    Returns the release of the previous model, which model sync runs after
+    letting go of its lock.
+    """
+    model_name = state.get('active_model')
+    variant = state.get('variant') or 'float'
+    
+    if model_name is None:
+        if tts_model is not None:
+            return partial(release_previous_model, install_model(None, {
+                'loaded': False,
+                'name': None,
+                'loaded_at': None,
+                'error': 'Model deactivated'
+            }))
+        return None
+    
+    # Same files already loaded (e.g. by this worker's own activation)
+    source_dir = get_model_paths()['inactive'] / model_name
+    fingerprint = expected_fingerprint(source_dir, variant)
+    if tts_model is not None and fingerprint and model_info.get('fingerprint') == fingerprint:
+        return None
+    
+    return partial(release_previous_model, swap_in_model(model_name, variant=variant))
+
+
+# =============================================================================
+# PROCESS LIFECYCLE (gunicorn hooks)
+# =============================================================================
+
+def configure_torch_threads(num_threads: int):
+    """Set torch intra-op threads for this process (no-op without torch)."""
+    try:
+        import torch
+    except ImportError:
+        return
+    
+    torch.set_num_threads(max(1, num_threads))
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Can only be set once per process, before any parallel work
+        pass
+    logger.info(f"Torch threads set for pid {os.getpid()}: intra-op={torch.get_num_threads()}")
+
+
+def preload_active_model():
+    """
+    Load the active model in the gunicorn master before workers are forked.
+    Workers inherit the weights copy-on-write instead of each reading ~1GB.
+    """
+    global model_preloaded
+    import gc
+    
+    # Keep the master single-threaded: OpenMP pools do not survive fork()
+    if Config.TTS_ENGINE != 'onnx':
+        configure_torch_threads(1)
+    
+    if try_load_active_model():
+        model_preloaded = True
+        # Move everything allocated so far out of the GC's reach, so collections
+        # in the workers do not write to (and thereby copy) the shared pages
+        gc.collect()
+        gc.freeze()
+        logger.info(f"✓ Model preloaded before fork (pid {os.getpid()}): {model_info['name']}")
+    return model_preloaded
+
+
+def configure_worker_cpus(slot: int, num_workers: int = 1):
+    """
+    Pin this worker to its core set and size the inference thread pool to it.
+    Runs in gunicorn's post_fork, before the worker touches the model.
+    """
+    global worker_layout
+    
+    if serves_remotely():
+        # The model runs in the inference processes, which get the cores
+        worker_layout = worker_cpu_layout(slot, num_workers, pin=False, num_threads=1)
+        get_inference_processes().attach()
+        logger.info(f"Worker {slot + 1}/{num_workers} (pid {os.getpid()}): "
+                    f"synthesis on {Config.INFERENCE_PROCESSES} inference process(es)")
+        return worker_layout
+    
+    worker_layout = worker_cpu_layout(slot, num_workers, pin=Config.CPU_AFFINITY,
+                                      num_threads=Config.TORCH_NUM_THREADS)
+    if Config.TTS_ENGINE == 'onnx':
+        # Sessions are created lazily per process, so this applies to the inherited model too
+        set_onnx_threads(worker_layout['threads'])
+    else:
+        configure_torch_threads(worker_layout['threads'])
+    
+    logger.info(f"Worker {slot + 1}/{num_workers} (pid {os.getpid()}): "
+                f"CPUs {worker_layout['cpus']} ({'pinned' if worker_layout['pinned'] else 'not pinned'}), "
+                f"{worker_layout['threads']} {Config.TTS_ENGINE} thread(s)")
+    return worker_layout
+
+
+def init_worker(num_workers: int = 1):
+    """Per-worker initialization after fork."""
+    if worker_layout is None and not serves_remotely():
+        # Not started through gunicorn's post_fork: share the cores without pinning
+        threads = Config.TORCH_NUM_THREADS or max(1, (os.cpu_count() or 1) // max(1, num_workers))
+        if Config.TTS_ENGINE == 'onnx':
+            set_onnx_threads(threads)
+        else:
+            configure_torch_threads(threads)
+    
+    follow_active_model()
+    
+    # Continue long-form jobs of a worker that died mid-job
+    get_synthesis_jobs().resume_orphaned()
+
+
+def follow_active_model():
+    """Load the active model unless it was inherited, then follow activations of other workers."""
+    # Read before the metadata: an activation published while this worker loads
+    # is then newer than the adopted generation and applied by the watcher
+    generation = read_generation(get_model_paths()['base'])['generation']
+    
+    # Without preloading (or if the active model changed since the master loaded
+    # it) the worker loads the active model itself
+    metadata = get_model_metadata()
+    active_name = metadata.get('active_model')
+    active_variant = metadata.get('active_variant') or 'float'
+    if tts_model is None or (active_name and (active_name != model_info.get('name') or
+                                              active_variant != model_info.get('variant', 'float'))):
+        try_load_active_model()
+    
+    # Metrics of the inherited model belong to the master's pid until set here
+    set_model_load_time(model_info)
+    
+    # Follow activations handled by other workers
+    get_model_sync().start(model_info.get('name'), generation)
+
+
+# =============================================================================
+# INFERENCE PROCESSES (INFERENCE_PROCESSES > 0)
+# =============================================================================
+
+def start_inference_processes():
+    """
+    Create the inference process pool in the gunicorn master and start it.
+    Called instead of preload_active_model(): the supervisor loads the model,
+    so the master and the web workers never hold the weights.
+    """
+    pool = init_inference_processes(Config.INFERENCE_PROCESSES, synthesize_remote_request,
+                                    setup_fn=init_inference_process,
+                                    preload_fn=preload_inference_model)
+    pool.start()
+    return pool
+
+
+def stop_inference_processes():
+    """Stop the inference process pool (gunicorn on_exit)."""
+    pool = get_inference_processes()
+    if pool is not None:
+        pool.stop()
+
+
+def preload_inference_model():
+    """Supervisor: load the model once; the inference processes inherit it copy-on-write."""
+    global inference_process
+    inference_process = True
+    preload_active_model()
+
+
+def init_inference_process(index: int, num_processes: int):
+    """Inference process initialization: own core set, the active model, model sync."""
+    global inference_process
+    inference_process = True
+    configure_worker_cpus(index, num_processes)
+    follow_active_model()
+
+
+def synthesize_remote_request(text: str, params: dict, fingerprint: str = None) -> tuple:
+    """
+    Inference process side of RemoteModel.tts(): synthesize with the local model.
+    Returns (waveform, details with the front-end time for the web worker's metrics).
+    """
+    if fingerprint and fingerprint != model_info.get('fingerprint'):
+        # The web worker already serves a newer activation - apply it before answering
+        get_model_sync().check()
+    
+    with model_lease() as model:
+        if model is None:
+            raise RuntimeError('No TTS model is active')
+        with track_phonemization() as frontend:
+            wav = model.tts(text=text, **params)
+    return as_float32(wav), {
+        'phonemize_seconds': frontend['seconds'],
+        'tokens': frontend['tokens'],
+        'model': model_info.get('name'),
+        'pid': os.getpid()
+    }
 
 
 # =============================================================================
@@ -246,6 +1127,77 @@ def require_admin(f):
     return decorated_function
 
 
+def overloaded_response(error: Overloaded):
+    """429 for synthesis requests that would wait longer than the admission SLO."""
+    response = jsonify({
+        'error': 'Server overloaded',
+        'message': 'Too much synthesis work is queued. Please retry later.',
+        'code': 'OVERLOADED',
+        'estimated_wait_seconds': round(error.estimated_wait, 1)
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+
+def busy_response():
+    """503 for synthesis requests this worker cannot take right now."""
+    response = jsonify({
+        'error': 'Server busy',
+        'message': 'All synthesis slots are in use. Please retry shortly.',
+        'code': 'SERVER_BUSY'
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = str(Config.BUSY_RETRY_AFTER)
+    return response
+
+
+def request_client():
+    """API client identified by the X-API-Key header or api_key parameter (None if the key is unknown)."""
+    api_key = request.headers.get('X-API-Key') or request.args.get('api_key')
+    return get_clients().identify(api_key)
+
+
+def unknown_client_response():
+    return jsonify({'error': 'Unauthorized - unknown API key', 'code': 'UNKNOWN_API_KEY'}), 401
+
+
+def with_inference_slot(f):
+    """
+    Decorator identifying the API client and admitting a synthesis request to
+    the inference pool (503 if it is full). The slot is held until the view
+    returns, or until a streamed response is closed.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        g.client = request_client()
+        if g.client is None:
+            return unknown_client_response()
+        pool = get_inference_pool()
+        if not pool.try_admit():
+            return busy_response()
+        try:
+            response = f(*args, **kwargs)
+        except Exception:
+            pool.release()
+            raise
+        if isinstance(response, Response) and response.is_streamed:
+            response.call_on_close(pool.release)
+        else:
+            pool.release()
+        return response
+    return decorated_function
+
+
+def with_model_lease(f):
+    """Decorator passing the serving model to a view and holding a lease on it."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        with model_lease() as model:
+            return f(model, *args, **kwargs)
+    return decorated_function
+
+
 # =============================================================================
 # FLASK APPLICATION FACTORY
 # =============================================================================
@@ -270,7 +1222,8 @@ def create_app():
         r"/api/*": {
             "origins": Config.CORS_ORIGINS,
             "methods": ["GET", "POST", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "X-Admin-Token"]
+            "allow_headers": ["Content-Type", "X-Admin-Token", "X-API-Key"],
+            "expose_headers": ["Server-Timing", "X-TTS-Trace", "X-Cache"]
         }
     })
     
@@ -279,6 +1232,55 @@ def create_app():
     temp_folder.mkdir(exist_ok=True)
     app.config['UPLOAD_FOLDER'] = str(temp_folder)
     
+    init_audio_cache(Config.AUDIO_CACHE_MAX_BYTES)
+    init_disk_cache(str(get_model_paths()['audio_cache']),
+                    Config.DISK_CACHE_MAX_BYTES,
+                    Config.DISK_CACHE_SEGMENT_BYTES)
+    init_inference_scheduler(Config.BATCH_MAX_SIZE, Config.BATCH_MAX_WAIT_MS)
+    init_inference_pool(Config.INFERENCE_WORKERS, Config.INFERENCE_MAX_PENDING,
+                        bulk_share=Config.INFERENCE_BULK_SHARE)
+    init_admission(Config.ADMISSION_SLO_SECONDS, admission_capacity(),
+                   state_path=str(get_model_paths()['admission']))
+    init_clients(Config.API_CLIENTS, Config.PUBLIC_CLIENT_WEIGHT)
+    init_cost_model(str(get_model_paths()['cost_model']), Config.ADMISSION_SECONDS_PER_CHAR,
+                    forgetting=Config.COST_MODEL_FORGETTING, instance=Config.INSTANCE_TYPE or None)
+    init_activation_jobs(str(get_model_paths()['activation_jobs']))
+    init_model_sync(str(get_model_paths()['base']), Config.MODEL_SYNC_INTERVAL, sync_worker_model)
+    init_synthesis_jobs(str(get_model_paths()['synthesis_jobs']),
+                        max_workers=Config.SYNTHESIS_JOB_WORKERS,
+                        max_pending=Config.SYNTHESIS_JOB_MAX_PENDING,
+                        sample_rate=SAMPLE_RATE,
+                        pause_samples=SENTENCE_PAUSE_SAMPLES,
+                        ttl_hours=Config.SYNTHESIS_JOB_TTL_HOURS,
+                        synthesize_fn=synthesize_job_sentence)
+    
+    # =========================================================================
+    # METRICS
+    # =========================================================================
+    
+    @app.before_request
+    def start_request_metrics():
+        if Config.METRICS_ENABLED and request.endpoint != 'metrics':
+            request.environ['tts.started'] = time.perf_counter()
+            request_started(request.endpoint or 'unknown')
+    
+    @app.after_request
+    def finish_request_metrics(response):
+        started = request.environ.pop('tts.started', None)
+        if started is not None:
+            request_finished(request.endpoint or 'unknown', request.method,
+                             response.status_code, time.perf_counter() - started)
+        return response
+    
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """Prometheus metrics, aggregated over all gunicorn workers."""
+        if not Config.METRICS_ENABLED or not metrics_available():
+            return jsonify({'error': 'Metrics are not enabled (METRICS_ENABLED, prometheus_client)'}), 503
+        body, content_type = generate_metrics()
+        return Response(body, mimetype=content_type.split(';')[0],
+                        headers={'Content-Type': content_type})
+    
     # =========================================================================
     # HEALTH & STATUS ENDPOINTS
     # =========================================================================
@@ -317,6 +1319,28 @@ def create_app():
                 'base_path': str(paths['base']),
                 'inactive_models': inactive_count
             },
+            'worker': dict(get_model_sync().get_stats(),
+                           pid=os.getpid(),
+                           model_preloaded=model_preloaded,
+                           cpu_layout=worker_layout),
+            'workers': get_model_sync().worker_states(),
+            'cache': get_audio_cache().get_stats(),
+            'disk_cache': get_disk_cache().get_stats(),
+            'inference_pool': get_inference_pool().get_stats(),
+            'admission': get_admission().get_stats(),
+            'cost_model': get_cost_model().get_stats(model_info.get('fingerprint')),
+            'inference_processes': get_inference_processes().get_stats() if serves_remotely() else None,
+            'batching': dict(get_inference_scheduler().get_stats(), enabled=Config.BATCH_INFERENCE),
+            'synthesis_jobs': get_synthesis_jobs().get_stats(),
+            'quantization': {
+                'active_variant': model_info.get('variant') if model_info.get('loaded') else None,
+                'int8_supported': quantization_available(import_torch=False)
+            },
+            'engine': {
+                'configured': Config.TTS_ENGINE,
+                'active': model_info.get('engine') if model_info.get('loaded') else None,
+                'onnxruntime_available': onnxruntime_available()
+            },
             'timestamp': datetime.now().isoformat()
         }), 200
     
@@ -325,9 +1349,11 @@ def create_app():
     # =========================================================================
     
     @app.route('/api/tts', methods=['POST'])
-    def text_to_speech():
+    @with_inference_slot
+    @with_model_lease
+    def text_to_speech(model):
         """Generate speech from Plattdeutsch text."""
-        if tts_model is None:
+        if model is None:
             return jsonify({
                 'error': 'Model not loaded',
                 'message': 'No TTS model is currently active. Please upload and activate a model via the Admin Panel.',
@@ -337,72 +1363,488 @@ def create_app():
         try:
             data = request.get_json()
             
-            if not data or 'text' not in data:
-                return jsonify({'error': 'Missing required field: text'}), 400
-            
-            text = str(data.get('text', '')).strip()
+            text, error = validate_tts_text(data)
+            if error:
+                return jsonify({'error': error}), 400
             
-            if not text:
-                return jsonify({'error': 'Text cannot be empty'}), 400
-            
-            if len(text) > 1000:
-                return jsonify({'error': 'Text too long (max 1000 characters)'}), 400
+            params = parse_synthesis_params(data)
             
-            # Get parameters with defaults
-            temperature = float(data.get('temperature', 0.7))
-            length_scale = float(data.get('length_scale', 1.03))
-            noise_scale = float(data.get('noise_scale', 0.78))
-            noise_scale_w = float(data.get('noise_scale_w', 0.92))
+            audio_format, error = negotiate_audio_format(data)
+            if error:
+                return jsonify({'error': error, 'formats': get_mp3_handler().available_formats()}), 406
+            spec = AUDIO_FORMATS[audio_format]
             
-            # Clamp parameters
-            temperature = max(0.1, min(1.0, temperature))
-            length_scale = max(0.5, min(2.0, length_scale))
-            noise_scale = max(0.0, min(1.0, noise_scale))
-            noise_scale_w = max(0.0, min(1.0, noise_scale_w))
+            # Stage durations for the Server-Timing header (and the debug trace)
+            request_started_at = time.perf_counter()
+            timings = {}
+            trace = {'characters': len(text), 'format': audio_format}
             
             # Normalize text
-            text = normalize_text(text)
-            logger.info(f"Generating TTS for: {text[:50]}...")
+            with stage_timer('normalize', timings):
+                text = normalize_text(text)
+            observe_input('tts', len(text))
             
-            # Generate speech
-            wav = tts_model.tts(
-                text=text,
-                length_scale=length_scale,
-                noise_scale=noise_scale,
-                noise_scale_w=noise_scale_w
-            )
+            def audio_response(audio: bytes, cache_status: str):
+                response = audio_file_response(audio, spec)
+                timings['total'] = time.perf_counter() - request_started_at
+                response.headers['X-Cache'] = cache_status
+                response.headers['Vary'] = 'Accept'
+                response.headers['Server-Timing'] = server_timing(timings, cache=cache_status)
+                # Lets cross-origin pages read the timings (PerformanceResourceTiming.serverTiming)
+                response.headers['Timing-Allow-Origin'] = ', '.join(Config.CORS_ORIGINS)
+                if Config.DEBUG_TRACE_ENABLED and wants_debug_trace(data):
+                    response.headers['X-TTS-Trace'] = json.dumps(dict(
+                        trace,
+                        cache=cache_status,
+                        stages_ms={stage: round(seconds * 1000, 2) for stage, seconds in timings.items()},
+                        model=model_info.get('name'),
+                        engine=model_info.get('engine', 'torch'),
+                        pid=os.getpid()
+                    ), separators=(',', ':'))
+                return response
             
-            # Convert to numpy array
-            if isinstance(wav, list):
-                wav = np.array(wav)
+            # Serve repeated requests from the audio cache
+            cache_key = audio_cache_key(text, params, audio_format)
+            with stage_timer('cache', timings):
+                cached, cache_status = lookup_cached_audio(cache_key)
+            if cached is not None:
+                logger.info(f"Cache hit for: {text[:50]}...")
+                return audio_response(cached, cache_status)
             
-            from scipy.io import wavfile
+            # Same audio already synthesized as WAV (e.g. played before download) - transcode it
+            if audio_format != 'wav':
+                cached_wav, _ = lookup_cached_audio(audio_cache_key(text, params))
+                if cached_wav is not None:
+                    with stage_timer('encode', timings):
+                        audio = encode_audio(wav_to_pcm16(cached_wav), audio_format)
+                    store_cached_audio(cache_key, audio)
+                    return audio_response(audio, 'TRANSCODED')
             
-            # Normalize audio
-            wav_max = np.max(np.abs(wav))
-            if wav_max > 0:
-                wav = wav / wav_max * 0.95
+            logger.info(f"Generating TTS for: {text[:50]}...")
             
-            # Write to buffer
-            output = BytesIO()
-            sample_rate = 22050
-            wav_int16 = (wav * 32767).astype(np.int16)
-            wavfile.write(output, sample_rate, wav_int16)
-            output.seek(0)
+            # Generate speech (front-end time is split out of the model call); shed
+            # the request if the work queued on this instance would delay it past the SLO
+            predicted_seconds = predict_seconds(len(text), params['length_scale'])
+            with admitted(predicted_seconds):
+                started = time.perf_counter()
+                stats = {}
+                with track_phonemization() as frontend:
+                    wav = synthesize(model, text, params, stats)
+                synthesis_seconds = time.perf_counter() - started
+                queue_wait = stats.get('queue_wait', 0.0)
+            observe_synthesis(len(text), frontend['tokens'], params['length_scale'], synthesis_seconds - queue_wait)
+            if queue_wait:
+                timings['queue'] = queue_wait
+            observe_stage('phonemize', frontend['seconds'], timings)
+            observe_stage('inference', synthesis_seconds - queue_wait - frontend['seconds'], timings)
             
-            logger.info("✓ TTS generation successful")
+            # Normalize and quantize in one pass; WAV samples go straight into the response buffer
+            with stage_timer('peak_normalize', timings):
+                wav = as_float32(wav)
+                scale = peak_scale(wav)
+            with stage_timer('int16', timings):
+                if audio_format == 'wav':
+                    buffer, pcm = allocate_wav(len(wav), SAMPLE_RATE)
+                    quantize(wav, scale, out=pcm)
+                else:
+                    pcm = quantize(wav, scale)
+            with stage_timer('encode', timings):
+                # The WSGI server and the caches need immutable bytes: one copy, shared by both
+                audio = bytes(memoryview(buffer)) if audio_format == 'wav' else encode_audio(pcm, audio_format)
+            audio_seconds = len(pcm) / SAMPLE_RATE
+            observe_audio('tts', audio_seconds)
+            store_cached_audio(cache_key, audio)
             
-            return send_file(
-                output,
-                mimetype='audio/wav',
-                as_attachment=True,
-                download_name='output.wav'
+            trace.update(
+                tokens=frontend['tokens'],
+                predicted_seconds=round(predicted_seconds, 3),
+                samples=len(pcm),
+                sample_rate=SAMPLE_RATE,
+                audio_seconds=round(audio_seconds, 3),
+                rtf=round((synthesis_seconds - queue_wait) / audio_seconds, 4) if audio_seconds else None,
+                queue_wait_ms=round(queue_wait * 1000, 2),
+                batched=Config.BATCH_INFERENCE
             )
             
+            logger.info(f"✓ TTS generation successful ({audio_format}, {len(audio)} bytes)")
+            
+            return audio_response(audio, 'MISS')
+            
+        except Overloaded as e:
+            logger.warning(f"TTS request shed: {e}")
+            return overloaded_response(e)
+        except TimeoutError:
+            logger.warning("TTS generation timed out waiting for inference")
+            return busy_response()
         except Exception as e:
             logger.error(f"TTS generation failed: {e}", exc_info=True)
             return jsonify({'error': f'TTS generation failed: {str(e)}'}), 500
     
+    @app.route('/api/tts/stream', methods=['POST'])
+    @with_inference_slot
+    @with_model_lease
+    def text_to_speech_stream(model):
+        """
+        Stream speech sentence by sentence.
+        Sends a WAV header with unknown length, then 16-bit PCM for each
+        sentence as soon as it is synthesized.
+        """
+        if model is None:
+            return jsonify({
+                'error': 'Model not loaded',
+                'message': 'No TTS model is currently active. Please upload and activate a model via the Admin Panel.',
+                'code': 'MODEL_NOT_LOADED'
+            }), 503
+        
+        try:
+            data = request.get_json()
+            
+            text, error = validate_tts_text(data)
+            if error:
+                return jsonify({'error': error}), 400
+            
+            params = parse_synthesis_params(data)
+            with stage_timer('normalize'):
+                text = normalize_text(text)
+            observe_input('tts_stream', len(text))
+            sentences = split_sentences(text)
+            
+            audio_format, error = negotiate_audio_format(data)
+            if error:
+                return jsonify({'error': error, 'formats': get_mp3_handler().available_formats()}), 406
+            encoder = None if audio_format == 'wav' else get_mp3_handler().create_encoder(audio_format, SAMPLE_RATE)
+        except Exception as e:
+            logger.error(f"TTS stream setup failed: {e}", exc_info=True)
+            return jsonify({'error': f'TTS generation failed: {str(e)}'}), 500
+        
+        # The whole text counts as outstanding work until the stream is closed
+        admission = get_admission()
+        try:
+            cost = admission.admit(predict_seconds(len(text), params['length_scale']))
+        except Overloaded as e:
+            logger.warning(f"TTS stream shed: {e}")
+            return overloaded_response(e)
+        client = current_client()
+        
+        logger.info(f"Streaming TTS ({audio_format}) for {len(sentences)} sentences: {sentences[0][:50]}...")
+        
+        def generate():
+            samples = 0
+            if encoder is None:
+                yield wav_stream_header(SAMPLE_RATE)
+            for index, sentence in enumerate(sentences):
+                try:
+                    wav = run_inference(
+                        model.tts,
+                        predict_seconds(len(sentence), params['length_scale']),
+                        client=client,
+                        text=sentence,
+                        length_scale=params['length_scale'],
+                        noise_scale=params['noise_scale'],
+                        noise_scale_w=params['noise_scale_w']
+                    )
+                except Exception as e:
+                    # Headers are already sent - end the stream early
+                    logger.error(f"TTS stream failed at sentence {index + 1}: {e}", exc_info=True)
+                    break
+                pcm = audio_to_pcm16(wav)
+                samples += len(pcm)
+                # Encoded frames go out as soon as the codec emits them
+                chunk = pcm.tobytes() if encoder is None else encoder.encode(pcm)
+                if chunk:
+                    yield chunk
+            else:
+                logger.info("✓ TTS stream finished")
+            observe_audio('tts_stream', samples / SAMPLE_RATE)
+            if encoder is not None:
+                yield encoder.finish()
+        
+        response = Response(stream_with_context(generate()), mimetype=AUDIO_FORMATS[audio_format]['mimetype'])
+        # Keep the model that started the stream leased until the stream is closed
+        acquire_model_lease(model)
+        response.call_on_close(lambda: release_model_lease(model))
+        response.call_on_close(lambda: admission.finish(cost))
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'  # Let nginx pass chunks through
+        response.headers['X-Sentence-Count'] = str(len(sentences))
+        response.headers['Vary'] = 'Accept'
+        return response
+    
+    @app.route('/api/tts/batch', methods=['POST'])
+    @with_inference_slot
+    @with_model_lease
+    def text_to_speech_batch(model):
+        """
+        Synthesize many texts in one call.
+        Body: {"items": [{"id": ..., "text": ..., "params": {...}}, ...]}
+        Returns a ZIP with one <id>.wav per successful item and manifest.json
+        listing the outcome of every item. Failed items do not fail the batch.
+        """
+        import zipfile
+        
+        if model is None:
+            return jsonify({
+                'error': 'Model not loaded',
+                'message': 'No TTS model is currently active. Please upload and activate a model via the Admin Panel.',
+                'code': 'MODEL_NOT_LOADED'
+            }), 503
+        
+        data = request.get_json(silent=True)
+        items = data.get('items') if isinstance(data, dict) else None
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'Missing required field: items (non-empty list)'}), 400
+        
+        if len(items) > Config.BATCH_MAX_ITEMS:
+            return jsonify({'error': f'Too many items (max {Config.BATCH_MAX_ITEMS})'}), 400
+        
+        manifest = []
+        seen_ids = set()
+        file_names = set()
+        audio_by_file = {}
+        pending = {}  # params tuple -> [(entry, text, cache_key, file name)]
+        
+        for index, item in enumerate(items):
+            item = item if isinstance(item, dict) else {}
+            item_id = str(item.get('id', index))
+            entry = {'id': item_id, 'status': 'error'}
+            manifest.append(entry)
+            
+            if item_id in seen_ids:
+                entry['error'] = 'Duplicate id'
+                continue
+            seen_ids.add(item_id)
+            
+            # The manifest keeps the client's id; different ids may sanitize to the same file name
+            stem = secure_filename(item_id) or str(index)
+            while f'{stem}.wav' in file_names:
+                stem = f'{stem}-{index}'
+            file_name = f'{stem}.wav'
+            file_names.add(file_name)
+            
+            text, error = validate_tts_text(item)
+            if error:
+                entry['error'] = error
+                continue
+            
+            raw_params = item.get('params')
+            if raw_params is not None and not isinstance(raw_params, dict):
+                entry['error'] = 'Invalid params: expected an object'
+                continue
+            try:
+                # Same defaults and clamping as /api/tts
+                params = parse_synthesis_params(raw_params or {})
+            except (TypeError, ValueError) as e:
+                entry['error'] = f'Invalid params: {e}'
+                continue
+            
+            text = normalize_text(text)
+            cache_key = audio_cache_key(text, params)
+            cached, cache_status = lookup_cached_audio(cache_key)
+            if cached is not None:
+                audio_by_file[file_name] = cached
+                entry.update({'status': 'ok', 'file': file_name, 'cache': cache_status})
+                continue
+            
+            key = (params['length_scale'], params['noise_scale'], params['noise_scale_w'])
+            pending.setdefault(key, []).append((entry, text, cache_key, file_name))
+        
+        logger.info(f"Batch TTS: {len(items)} items, "
+                    f"{sum(len(group) for group in pending.values())} to synthesize")
+        
+        # Shared batched inference per parameter set; the whole batch is shed under overload
+        # (batched inference is cheaper per character, so it does not refine the cost model)
+        admission = get_admission()
+        try:
+            cost = admission.admit(sum(predict_seconds(len(text), key[0])
+                                       for key, group in pending.items()
+                                       for _, text, _, _ in group)) if pending else None
+        except Overloaded as e:
+            logger.warning(f"Batch TTS shed: {e}")
+            return overloaded_response(e)
+        
+        # Chunks of one scheduler batch each wait their turn as bulk work of this client
+        scheduler = get_inference_scheduler()
+        try:
+            chunks = [(key, group[start:start + Config.BATCH_MAX_SIZE])
+                      for key, group in pending.items()
+                      for start in range(0, len(group), Config.BATCH_MAX_SIZE)]
+            for (length_scale, noise_scale, noise_scale_w), chunk in chunks:
+                texts = [text for _, text, _, _ in chunk]
+                try:
+                    waves = run_inference(
+                        partial(scheduler.submit, model, texts, length_scale, noise_scale, noise_scale_w,
+                                timeout=Config.BATCH_TIMEOUT, return_exceptions=True),
+                        sum(predict_seconds(len(text), length_scale) for text in texts),
+                        bulk=True
+                    )
+                except TimeoutError as e:
+                    waves = [e] * len(chunk)
+                for (entry, _, cache_key, file_name), wave in zip(chunk, waves):
+                    if isinstance(wave, Exception):
+                        logger.error(f"Batch item {entry['id']} failed: {wave}")
+                        entry['error'] = f'TTS generation failed: {wave}'
+                        continue
+                    audio = encode_wav(audio_to_pcm16(wave))
+                    store_cached_audio(cache_key, audio)
+                    audio_by_file[file_name] = audio
+                    entry.update({'status': 'ok', 'file': file_name, 'cache': 'MISS'})
+        finally:
+            if cost is not None:
+                admission.finish(cost)
+        
+        output = BytesIO()
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED) as archive:
+            for file_name, audio in audio_by_file.items():
+                archive.writestr(file_name, audio)
+            archive.writestr('manifest.json', json.dumps({'items': manifest}, indent=2))
+        output.seek(0)
+        
+        failed = sum(1 for entry in manifest if entry['status'] != 'ok')
+        logger.info(f"✓ Batch TTS finished ({len(manifest) - failed} ok, {failed} failed)")
+        
+        response = send_file(
+            output,
+            mimetype='application/zip',
+            as_attachment=True,
+            download_name='batch.zip'
+        )
+        response.headers['X-Batch-Items'] = str(len(manifest))
+        response.headers['X-Batch-Failed'] = str(failed)
+        return response
+    
+    @app.route('/api/tts/estimate', methods=['POST'])
+    @with_model_lease
+    def estimate_synthesis(model):
+        """
+        Predict how long synthesizing a text takes, without synthesizing it.
+        Phonemes are counted with the model's front end where this worker has
+        one (otherwise estimated from the text length).
+        """
+        if model is None:
+            return jsonify({
+                'error': 'Model not loaded',
+                'message': 'No TTS model is currently active. Please upload and activate a model via the Admin Panel.',
+                'code': 'MODEL_NOT_LOADED'
+            }), 503
+        
+        try:
+            data = request.get_json()
+            
+            text, error = validate_tts_text(data)
+            if error:
+                return jsonify({'error': error}), 400
+            
+            params = parse_synthesis_params(data)
+            text = normalize_text(text)
+            frontend = model_frontend(model)
+            phonemes = len(frontend.text_to_ids(text)) if frontend is not None else None
+            seconds = predict_seconds(len(text), params['length_scale'], phonemes)
+        except Exception as e:
+            logger.error(f"Estimate failed: {e}", exc_info=True)
+            return jsonify({'error': f'Estimate failed: {str(e)}'}), 500
+        
+        cost_model = get_cost_model()
+        return jsonify({
+            'characters': len(text),
+            'phonemes': phonemes if phonemes is not None else
+                round(cost_model.estimate_phonemes(model_info.get('fingerprint'), len(text))),
+            'phonemes_estimated': phonemes is None,
+            'length_scale': params['length_scale'],
+            'estimated_seconds': round(seconds, 3),
+            'estimated_wait_seconds': get_admission().get_stats()['estimated_wait_seconds'],
+            'model': model_info.get('name'),
+            'cost_model': cost_model.get_stats(model_info.get('fingerprint'))
+        }), 200
+    
+    @app.route('/api/tts/jobs', methods=['POST'])
+    def create_synthesis_job():
+        """
+        Queue long-form synthesis (articles, chapters) on the background pool.
+        Returns a job id; poll GET /api/tts/jobs/<job_id> and fetch the audio
+        from /api/tts/jobs/<job_id>/audio when the job is completed.
+        """
+        if tts_model is None:
+            return jsonify({
+                'error': 'Model not loaded',
+                'message': 'No TTS model is currently active. Please upload and activate a model via the Admin Panel.',
+                'code': 'MODEL_NOT_LOADED'
+            }), 503
+        
+        try:
+            data = request.get_json()
+            
+            text, error = validate_tts_text(data, Config.MAX_JOB_TEXT_LENGTH)
+            if error:
+                return jsonify({'error': error}), 400
+            
+            client = request_client()
+            if client is None:
+                return unknown_client_response()
+            
+            params = parse_synthesis_params(data)
+            # Job sentences run as bulk work of the client that queued the job
+            params['client'] = client.name
+            sentences = split_sentences(normalize_text(text))
+            if not sentences:
+                return jsonify({'error': 'Text cannot be empty'}), 400
+            
+            job = get_synthesis_jobs().submit(sentences, params, model_info.get('name'))
+        except JobQueueFull as e:
+            response = jsonify({'error': str(e)})
+            response.headers['Retry-After'] = '30'
+            return response, 429
+        except Exception as e:
+            logger.error(f"Creating synthesis job failed: {e}", exc_info=True)
+            return jsonify({'error': f'Creating synthesis job failed: {str(e)}'}), 500
+        
+        return jsonify({
+            'success': True,
+            'job_id': job['job_id'],
+            'status': job['status'],
+            'total_sentences': job['total_sentences'],
+            'status_url': f"/api/tts/jobs/{job['job_id']}",
+            'audio_url': f"/api/tts/jobs/{job['job_id']}/audio"
+        }), 202
+    
+    @app.route('/api/tts/jobs/<job_id>', methods=['GET'])
+    def get_synthesis_job(job_id):
+        """Status and progress of a synthesis job."""
+        job = get_synthesis_jobs().get(job_id)
+        if job is None:
+            return jsonify({'error': f'Job not found: {job_id}'}), 404
+        return jsonify(job), 200
+    
+    @app.route('/api/tts/jobs/<job_id>/audio', methods=['GET'])
+    def get_synthesis_job_audio(job_id):
+        """Download the audio of a completed synthesis job."""
+        jobs = get_synthesis_jobs()
+        job = jobs.get(job_id)
+        if job is None:
+            return jsonify({'error': f'Job not found: {job_id}'}), 404
+        
+        audio_path = jobs.audio_path(job_id)
+        if audio_path is None:
+            return jsonify({
+                'error': f"Job is {job['status']}",
+                'status': job['status'],
+                'progress': job.get('progress')
+            }), 409
+        
+        return send_file(
+            str(audio_path),
+            mimetype='audio/wav',
+            as_attachment=True,
+            download_name=f'{job_id}.wav'
+        )
+    
+    @app.route('/api/tts/jobs/<job_id>', methods=['DELETE'])
+    def delete_synthesis_job(job_id):
+        """Cancel a synthesis job and delete its audio."""
+        if not get_synthesis_jobs().delete(job_id):
+            return jsonify({'error': f'Job not found: {job_id}'}), 404
+        return jsonify({'success': True, 'message': f'Job {job_id} deleted'}), 200
+    
     @app.route('/api/info', methods=['GET'])
     def get_model_info():
         """Get information about the loaded model."""
@@ -418,6 +1860,7 @@ def create_app():
             'language': 'Plattdeutsch (Low German)',
             'model_type': 'VITS',
             'sample_rate': 22050,
+            'formats': get_mp3_handler().available_formats(),
             'loaded_at': model_info.get('loaded_at'),
             'parameters': {
                 'temperature': {'min': 0.1, 'max': 1.0, 'default': 0.7},
@@ -449,6 +1892,8 @@ def create_app():
         # Inactive models
         try:
             for model_dir in paths['inactive'].iterdir():
+                if model_info['loaded'] and model_dir.name == model_info['name']:
+                    continue
                 if model_dir.is_dir():
                     config_path = model_dir / 'config.json'
                     if config_path.exists():
@@ -480,7 +1925,11 @@ def create_app():
         
         paths = get_model_paths()
         target_dir = paths['inactive'] / model_name
-        
+
+        # The active model is served from its upload directory - never overwrite it in place
+        if read_active_pointer(paths['active']) == model_name:
+            return jsonify({'error': 'Cannot replace the active model. Upload under a new name or deactivate it first.'}), 409
+
         try:
             # Save uploaded file temporarily
             temp_path = Path(app.config['UPLOAD_FOLDER']) / secure_filename(file.filename)
@@ -524,6 +1973,36 @@ def create_app():
                 shutil.rmtree(target_dir)
                 return jsonify({'error': 'Invalid model: config.json not found'}), 400
             
+            # Strip training-only state for faster activation and less memory
+            remove_derived_artifacts(target_dir)
+            artifacts = None
+            if Config.SLIM_CHECKPOINTS:
+                try:
+                    artifacts = slim_checkpoint(target_dir, Config.ARCHIVE_ORIGINAL_CHECKPOINT)
+                except ImportError:
+                    logger.warning("torch not available - keeping full training checkpoint")
+                except Exception as e:
+                    logger.error(f"Checkpoint slimming failed, keeping original: {e}", exc_info=True)
+            
+            if Config.SAFETENSORS_WEIGHTS and safetensors_available():
+                try:
+                    artifacts = dict(artifacts or {}, **convert_to_safetensors(target_dir))
+                except ImportError:
+                    logger.warning("torch not available - skipping safetensors conversion")
+                except Exception as e:
+                    logger.error(f"Safetensors conversion failed: {e}", exc_info=True)
+            
+            if Config.ONNX_EXPORT or Config.TTS_ENGINE == 'onnx':
+                try:
+                    artifacts = dict(artifacts or {}, **export_onnx_model(target_dir))
+                except ImportError:
+                    logger.warning("torch not available - skipping ONNX export")
+                except Exception as e:
+                    logger.error(f"ONNX export failed: {e}", exc_info=True)
+            
+            # A re-upload under the same name invalidates its cached audio
+            get_disk_cache().drop_model(model_name)
+            
             # Update metadata
             metadata = get_model_metadata()
             if model_name not in metadata['models']:
@@ -535,6 +2014,7 @@ def create_app():
             return jsonify({
                 'success': True,
                 'model_name': model_name,
+                'artifacts': artifacts,
                 'message': f'Model {model_name} uploaded successfully. Use /api/admin/models/activate to activate it.'
             }), 200
             
@@ -547,9 +2027,13 @@ def create_app():
     @app.route('/api/admin/models/activate', methods=['POST'])
     @require_admin
     def activate_model():
-        """Activate an uploaded model."""
-        global tts_model, model_info
-        
+        """
+        Activate an uploaded model without downtime.
+        The model is loaded and warmed up in the background while the current
+        one keeps serving; poll the returned status_url for progress.
+        Pass {"wait": true} to block until the swap has finished and
+        {"quantized": true} to serve the int8 dynamic-quantized variant.
+        """
         data = request.get_json()
         model_name = data.get('name') if data else None
         
@@ -562,68 +2046,72 @@ def create_app():
         if not source_dir.exists():
             return jsonify({'error': f'Model not found: {model_name}'}), 404
         
+        variant = 'int8' if data.get('quantized') else 'float'
+        
         try:
-            # Clear active directory
-            if paths['active'].exists():
-                shutil.rmtree(paths['active'])
-            paths['active'].mkdir(parents=True, exist_ok=True)
-            
-            # Copy model to active
-            target_dir = paths['active'] / model_name
-            shutil.copytree(source_dir, target_dir)
-            
-            # Load the model
-            model_path = target_dir / 'best_model.pth'
-            config_path = target_dir / 'config.json'
-            
-            if load_model_from_path(model_path, config_path):
-                # Update metadata
-                metadata = get_model_metadata()
-                metadata['active_model'] = model_name
-                save_model_metadata(metadata)
-                
-                return jsonify({
-                    'success': True,
-                    'message': f'Model {model_name} activated successfully',
-                    'model_info': model_info
-                }), 200
-            else:
+            job = get_activation_jobs().start(model_name, lambda job: hot_swap_model(job, model_name, variant))
+        except RuntimeError as e:
+            return jsonify({'error': str(e)}), 409
+        
+        if data.get('wait'):
+            job.done.wait()
+            if job.status != 'completed':
                 return jsonify({
                     'error': 'Failed to load model',
-                    'details': model_info.get('error')
+                    'details': job.error,
+                    'job': job.to_dict()
                 }), 500
-                
-        except Exception as e:
-            logger.error(f"Activation failed: {e}", exc_info=True)
-            return jsonify({'error': f'Activation failed: {str(e)}'}), 500
+            return jsonify({
+                'success': True,
+                'message': f'Model {model_name} activated successfully',
+                'model_info': model_info,
+                'job': job.to_dict()
+            }), 200
+        
+        return jsonify({
+            'success': True,
+            'message': f'Activation of {model_name} started',
+            'job_id': job.id,
+            'status_url': f'/api/admin/models/activate/{job.id}'
+        }), 202
+    
+    @app.route('/api/admin/models/activate/<job_id>', methods=['GET'])
+    @require_admin
+    def activation_status(job_id):
+        """Progress of a background model activation."""
+        job = get_activation_jobs().get(job_id)
+        if job is None:
+            return jsonify({'error': f'Activation job not found: {job_id}'}), 404
+        return jsonify(job), 200
     
     @app.route('/api/admin/models/deactivate', methods=['POST'])
     @require_admin
     def deactivate_model():
         """Deactivate the current model."""
-        global tts_model, model_info
-        
         paths = get_model_paths()
         
         try:
-            # Clear active directory
-            if paths['active'].exists():
-                shutil.rmtree(paths['active'])
-            paths['active'].mkdir(parents=True, exist_ok=True)
-            
-            # Reset model state
-            tts_model = None
-            model_info = {
-                'loaded': False,
-                'name': None,
-                'loaded_at': None,
-                'error': 'Model deactivated'
-            }
-            
-            # Update metadata
-            metadata = get_model_metadata()
-            metadata['active_model'] = None
-            save_model_metadata(metadata)
+            # Drop the active pointer
+            model_sync = get_model_sync()
+            with model_sync.lock:
+                clear_active_pointer(paths['active'])
+                remove_legacy_active_copies(paths['active'])
+                
+                # Reset model state; requests in flight finish on the old model
+                install_model(None, {
+                    'loaded': False,
+                    'name': None,
+                    'loaded_at': None,
+                    'error': 'Model deactivated'
+                })
+                
+                # Update metadata
+                metadata = get_model_metadata()
+                metadata['active_model'] = None
+                save_model_metadata(metadata)
+                
+                # Other workers drop their model too
+                model_sync.publish(None)
             
             return jsonify({
                 'success': True,
@@ -644,8 +2132,12 @@ def create_app():
         if not model_path.exists():
             return jsonify({'error': 'Model not found'}), 404
         
+        if read_active_pointer(paths['active']) == model_path.name:
+            return jsonify({'error': 'Cannot delete the active model. Deactivate it first.'}), 409
+        
         try:
             shutil.rmtree(model_path)
+            get_disk_cache().drop_model(model_path.name)
             
             # Update metadata
             metadata = get_model_metadata()
@@ -661,7 +2153,19 @@ def create_app():
         except Exception as e:
             logger.error(f"Delete failed: {e}", exc_info=True)
             return jsonify({'error': f'Delete failed: {str(e)}'}), 500
-    
+
+    @app.route('/api/admin/clients', methods=['GET'])
+    @require_admin
+    def list_clients():
+        """Configured API clients with their request rate and queue wait in this worker."""
+        pool = get_inference_pool()
+        usage = pool.client_stats()
+        return jsonify({
+            'clients': [dict(client.to_dict(), **usage.get(client.name, {})) for client in get_clients().all()],
+            'inference_pool': pool.get_stats(),
+            'pid': os.getpid()
+        }), 200
+
     # =========================================================================
     # STATIC FILES (Frontend)
     # =========================================================================
@@ -0,0 +1,136 @@
+"""
+Audio Cache - In-Process LRU
+Keeps recently synthesized WAV responses in worker memory so repeated
+phrases are served without running the VITS forward pass again.
+Bounded by total byte size rather than entry count.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class AudioCache:
+    """Thread-safe LRU cache of encoded audio with a byte budget"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize audio cache.
+
+        Args:
+            max_bytes: Maximum total size of cached audio (0 disables caching)
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(text: str, length_scale: float, noise_scale: float,
+                 noise_scale_w: float, model_fingerprint: Optional[str],
+                 audio_format: str = 'wav') -> str:
+        """
+        Build a cache key for a synthesis request.
+
+        Args:
+            text: Normalized input text
+            length_scale: Clamped length scale
+            noise_scale: Clamped noise scale
+            noise_scale_w: Clamped duration noise scale
+            model_fingerprint: Fingerprint of the active model
+            audio_format: Encoded output format (wav, mp3, opus, flac)
+
+        Returns:
+            Hex digest identifying the request
+        """
+        raw = "\x1f".join([
+            model_fingerprint or '',
+            f"{length_scale:.4f}",
+            f"{noise_scale:.4f}",
+            f"{noise_scale_w:.4f}",
+            text
+        ])
+        if audio_format != 'wav':
+            # WAV keys stay unchanged so existing disk cache entries remain valid
+            raw = f"{audio_format}\x1f{raw}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached audio for key (or None) and mark it recently used"""
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return audio
+
+    def put(self, key: str, audio: bytes):
+        """Store audio under key, evicting least recently used entries"""
+        size = len(audio)
+        if size == 0 or size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+
+            self._entries[key] = audio
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all cached audio (e.g. after a model switch)"""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self.current_bytes = 0
+        if count:
+            logger.info(f"Audio cache cleared ({count} entries)")
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.max_bytes > 0,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+# Global audio cache instance
+audio_cache = None
+
+
+def init_audio_cache(max_bytes: int = 64 * 1024 * 1024):
+    """Initialize the global audio cache"""
+    global audio_cache
+    audio_cache = AudioCache(max_bytes)
+    logger.info(f"Audio cache initialized with budget: {max_bytes} bytes")
+
+
+def get_audio_cache() -> AudioCache:
+    """Get the global audio cache (initialize if needed)"""
+    global audio_cache
+    if audio_cache is None:
+        init_audio_cache()
+    return audio_cache
@@ -0,0 +1,112 @@
+"""
+Audio Processing - Post-Processing and WAV Writer
+Turns model output into 16-bit PCM and WAV without intermediate copies:
+the peak is read from the float32 waveform in place, scaling and int16
+quantization happen in one ufunc pass that writes straight into the
+response buffer, and the RIFF header is built by hand in front of it.
+"""
+
+import struct
+from typing import Optional, Tuple
+
+import numpy as np
+
+WAV_HEADER_BYTES = 44
+PEAK_LEVEL = 0.95  # Peak after normalization, as a fraction of full scale
+INT16_SCALE = 32767
+
+
+def as_float32(wav) -> np.ndarray:
+    """Model output as a 1-D float32 array (no copy if it already is one)."""
+    return np.asarray(wav, dtype=np.float32).reshape(-1)
+
+
+def peak_scale(wav: np.ndarray, peak: float = PEAK_LEVEL) -> float:
+    """Factor mapping the waveform's peak to `peak` of int16 full scale (0 for silence)."""
+    if not len(wav):
+        return 0.0
+    # max/min instead of np.abs() avoids allocating a temporary array
+    wav_max = max(float(wav.max()), -float(wav.min()))
+    return peak * INT16_SCALE / wav_max if wav_max > 0 else float(INT16_SCALE)
+
+
+def quantize(wav: np.ndarray, scale: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Scale and convert to int16 in a single pass.
+
+    Args:
+        wav: float32 waveform
+        scale: Factor from peak_scale()
+        out: int16 array to write into (e.g. a view of the WAV buffer)
+
+    Returns:
+        The int16 samples (`out` if given)
+    """
+    if out is None:
+        out = np.empty(len(wav), dtype=np.int16)
+    # Computed in float32 and truncated on the way into the int16 output, like astype()
+    np.multiply(wav, np.float32(scale), out=out, casting='unsafe')
+    return out
+
+
+def audio_to_pcm16(wav) -> np.ndarray:
+    """Peak-normalize model output and convert it to 16-bit PCM."""
+    wav = as_float32(wav)
+    return quantize(wav, peak_scale(wav))
+
+
+def wav_header(num_samples: int, sample_rate: int) -> bytes:
+    """RIFF/WAVE header for mono 16-bit PCM."""
+    data_bytes = num_samples * 2
+    return (
+        struct.pack('<4sI4s', b'RIFF', 36 + data_bytes, b'WAVE') +
+        struct.pack('<4sIHHIIHH', b'fmt ', 16, 1, 1, sample_rate, sample_rate * 2, 2, 16) +
+        struct.pack('<4sI', b'data', data_bytes)
+    )
+
+
+def wav_stream_header(sample_rate: int) -> bytes:
+    """RIFF/WAVE header for mono 16-bit PCM of unknown length (streaming)."""
+    unknown = 0xFFFFFFFF
+    return (
+        struct.pack('<4sI4s', b'RIFF', unknown, b'WAVE') +
+        struct.pack('<4sIHHIIHH', b'fmt ', 16, 1, 1, sample_rate, sample_rate * 2, 2, 16) +
+        struct.pack('<4sI', b'data', unknown)
+    )
+
+
+def allocate_wav(num_samples: int, sample_rate: int) -> Tuple[bytearray, np.ndarray]:
+    """
+    Preallocate a WAV file with its header written.
+
+    Returns:
+        (buffer, int16 view of the sample area to quantize into)
+    """
+    buffer = bytearray(WAV_HEADER_BYTES + num_samples * 2)
+    buffer[:WAV_HEADER_BYTES] = wav_header(num_samples, sample_rate)
+    return buffer, np.frombuffer(buffer, dtype='<i2', offset=WAV_HEADER_BYTES)
+
+
+def encode_wav(pcm: np.ndarray, sample_rate: int) -> bytes:
+    """Wrap 16-bit PCM in a WAV header."""
+    return wav_header(len(pcm), sample_rate) + np.asarray(pcm, dtype='<i2').tobytes()
+
+
+def read_pcm16(wav_bytes: bytes) -> np.ndarray:
+    """16-bit PCM samples of a mono WAV file, as a read-only view of its bytes."""
+    if wav_bytes[:4] != b'RIFF' or wav_bytes[8:12] != b'WAVE':
+        raise ValueError("Not a RIFF/WAVE file")
+
+    offset = 12
+    while offset + 8 <= len(wav_bytes):
+        chunk_id, size = struct.unpack_from('<4sI', wav_bytes, offset)
+        offset += 8
+        if chunk_id == b'fmt ':
+            audio_format, channels, _, _, _, bits = struct.unpack_from('<HHIIHH', wav_bytes, offset)
+            if audio_format != 1 or channels != 1 or bits != 16:
+                raise ValueError("Only mono 16-bit PCM WAV is supported")
+        elif chunk_id == b'data':
+            size = min(size, len(wav_bytes) - offset) // 2 * 2
+            return np.frombuffer(wav_bytes, dtype='<i2', count=size // 2, offset=offset)
+        offset += size + (size & 1)
+    raise ValueError("WAV file has no data chunk")
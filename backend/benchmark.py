@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Synthesis Latency, Throughput and Worker Layout
+Suite mode loads a model the way the server does (load_model_from_path) and
+runs a fixed Plattdeutsch corpus across text-length buckets and synthesis
+presets. It reports cold start, per-stage timings, real-time factor,
+p50/p95/p99 latency and peak RSS, writes the result as JSON and compares it
+against a stored baseline (exit code 1 on regression).
+
+Autotune mode runs the model under every worker x thread combination that
+fits this instance, each worker pinned to its own cores like the gunicorn
+workers (see cpu_affinity.py), and reports per-request latency (p50/p99) and
+throughput so WEB_CONCURRENCY and TORCH_NUM_THREADS can be set from
+measurements instead of guesses.
+
+Usage:
+    python benchmark.py --model platt-v1 --output result.json
+    python benchmark.py --model-dir ../model --baseline baseline.json
+    python benchmark.py --autotune --model platt-v1
+    python benchmark.py --autotune --model platt-v1 --workers 1,2 --threads 1,2 --duration 30
+
+Autotune workers are forked from one process that loaded the model, as with
+PRELOAD_MODEL=true; each runs a closed loop over a fixed sentence set.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Fixed corpus, bucketed by input length (characters)
+CORPUS = {
+    'short': [
+        "Moin!",
+        "Wo geiht di dat?",
+        "Dat is good.",
+        "Kumm mal her!",
+    ],
+    'medium': [
+        "Hüüt is dat Wedder an de Küst good.",
+        "De Kinner speelt achter dat Huus in'n Goorn.",
+        "Ik heff di dat al gistern seggt, man du hest nich tohöört.",
+        "Wenn de Wind vun de Noordsee weiht, denn warrt dat op'n Diek gau koolt.",
+    ],
+    'long': [
+        "Mien Grootmoder hett jümmers seggt, dat en goden Kaffee an'n Morgen de halve Arbeit is, "
+        "un dat man sik för dat Fröhstück jümmers Tied nehmen schall.",
+        "De Schipper hett dat Boot fastmaakt, de Netten trechtleggt un is denn na Huus gahn, "
+        "wiel dat al düster weer un de Wind ümmer duller weiht hett.",
+    ],
+    'paragraph': [
+        "In'n Harvst warrt de Daag körter un de Nachten länger. De Bueren bringt de lesten Kantüffeln "
+        "in, un op de Feller sammelt sik de Göös för de lange Reis na'n Süden. In de Köök rüükt dat na "
+        "Appelkoken, un an'n Avend sitt de Familie tohoop un vertellt sik Geschichten vun fröher. "
+        "De Kinner höört to un fraagt jümmers wedder, wo dat denn würklich weer.",
+    ],
+}
+
+# /api/tts defaults and the presets offered by the frontend
+PRESETS = {
+    'default': {'length_scale': 1.03, 'noise_scale': 0.78, 'noise_scale_w': 0.92},
+    'warm': {'length_scale': 0.98, 'noise_scale': 0.80, 'noise_scale_w': 0.85},
+    'klar': {'length_scale': 0.95, 'noise_scale': 0.82, 'noise_scale_w': 0.80},
+    'dynamisch': {'length_scale': 1.02, 'noise_scale': 0.90, 'noise_scale_w': 0.95},
+    'erzaehler': {'length_scale': 1.03, 'noise_scale': 0.78, 'noise_scale_w': 0.82},
+}
+
+# Autotune runs the /api/tts defaults
+BENCHMARK_PARAMS = PRESETS['default']
+
+STAGES = ('normalize', 'phonemize', 'inference', 'pcm16', 'wav_encode')
+
+# Compared against the baseline: (path in the report, label)
+REGRESSION_METRICS = [
+    (('overall', 'p50_ms'), 'p50 latency'),
+    (('overall', 'p95_ms'), 'p95 latency'),
+    (('overall', 'p99_ms'), 'p99 latency'),
+    (('overall', 'rtf'), 'real-time factor'),
+    (('cold_start', 'load_seconds'), 'model load'),
+    (('cold_start', 'first_synthesis_seconds'), 'first synthesis'),
+    (('peak_rss_mb',), 'peak RSS'),
+] + [(('stages', stage, 'mean_ms'), f'{stage} stage') for stage in STAGES]
+
+
+def percentile(values, q: float) -> float:
+    return float(np.percentile(values, q)) if len(values) else 0.0
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+# =============================================================================
+# SUITE
+# =============================================================================
+
+def staged_synthesis(model, text: str, params: dict, timings: dict) -> bytes:
+    """
+    Run the /api/tts synthesis path stage by stage, adding seconds per stage
+    to `timings`. Returns the WAV bytes.
+    """
+    import application
+    from vits_inference import get_vits, infer_batch, text_to_ids
+
+    def timed(stage, fn, *args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+        return result
+
+    normalized = timed('normalize', application.normalize_text, text)
+    scales = (params['length_scale'], params['noise_scale'], params['noise_scale_w'])
+
+    waves = []
+    for sentence in application.split_sentences(normalized):
+        if getattr(model, 'engine', None) == 'onnx':
+            ids = timed('phonemize', model.frontend.text_to_ids, sentence)
+            wave = timed('inference', model.infer, ids, *scales)
+        elif get_vits(model) is not None:
+            ids = timed('phonemize', text_to_ids, model, sentence)
+            wave = timed('inference', infer_batch, model, [sentence], *scales, token_ids=[ids])[0]
+        else:
+            # Opaque model: front end and inference cannot be separated
+            timings.setdefault('phonemize', 0.0)
+            wave = timed('inference', model.tts, text=sentence, length_scale=scales[0],
+                         noise_scale=scales[1], noise_scale_w=scales[2])
+        if waves:
+            waves.append(np.zeros(application.SENTENCE_PAUSE_SAMPLES, dtype=np.float32))
+        waves.append(np.asarray(wave, dtype=np.float32))
+
+    pcm = timed('pcm16', application.audio_to_pcm16, np.concatenate(waves))
+    return timed('wav_encode', application.encode_wav, pcm, application.SAMPLE_RATE)
+
+
+def summarize(latencies: list, audio_seconds: float) -> dict:
+    return {
+        'requests': len(latencies),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        'mean_ms': round(float(np.mean(latencies)) * 1000, 1) if latencies else 0.0,
+        'audio_seconds': round(audio_seconds, 2),
+        'rtf': round(sum(latencies) / max(audio_seconds, 1e-6), 4)
+    }
+
+
+def measure_corpus(model, runs: int = 3, presets=None, buckets=None) -> dict:
+    """
+    Synthesize every corpus text with every preset `runs` times.
+
+    Returns:
+        Dictionary with overall, per bucket/preset and per stage results
+    """
+    import application
+
+    presets = presets or list(PRESETS)
+    buckets = buckets or list(CORPUS)
+    # Fixed noise per text for torch models (without importing torch for ONNX)
+    torch = sys.modules.get('torch')
+    seed = torch.manual_seed if torch is not None else None
+
+    all_latencies, all_audio = [], 0.0
+    stage_seconds = {stage: [] for stage in STAGES}
+    groups = []
+    for bucket in buckets:
+        for preset in presets:
+            latencies, audio_seconds = [], 0.0
+            for run in range(runs):
+                for index, text in enumerate(CORPUS[bucket]):
+                    if seed is not None:
+                        seed(index)
+                    timings = {}
+                    start = time.perf_counter()
+                    wav = staged_synthesis(application.tts_model if model is None else model,
+                                           text, PRESETS[preset], timings)
+                    latencies.append(time.perf_counter() - start)
+                    audio_seconds += (len(wav) - 44) / 2 / application.SAMPLE_RATE
+                    for stage in STAGES:
+                        stage_seconds[stage].append(timings.get(stage, 0.0))
+            groups.append(dict(summarize(latencies, audio_seconds), bucket=bucket, preset=preset,
+                               chars=int(np.mean([len(text) for text in CORPUS[bucket]]))))
+            all_latencies.extend(latencies)
+            all_audio += audio_seconds
+
+    total = sum(sum(values) for values in stage_seconds.values())
+    stages = {
+        stage: {
+            'mean_ms': round(float(np.mean(values)) * 1000, 3) if values else 0.0,
+            'p95_ms': round(percentile(values, 95) * 1000, 3),
+            'share': round(sum(values) / max(total, 1e-9), 4)
+        }
+        for stage, values in stage_seconds.items()
+    }
+    return {'overall': summarize(all_latencies, all_audio), 'groups': groups, 'stages': stages}
+
+
+def run_suite(model_dir: Path, runs: int = 3, presets=None, buckets=None, variant: str = 'float') -> dict:
+    """Cold-start the model like a worker does, then measure the corpus."""
+    import application
+    from cpu_affinity import available_cpus
+    from model_artifacts import ORIGINAL_CHECKPOINT, ORIGINAL_CONFIG
+
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    if not application.load_model_from_path(model_dir / ORIGINAL_CHECKPOINT,
+                                            model_dir / ORIGINAL_CONFIG, variant):
+        raise RuntimeError(f"Model failed to load: {application.model_info.get('error')}")
+    load_seconds = time.perf_counter() - start
+    rss_loaded = peak_rss_mb()
+
+    start = time.perf_counter()
+    application.warm_up_model(application.tts_model)
+    first_synthesis = time.perf_counter() - start
+
+    results = measure_corpus(None, runs, presets, buckets)
+    info = application.model_info
+    return dict(results, meta={
+        'model': info.get('name'),
+        'engine': info.get('engine', 'torch'),
+        'variant': info.get('variant', variant),
+        'fingerprint': info.get('fingerprint'),
+        'runs': runs,
+        'cpus': len(available_cpus()),
+        'threads': application.Config.TORCH_NUM_THREADS or None,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'created_at': datetime.now().isoformat()
+    }, cold_start={
+        'load_seconds': round(load_seconds, 3),
+        'first_synthesis_seconds': round(first_synthesis, 3),
+        'rss_after_load_mb': rss_loaded,
+        'rss_before_load_mb': rss_before
+    }, peak_rss_mb=peak_rss_mb())
+
+
+def compare_reports(result: dict, baseline: dict, tolerance: float = 0.1) -> list:
+    """
+    Compare a result against a baseline.
+
+    Args:
+        result: Report of this run
+        baseline: Stored report
+        tolerance: Allowed relative increase (0.1 = 10% slower/larger)
+
+    Returns:
+        One entry per metric present in both: label, baseline, current, change, regression
+    """
+    def lookup(report, path):
+        for key in path:
+            if not isinstance(report, dict) or key not in report:
+                return None
+            report = report[key]
+        return report
+
+    rows = []
+    for path, label in REGRESSION_METRICS:
+        old, new = lookup(baseline, path), lookup(result, path)
+        if old is None or new is None:
+            continue
+        change = (new - old) / old if old else 0.0
+        rows.append({'metric': label, 'baseline': old, 'current': new,
+                     'change': round(change, 4), 'regression': change > tolerance})
+    return rows
+
+
+def print_suite_report(report: dict):
+    meta, cold = report['meta'], report['cold_start']
+    print('=' * 72)
+    print(f"BENCHMARK: {meta['model']} ({meta['engine']}, {meta['variant']}, {meta['cpus']} CPUs, "
+          f"{meta['runs']} runs)")
+    print('=' * 72)
+    print(f"Cold start: load {cold['load_seconds']:.2f}s, first synthesis "
+          f"{cold['first_synthesis_seconds']:.2f}s, RSS after load {cold['rss_after_load_mb']:.0f} MB")
+    print(f"\n{'bucket':<10} {'preset':<10} {'chars':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'RTF':>7}")
+    for group in report['groups']:
+        print(f"{group['bucket']:<10} {group['preset']:<10} {group['chars']:>5} {group['p50_ms']:>9.1f} "
+              f"{group['p95_ms']:>9.1f} {group['p99_ms']:>9.1f} {group['rtf']:>7.3f}")
+    print(f"\n{'stage':<12} {'mean ms':>10} {'p95 ms':>10} {'share':>7}")
+    for stage, timing in report['stages'].items():
+        print(f"{stage:<12} {timing['mean_ms']:>10.2f} {timing['p95_ms']:>10.2f} {timing['share']:>7.1%}")
+    overall = report['overall']
+    print('-' * 72)
+    print(f"Overall: p50 {overall['p50_ms']:.0f} ms, p95 {overall['p95_ms']:.0f} ms, "
+          f"p99 {overall['p99_ms']:.0f} ms, RTF {overall['rtf']:.3f}, peak RSS {report['peak_rss_mb']:.0f} MB")
+
+
+def print_comparison(rows: list, tolerance: float):
+    print(f"\nBaseline comparison (tolerance {tolerance:.0%}):")
+    for row in rows:
+        mark = '✗' if row['regression'] else '✓'
+        print(f"  {mark} {row['metric']:<20} {row['baseline']:>10} -> {row['current']:>10} ({row['change']:+.1%})")
+
+
+# =============================================================================
+# AUTOTUNE
+# =============================================================================
+
+def candidate_layouts(num_cpus: int, workers=None, threads=None) -> list:
+    """Worker x thread combinations to try (by default: all that fit the CPUs)."""
+    if workers and threads:
+        return [(w, t) for w in workers for t in threads]
+
+    combos = []
+    for w in (workers or range(1, num_cpus + 1)):
+        per_worker = max(1, num_cpus // w)
+        options = threads or sorted({1, per_worker} | {2 ** i for i in range(8) if 2 ** i <= per_worker})
+        combos.extend((w, t) for t in options)
+    return combos
+
+
+def _autotune_worker(model, slot: int, num_workers: int, threads: int, sentences: list,
+                     duration: float, barrier, results):
+    """Forked worker: pin, warm up, then synthesize in a closed loop for `duration` seconds."""
+    import application
+    from cpu_affinity import worker_cpu_layout
+    from onnx_engine import set_num_threads as set_onnx_threads
+
+    layout = worker_cpu_layout(slot, num_workers, pin=True, num_threads=threads)
+    if getattr(model, 'engine', 'torch') == 'onnx':
+        set_onnx_threads(threads)
+    else:
+        application.configure_torch_threads(threads)
+    application.warm_up_model(model)
+
+    barrier.wait()
+    latencies, audio_seconds = [], 0.0
+    index = slot
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        wave = model.tts(text=sentences[index % len(sentences)], **BENCHMARK_PARAMS)
+        latencies.append(time.perf_counter() - start)
+        audio_seconds += len(wave) / application.SAMPLE_RATE
+        index += 1
+    results.put({'cpus': layout['cpus'], 'latencies': latencies, 'audio_seconds': audio_seconds})
+
+
+def run_layout(model, num_workers: int, threads: int, sentences: list, duration: float) -> dict:
+    """Measure one worker x thread combination."""
+    context = multiprocessing.get_context('fork')
+    barrier = context.Barrier(num_workers)
+    results = context.Queue()
+    processes = [context.Process(target=_autotune_worker,
+                                 args=(model, slot, num_workers, threads, sentences,
+                                       duration, barrier, results))
+                 for slot in range(num_workers)]
+    for process in processes:
+        process.start()
+    worker_results = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    latencies = [latency for result in worker_results for latency in result['latencies']]
+    audio_seconds = sum(result['audio_seconds'] for result in worker_results)
+    return {
+        'workers': num_workers,
+        'threads': threads,
+        'cpus': [result['cpus'] for result in worker_results],
+        'requests': len(latencies),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        'requests_per_second': round(len(latencies) / duration, 3),
+        'audio_seconds_per_second': round(audio_seconds / duration, 3)
+    }
+
+
+def run_autotune(model_dir: Path, duration: float, workers=None, threads=None) -> dict:
+    """Load the model once and measure every candidate layout."""
+    import application
+    from cpu_affinity import available_cpus
+    from model_artifacts import ORIGINAL_CHECKPOINT, ORIGINAL_CONFIG
+
+    # Single-threaded parent, as in the gunicorn master: thread pools do not survive fork()
+    if application.Config.TTS_ENGINE != 'onnx':
+        application.configure_torch_threads(1)
+
+    logger.info(f"Loading {model_dir.name}...")
+    model, info = application.build_model(model_dir / ORIGINAL_CHECKPOINT, model_dir / ORIGINAL_CONFIG)
+    sentences = [application.normalize_text(text) for bucket in ('short', 'medium', 'long')
+                 for text in CORPUS[bucket]]
+
+    cpus = available_cpus()
+    layouts = []
+    for num_workers, num_threads in candidate_layouts(len(cpus), workers, threads):
+        logger.info(f"Measuring {num_workers} worker(s) x {num_threads} thread(s) for {duration:.0f}s...")
+        layouts.append(run_layout(model, num_workers, num_threads, sentences, duration))
+
+    return {
+        'model': model_dir.name,
+        'engine': info.get('engine', 'torch'),
+        'cpus': cpus,
+        'duration': duration,
+        'layouts': layouts,
+        'best_throughput': max(layouts, key=lambda layout: layout['requests_per_second']),
+        'best_p50': min(layouts, key=lambda layout: layout['p50_ms']),
+        'best_p99': min(layouts, key=lambda layout: layout['p99_ms'])
+    }
+
+
+def print_autotune_report(report: dict):
+    print('=' * 72)
+    print(f"AUTOTUNE: {report['model']} ({report['engine']}, {len(report['cpus'])} CPUs, "
+          f"{report['duration']:.0f}s per layout)")
+    print('=' * 72)
+    print(f"{'workers':>7} {'threads':>7} {'requests':>8} {'p50 ms':>9} {'p99 ms':>9} "
+          f"{'req/s':>7} {'audio s/s':>9}")
+    for layout in report['layouts']:
+        print(f"{layout['workers']:>7} {layout['threads']:>7} {layout['requests']:>8} "
+              f"{layout['p50_ms']:>9.1f} {layout['p99_ms']:>9.1f} "
+              f"{layout['requests_per_second']:>7.2f} {layout['audio_seconds_per_second']:>9.2f}")
+    print('-' * 72)
+    for label, key in (('Throughput', 'best_throughput'), ('p50', 'best_p50'), ('p99', 'best_p99')):
+        best = report[key]
+        print(f"Best {label:<10}: WEB_CONCURRENCY={best['workers']} TORCH_NUM_THREADS={best['threads']} "
+              f"(p50 {best['p50_ms']:.0f} ms, p99 {best['p99_ms']:.0f} ms, "
+              f"{best['requests_per_second']:.2f} req/s)")
+
+
+def parse_list(value: str) -> list:
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def parse_int_list(value: str) -> list:
+    return [int(item) for item in parse_list(value)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark TTS serving on this instance')
+    parser.add_argument('--autotune', action='store_true',
+                        help='Try worker x thread combinations and report the best layout')
+    parser.add_argument('--model', help='Model name in MODEL_BASE_PATH/inactive')
+    parser.add_argument('--model-dir', help='Model directory (instead of --model)')
+    parser.add_argument('--base-path', help='Model base path (default: MODEL_BASE_PATH)')
+    parser.add_argument('--variant', default='float', choices=['float', 'int8'], help='Model variant')
+    parser.add_argument('--runs', type=int, default=3, help='Passes over the corpus per preset')
+    parser.add_argument('--presets', type=parse_list, help=f"Presets to run (default: {','.join(PRESETS)})")
+    parser.add_argument('--buckets', type=parse_list, help=f"Length buckets (default: {','.join(CORPUS)})")
+    parser.add_argument('--baseline', help='Compare against this stored result (exit 1 on regression)')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='Allowed relative regression')
+    parser.add_argument('--duration', type=float, default=20, help='Autotune: seconds measured per layout')
+    parser.add_argument('--workers', type=parse_int_list, help='Autotune: worker counts to try, e.g. 1,2')
+    parser.add_argument('--threads', type=parse_int_list, help='Autotune: threads per worker, e.g. 1,2')
+    parser.add_argument('--output', help='Write the report as JSON to this file')
+    args = parser.parse_args()
+
+    for name in (args.presets or []):
+        if name not in PRESETS:
+            parser.error(f"unknown preset: {name}")
+    for name in (args.buckets or []):
+        if name not in CORPUS:
+            parser.error(f"unknown bucket: {name}")
+
+    import_start = time.perf_counter()
+    import application
+    import_seconds = time.perf_counter() - import_start
+
+    if args.base_path:
+        application.Config.MODEL_BASE_PATH = args.base_path
+    if args.model_dir:
+        model_dir = Path(args.model_dir)
+    elif args.model:
+        model_dir = application.get_model_paths()['inactive'] / args.model
+    else:
+        parser.error('--model or --model-dir is required')
+    if not model_dir.is_dir():
+        print(f"✗ Model not found: {model_dir}")
+        sys.exit(1)
+
+    if args.autotune:
+        report = run_autotune(model_dir, max(1.0, args.duration), args.workers, args.threads)
+        print_autotune_report(report)
+    else:
+        report = run_suite(model_dir, max(1, args.runs), args.presets, args.buckets, args.variant)
+        report['cold_start']['import_seconds'] = round(import_seconds, 3)
+        print_suite_report(report)
+
+    regressions = []
+    if args.baseline and not args.autotune:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        rows = compare_reports(report, baseline, args.tolerance)
+        report['comparison'] = {'baseline': os.path.abspath(args.baseline),
+                                'tolerance': args.tolerance, 'metrics': rows}
+        print_comparison(rows, args.tolerance)
+        regressions = [row['metric'] for row in rows if row['regression']]
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n✓ Report written to {args.output}")
+
+    if regressions:
+        print(f"\n✗ Regression against baseline: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
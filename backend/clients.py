@@ -0,0 +1,102 @@
+"""
+API Clients - Identification for Fair Scheduling
+Services calling the API identify themselves with an API key in the
+X-API-Key header (or ?api_key=). Each configured client has a weight for
+its share of inference and a class: interactive clients are scheduled
+ahead of bulk clients. Requests without a key belong to the public client
+(the web frontend).
+
+Clients are configured in API_CLIENTS as comma-separated entries:
+    name:key[:weight[:bulk]]
+e.g. "reader-app:3f9c...:4,archive-import:a81d...:1:bulk"
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_CLIENT = 'public'
+
+
+class Client:
+    """A configured API consumer"""
+
+    __slots__ = ('name', 'key', 'weight', 'bulk')
+
+    def __init__(self, name: str, key: Optional[str] = None, weight: float = 1.0, bulk: bool = False):
+        self.name = name
+        self.key = key
+        self.weight = max(0.01, weight)
+        self.bulk = bulk
+
+    def to_dict(self) -> Dict:
+        return {'name': self.name, 'weight': self.weight, 'class': 'bulk' if self.bulk else 'interactive'}
+
+
+def parse_clients(spec: str) -> List[Client]:
+    """Parse API_CLIENTS entries (invalid entries are logged and skipped)."""
+    clients = []
+    for entry in (spec or '').split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        parts = entry.split(':')
+        try:
+            if len(parts) < 2 or not parts[0] or not parts[1] or parts[0] == PUBLIC_CLIENT:
+                raise ValueError("expected name:key[:weight[:bulk]]")
+            weight = float(parts[2]) if len(parts) > 2 and parts[2] else 1.0
+            if len(parts) > 3 and parts[3] not in ('bulk', 'interactive'):
+                raise ValueError(f"unknown class {parts[3]!r}")
+            clients.append(Client(parts[0], parts[1], weight, len(parts) > 3 and parts[3] == 'bulk'))
+        except ValueError as e:
+            logger.error(f"Ignoring API client entry {parts[0]!r}: {e}")
+    return clients
+
+
+class ClientRegistry:
+    """Maps API keys to clients"""
+
+    def __init__(self, spec: str = '', public_weight: float = 1.0):
+        """
+        Initialize registry.
+
+        Args:
+            spec: API_CLIENTS value
+            public_weight: Weight of requests without an API key
+        """
+        self.public = Client(PUBLIC_CLIENT, weight=public_weight)
+        self.clients = {client.name: client for client in parse_clients(spec)}
+        self._by_key = {client.key: client for client in self.clients.values()}
+
+    def identify(self, api_key: Optional[str]) -> Optional[Client]:
+        """Client of an API key: the public client without a key, None for an unknown key."""
+        if not api_key:
+            return self.public
+        return self._by_key.get(api_key)
+
+    def get(self, name: Optional[str]) -> Client:
+        """Client by name (the public client if unknown, e.g. removed since a job was queued)."""
+        return self.clients.get(name, self.public)
+
+    def all(self) -> List[Client]:
+        return [self.public] + sorted(self.clients.values(), key=lambda client: client.name)
+
+
+# Global client registry instance
+client_registry = None
+
+
+def init_clients(spec: str = '', public_weight: float = 1.0):
+    """Initialize the global client registry"""
+    global client_registry
+    client_registry = ClientRegistry(spec, public_weight)
+    logger.info(f"API clients initialized ({len(client_registry.clients)} configured)")
+
+
+def get_clients() -> ClientRegistry:
+    """Get the global client registry (initialize if needed)"""
+    global client_registry
+    if client_registry is None:
+        init_clients()
+    return client_registry
@@ -0,0 +1,226 @@
+"""
+Cost Model - Synthesis Latency from Text
+Predicts the inference seconds of a request before it runs, from its
+character count, its phoneme count (front-end tokens after espeak) and
+length_scale:
+
+    seconds = w0 + w1 * characters + w2 * phonemes + w3 * phonemes * length_scale
+
+The last term follows the decoder, which produces output frames in
+proportion to phoneme durations. Weights are refitted online from observed
+timings by exponentially weighted least squares, separately per model
+fingerprint and instance type, and shrunk towards the configured seconds
+per character so a fresh model starts from the old flat estimate.
+
+Fitted state is saved to a JSON file on the model volume, so restarted or
+new workers start from the last fit of their model and instance type.
+When the phoneme count is not known yet (ordering queued work before its
+front end ran, or no front end in this process), it is estimated from the
+characters with the observed phonemes-per-character ratio.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import platform
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FEATURES = ('intercept', 'characters', 'phonemes', 'phonemes_x_length_scale')
+_UNIT = np.array([1.0, 100.0, 100.0, 100.0])  # Features per 100 characters/phonemes keep the fit well conditioned
+
+
+def instance_type() -> str:
+    """Instance type of this host (INSTANCE_TYPE, or architecture and core count)."""
+    return os.environ.get('INSTANCE_TYPE') or f"{platform.machine()}-{os.cpu_count() or 1}cpu"
+
+
+def _features(characters: int, phonemes: float, length_scale: float) -> np.ndarray:
+    return np.array([1.0, characters, phonemes, phonemes * length_scale]) / _UNIT
+
+
+class _Fit:
+    """Online least-squares fit of one model on one instance type"""
+
+    def __init__(self, prior: np.ndarray, state: Optional[Dict] = None):
+        self.prior = prior
+        self.gram = np.zeros((len(FEATURES), len(FEATURES)))
+        self.moment = np.zeros(len(FEATURES))
+        self.observations = 0
+        self.phonemes_per_char = 1.0
+        self.mean_abs_error = None
+        if state:
+            self.gram = np.array(state['gram'], dtype=np.float64)
+            self.moment = np.array(state['moment'], dtype=np.float64)
+            self.observations = int(state['observations'])
+            self.phonemes_per_char = float(state['phonemes_per_char'])
+            self.mean_abs_error = state.get('mean_abs_error')
+        self.weights = self._solve()
+
+    def _solve(self) -> np.ndarray:
+        # Ridge towards the prior: solid with few (or collinear) observations
+        regularized = self.gram + np.eye(len(FEATURES))
+        return np.linalg.solve(regularized, self.moment + self.prior)
+
+    def predict(self, x: np.ndarray) -> float:
+        return max(0.0, float(x @ self.weights))
+
+    def observe(self, x: np.ndarray, seconds: float, forgetting: float, smoothing: float):
+        error = abs(self.predict(x) - seconds)
+        self.mean_abs_error = error if self.mean_abs_error is None else \
+            self.mean_abs_error + smoothing * (error - self.mean_abs_error)
+        # Older timings fade out, so the fit follows load and thermal changes of the instance
+        self.gram = forgetting * self.gram + np.outer(x, x)
+        self.moment = forgetting * self.moment + x * seconds
+        self.observations += 1
+        self.weights = self._solve()
+
+    def to_dict(self) -> Dict:
+        return {
+            'gram': self.gram.tolist(),
+            'moment': self.moment.tolist(),
+            'observations': self.observations,
+            'phonemes_per_char': self.phonemes_per_char,
+            'mean_abs_error': self.mean_abs_error
+        }
+
+
+class CostModel:
+    """Predicts synthesis seconds per model and instance type, refitted from observed timings"""
+
+    def __init__(self, state_path: Optional[str] = None, seconds_per_char: float = 0.01,
+                 forgetting: float = 0.98, save_every: int = 20, instance: Optional[str] = None):
+        """
+        Initialize cost model.
+
+        Args:
+            state_path: JSON file with fitted state of all models and instance types (None = not saved)
+            seconds_per_char: Prior cost per character, used until timings are observed
+            forgetting: Weight of the previous fit per new observation (1.0 = never forget)
+            save_every: Observations between saves of the fitted state
+            instance: Instance type (default: instance_type())
+        """
+        self.state_path = Path(state_path) if state_path else None
+        self.seconds_per_char = seconds_per_char
+        self.forgetting = forgetting
+        self.save_every = max(1, save_every)
+        self.instance = instance or instance_type()
+
+        self._prior = np.array([0.0, seconds_per_char, 0.0, 0.0]) * _UNIT
+        self._lock = threading.Lock()
+        self._fits = {}
+        self._unsaved = 0
+
+    def _key(self, model: Optional[str]) -> str:
+        return f"{model or 'unknown'}|{self.instance}"
+
+    def _fit(self, model: Optional[str]) -> _Fit:
+        key = self._key(model)
+        fit = self._fits.get(key)
+        if fit is None:
+            fit = self._fits[key] = _Fit(self._prior, self._load().get(key))
+        return fit
+
+    def _load(self) -> Dict:
+        if self.state_path is None or not self.state_path.exists():
+            return {}
+        try:
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read cost model state: {e}")
+            return {}
+
+    def _save(self):
+        """Write this worker's fits into the state file, keeping the other entries."""
+        temp_path = self.state_path.parent / f".{self.state_path.name}.{os.getpid()}.tmp"
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            # Other workers save their fits into the same file: no update may get lost in between
+            with open(self.state_path.parent / f"{self.state_path.name}.lock", 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    state = self._load()
+                    state.update({key: fit.to_dict() for key, fit in self._fits.items() if fit.observations})
+                    with open(temp_path, 'w') as f:
+                        json.dump(state, f)
+                    os.replace(temp_path, self.state_path)
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        except OSError as e:
+            logger.warning(f"Could not save cost model state: {e}")
+
+    def predict(self, model: Optional[str], characters: int, length_scale: float = 1.0,
+                phonemes: Optional[int] = None) -> float:
+        """
+        Predicted inference seconds.
+
+        Args:
+            model: Model fingerprint
+            characters: Length of the normalized text
+            length_scale: Clamped synthesis parameter
+            phonemes: Front-end tokens (estimated from characters if None)
+        """
+        with self._lock:
+            fit = self._fit(model)
+            if phonemes is None:
+                phonemes = characters * fit.phonemes_per_char
+            return fit.predict(_features(characters, phonemes, length_scale))
+
+    def estimate_phonemes(self, model: Optional[str], characters: int) -> float:
+        """Phoneme count expected for a text of this length."""
+        with self._lock:
+            return characters * self._fit(model).phonemes_per_char
+
+    def observe(self, model: Optional[str], characters: int, phonemes: int, length_scale: float,
+                seconds: float):
+        """Refit with the measured inference time of one synthesis."""
+        if characters <= 0 or phonemes <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            fit = self._fit(model)
+            fit.observe(_features(characters, phonemes, length_scale), seconds, self.forgetting,
+                        1 - self.forgetting)
+            fit.phonemes_per_char += (1 - self.forgetting) * (phonemes / characters - fit.phonemes_per_char)
+            self._unsaved += 1
+            if self.state_path is not None and self._unsaved >= self.save_every:
+                self._unsaved = 0
+                self._save()
+
+    def get_stats(self, model: Optional[str] = None) -> Dict:
+        """Fitted weights (seconds per unit) and accuracy for a model on this instance type"""
+        with self._lock:
+            fit = self._fit(model)
+            return {
+                'instance_type': self.instance,
+                'observations': fit.observations,
+                'weights': {name: round(float(weight), 6)
+                            for name, weight in zip(FEATURES, fit.weights / _UNIT)},
+                'phonemes_per_char': round(fit.phonemes_per_char, 4),
+                'mean_abs_error_seconds': round(fit.mean_abs_error, 4) if fit.mean_abs_error is not None else None
+            }
+
+
+# Global cost model instance
+cost_model = None
+
+
+def init_cost_model(state_path: Optional[str] = None, seconds_per_char: float = 0.01, **kwargs):
+    """Initialize the global cost model"""
+    global cost_model
+    cost_model = CostModel(state_path, seconds_per_char, **kwargs)
+    logger.info(f"Cost model initialized (instance={cost_model.instance}, prior={seconds_per_char}s/char)")
+
+
+def get_cost_model() -> CostModel:
+    """Get the global cost model (initialize if needed)"""
+    global cost_model
+    if cost_model is None:
+        init_cost_model()
+    return cost_model
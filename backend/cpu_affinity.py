@@ -0,0 +1,86 @@
+"""
+CPU Affinity - Worker Core Layout
+Splits the CPUs this process may run on into disjoint sets, one per
+gunicorn worker, so torch/ONNX Runtime thread pools of different workers
+do not compete for the same cores. Each worker runs as many intra-op
+threads as it has cores. With more workers than cores, workers get one
+core each, assigned round-robin.
+"""
+
+import logging
+import os
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def available_cpus() -> List[int]:
+    """CPUs this process may run on (respects cgroup/taskset restrictions)."""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def plan_cpu_layout(num_workers: int, cpus: Optional[List[int]] = None) -> List[List[int]]:
+    """
+    Assign each worker slot a set of CPUs.
+
+    Args:
+        num_workers: Number of worker slots
+        cpus: CPUs to distribute (default: available_cpus())
+
+    Returns:
+        One CPU list per slot; disjoint as long as num_workers <= len(cpus)
+    """
+    cpus = list(cpus if cpus is not None else available_cpus())
+    num_workers = max(1, num_workers)
+    if num_workers >= len(cpus):
+        return [[cpus[slot % len(cpus)]] for slot in range(num_workers)]
+
+    # Contiguous blocks keep a worker's threads on neighbouring cores; the
+    # first slots get one extra core when the split is uneven
+    size, extra = divmod(len(cpus), num_workers)
+    layout, start = [], 0
+    for slot in range(num_workers):
+        end = start + size + (1 if slot < extra else 0)
+        layout.append(cpus[start:end])
+        start = end
+    return layout
+
+
+def pin_to_cpus(cpus: List[int]) -> bool:
+    """Restrict this process (and threads it starts later) to the given CPUs."""
+    if not hasattr(os, 'sched_setaffinity'):
+        return False
+    try:
+        os.sched_setaffinity(0, cpus)
+        return True
+    except OSError as e:
+        logger.warning(f"Could not pin pid {os.getpid()} to CPUs {cpus}: {e}")
+        return False
+
+
+def worker_cpu_layout(slot: int, num_workers: int, pin: bool = True,
+                      num_threads: int = 0) -> Dict:
+    """
+    Pin a worker to its CPU set and work out its thread count.
+
+    Args:
+        slot: Worker slot (0..num_workers-1)
+        num_workers: Number of worker slots
+        pin: Set the CPU affinity (False only computes the layout)
+        num_threads: Intra-op threads (0 = number of CPUs in the set)
+
+    Returns:
+        Layout dictionary: slot, workers, cpus, pinned, threads
+    """
+    layout = plan_cpu_layout(num_workers)
+    cpus = layout[slot % len(layout)]
+    pinned = pin_to_cpus(cpus) if pin else False
+    return {
+        'slot': slot,
+        'workers': num_workers,
+        'cpus': cpus,
+        'pinned': pinned,
+        'threads': num_threads or len(cpus)
+    }
@@ -0,0 +1,405 @@
+"""
+Disk Audio Cache - Persistent Packed Store
+Keeps synthesized audio on the persistent model volume so it survives
+gunicorn restarts and rolling deployments.
+
+Audio is appended to large segment files instead of one file per clip;
+a small SQLite index maps cache keys to (segment, offset, length).
+Space is reclaimed by evicting whole segments (oldest first, recently
+used entries get a second chance) and by compacting sparse segments.
+Safe to share between gunicorn workers on the same instance.
+"""
+
+import fcntl
+import hashlib
+import logging
+import os
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Optional, Dict
+
+logger = logging.getLogger(__name__)
+
+# Record header: magic, sha256(key), payload length, crc32(payload)
+RECORD_HEADER = struct.Struct('<4s32sII')
+RECORD_MAGIC = b'PTAC'
+
+
+class DiskAudioCache:
+    """Append-only segment store with a compact index and size-based eviction"""
+
+    def __init__(self, base_path: str, max_bytes: int = 2 * 1024 * 1024 * 1024,
+                 segment_bytes: int = 64 * 1024 * 1024, compact_ratio: float = 0.5):
+        """
+        Initialize disk cache. Nothing is touched on disk until first use.
+
+        Args:
+            base_path: Directory holding the index and segment files
+            max_bytes: Maximum total size of all segments (0 disables caching)
+            segment_bytes: Size at which a new segment file is started
+            compact_ratio: Sealed segments with less live data than this are compacted
+        """
+        self.base_path = Path(base_path)
+        self.segments_dir = self.base_path / "segments"
+        self.index_file = self.base_path / "index.sqlite3"
+        self.lock_file = self.base_path / "write.lock"
+        self.max_bytes = max_bytes
+        # A segment larger than the budget could never be evicted while it is active
+        self.segment_bytes = min(segment_bytes, max_bytes) if max_bytes > 0 else segment_bytes
+        self.compact_ratio = compact_ratio
+
+        self._local = threading.local()
+        self._ready = False
+        self._disabled = max_bytes <= 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # -------------------------------------------------------------------------
+    # Internal helpers
+    # -------------------------------------------------------------------------
+
+    def _connect(self, create: bool = True) -> Optional[sqlite3.Connection]:
+        """Get a connection for this thread/process (opening the store if needed)"""
+        if self._disabled:
+            return None
+        if not create and not self._ready and not self.index_file.exists():
+            return None
+
+        # Connections must not cross fork() or threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        try:
+            self.segments_dir.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.index_file), timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if not self._ready:
+                conn.executescript("""
+                    CREATE TABLE IF NOT EXISTS segments (
+                        id INTEGER PRIMARY KEY,
+                        created REAL NOT NULL,
+                        bytes INTEGER NOT NULL DEFAULT 0
+                    );
+                    CREATE TABLE IF NOT EXISTS entries (
+                        key TEXT PRIMARY KEY,
+                        model TEXT,
+                        segment INTEGER NOT NULL,
+                        offset INTEGER NOT NULL,
+                        length INTEGER NOT NULL,
+                        accessed REAL NOT NULL
+                    );
+                    CREATE INDEX IF NOT EXISTS entries_segment ON entries(segment);
+                    CREATE INDEX IF NOT EXISTS entries_model ON entries(model);
+                """)
+                conn.commit()
+                self._ready = True
+        except Exception as e:
+            logger.error(f"Disk cache unavailable at {self.base_path}: {e}")
+            self._disabled = True
+            return None
+
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _segment_path(self, segment_id: int) -> Path:
+        return self.segments_dir / f"seg-{segment_id:08d}.dat"
+
+    def _write_lock(self):
+        """Exclusive inter-process lock for appends, eviction and compaction"""
+        return _FileLock(self.lock_file)
+
+    def _current_segment(self, conn: sqlite3.Connection, incoming: int) -> int:
+        """Return the segment to append to, starting a new one when full"""
+        row = conn.execute("SELECT id, bytes FROM segments ORDER BY id DESC LIMIT 1").fetchone()
+        if row is not None and row[1] + incoming <= self.segment_bytes:
+            # Sealed segments make room while the active one grows
+            self._enforce_budget(conn, row[0], incoming)
+            return row[0]
+
+        segment_id = (row[0] + 1) if row is not None else 1
+        conn.execute("INSERT INTO segments (id, created, bytes) VALUES (?, ?, 0)",
+                     (segment_id, time.time()))
+
+        # A segment was sealed - good moment to reclaim space
+        if row is not None:
+            self._enforce_budget(conn, segment_id, incoming)
+            self._compact_sealed(conn, segment_id)
+        return segment_id
+
+    def _append(self, conn: sqlite3.Connection, segment_id: int, key: str, audio: bytes) -> int:
+        """Append one record to a segment and return the payload offset"""
+        digest = hashlib.sha256(key.encode('utf-8')).digest()
+        header = RECORD_HEADER.pack(RECORD_MAGIC, digest, len(audio), zlib.crc32(audio))
+        with open(self._segment_path(segment_id), 'ab') as f:
+            start = f.tell()
+            f.write(header)
+            f.write(audio)
+        conn.execute("UPDATE segments SET bytes = bytes + ? WHERE id = ?",
+                     (len(header) + len(audio), segment_id))
+        return start + RECORD_HEADER.size
+
+    def _read(self, segment_id: int, offset: int, length: int, key: str) -> Optional[bytes]:
+        """Read and verify one record payload"""
+        try:
+            with open(self._segment_path(segment_id), 'rb') as f:
+                f.seek(offset - RECORD_HEADER.size)
+                header = f.read(RECORD_HEADER.size)
+                audio = f.read(length)
+        except FileNotFoundError:
+            # Segment was evicted or compacted concurrently
+            return None
+
+        if len(header) != RECORD_HEADER.size or len(audio) != length:
+            return None
+        magic, digest, size, crc = RECORD_HEADER.unpack(header)
+        if (magic != RECORD_MAGIC or size != length or zlib.crc32(audio) != crc
+                or digest != hashlib.sha256(key.encode('utf-8')).digest()):
+            logger.warning(f"Disk cache record corrupt in segment {segment_id}")
+            return None
+        return audio
+
+    def _relocate(self, conn: sqlite3.Connection, rows, target_segment: int):
+        """Copy live entries into the target segment and repoint the index"""
+        for key, segment_id, offset, length in rows:
+            audio = self._read(segment_id, offset, length, key)
+            if audio is None:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                continue
+            new_offset = self._append(conn, target_segment, key, audio)
+            conn.execute("UPDATE entries SET segment = ?, offset = ? WHERE key = ?",
+                         (target_segment, new_offset, key))
+
+    def _drop_segment(self, conn: sqlite3.Connection, segment_id: int):
+        conn.execute("DELETE FROM segments WHERE id = ?", (segment_id,))
+        try:
+            self._segment_path(segment_id).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _enforce_budget(self, conn: sqlite3.Connection, current: int, incoming: int):
+        """Evict oldest segments until the store fits the byte budget"""
+        while True:
+            total = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM segments").fetchone()[0]
+            if total + incoming <= self.max_bytes:
+                return
+
+            oldest = conn.execute(
+                "SELECT id FROM segments WHERE id != ? ORDER BY id LIMIT 1", (current,)
+            ).fetchone()
+            if oldest is None:
+                return
+            oldest_id = oldest[0]
+
+            # Second chance: entries read after the segment was sealed move forward
+            sealed_at = conn.execute(
+                "SELECT created FROM segments WHERE id > ? ORDER BY id LIMIT 1", (oldest_id,)
+            ).fetchone()[0]
+            hot = conn.execute(
+                "SELECT key, segment, offset, length FROM entries WHERE segment = ? AND accessed > ?",
+                (oldest_id, sealed_at)
+            ).fetchall()
+            hot_bytes = sum(r[3] + RECORD_HEADER.size for r in hot)
+            if hot and total - self._segment_size(conn, oldest_id) + hot_bytes + incoming <= self.max_bytes:
+                self._relocate(conn, hot, current)
+
+            evicted = conn.execute("DELETE FROM entries WHERE segment = ?", (oldest_id,)).rowcount
+            self.evictions += evicted
+            self._drop_segment(conn, oldest_id)
+            logger.info(f"Disk cache evicted segment {oldest_id} ({evicted} entries)")
+
+    def _segment_size(self, conn: sqlite3.Connection, segment_id: int) -> int:
+        row = conn.execute("SELECT bytes FROM segments WHERE id = ?", (segment_id,)).fetchone()
+        return row[0] if row else 0
+
+    def _compact_sealed(self, conn: sqlite3.Connection, current: int):
+        """Rewrite sealed segments whose live data dropped below compact_ratio"""
+        rows = conn.execute("""
+            SELECT s.id, s.bytes, COALESCE(SUM(e.length), 0) + COUNT(e.key) * ?
+            FROM segments s LEFT JOIN entries e ON e.segment = s.id
+            WHERE s.id != ?
+            GROUP BY s.id
+        """, (RECORD_HEADER.size, current)).fetchall()
+
+        for segment_id, size, live in rows:
+            if size and live / size < self.compact_ratio:
+                live_rows = conn.execute(
+                    "SELECT key, segment, offset, length FROM entries WHERE segment = ?",
+                    (segment_id,)
+                ).fetchall()
+                self._relocate(conn, live_rows, current)
+                self._drop_segment(conn, segment_id)
+                logger.info(f"Disk cache compacted segment {segment_id} ({len(live_rows)} live entries)")
+
+    # -------------------------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached audio for key (or None)"""
+        conn = self._connect(create=False)
+        if conn is None:
+            self.misses += 1
+            return None
+
+        try:
+            row = conn.execute(
+                "SELECT segment, offset, length, accessed FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            audio = self._read(row[0], row[1], row[2], key) if row else None
+            if audio is None:
+                self.misses += 1
+                return None
+
+            # Access times only steer eviction - avoid a write on every hit
+            now = time.time()
+            if now - row[3] > 60:
+                conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+                conn.commit()
+            self.hits += 1
+            return audio
+        except sqlite3.Error as e:
+            logger.error(f"Disk cache lookup failed: {e}")
+            self.misses += 1
+            return None
+
+    def put(self, key: str, audio: bytes, model_name: Optional[str] = None):
+        """
+        Store audio under key.
+
+        Args:
+            key: Cache key (see AudioCache.make_key)
+            audio: Encoded audio bytes
+            model_name: Model the audio was produced with (scopes the entry)
+        """
+        if not audio or len(audio) + RECORD_HEADER.size > self.max_bytes:
+            return
+        conn = self._connect()
+        if conn is None:
+            return
+
+        try:
+            with self._write_lock():
+                segment_id = self._current_segment(conn, len(audio) + RECORD_HEADER.size)
+                offset = self._append(conn, segment_id, key, audio)
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, model, segment, offset, length, accessed) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model_name, segment_id, offset, len(audio), time.time())
+                )
+                conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            conn.rollback()
+            logger.error(f"Disk cache write failed: {e}")
+
+    def drop_model(self, model_name: str) -> int:
+        """
+        Forget all entries produced by a model. Space is reclaimed by compaction.
+
+        Returns:
+            Number of entries removed
+        """
+        conn = self._connect(create=False)
+        if conn is None:
+            return 0
+
+        try:
+            with self._write_lock():
+                removed = conn.execute("DELETE FROM entries WHERE model = ?", (model_name,)).rowcount
+                conn.commit()
+            if removed:
+                logger.info(f"Disk cache dropped {removed} entries for model {model_name}")
+            return removed
+        except sqlite3.Error as e:
+            logger.error(f"Disk cache drop failed: {e}")
+            return 0
+
+    def compact(self):
+        """Compact sparse segments and enforce the byte budget now"""
+        conn = self._connect()
+        if conn is None:
+            return
+
+        try:
+            with self._write_lock():
+                current = self._current_segment(conn, 0)
+                self._enforce_budget(conn, current, 0)
+                self._compact_sealed(conn, current)
+                conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            conn.rollback()
+            logger.error(f"Disk cache compaction failed: {e}")
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        stats = {
+            'enabled': not self._disabled,
+            'path': str(self.base_path),
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+        conn = self._connect(create=False)
+        if conn is None:
+            return stats
+
+        try:
+            entries, live = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM entries"
+            ).fetchone()
+            segments, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM segments"
+            ).fetchone()
+            stats.update({'entries': entries, 'live_bytes': live,
+                          'segments': segments, 'bytes': size})
+        except sqlite3.Error as e:
+            logger.error(f"Disk cache stats failed: {e}")
+        return stats
+
+
+class _FileLock:
+    """Context manager around an exclusive flock()"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._fd = None
+
+    def __enter__(self):
+        self._fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+        return False
+
+
+# Global disk cache instance
+disk_cache = None
+
+
+def init_disk_cache(base_path: str = "./models/audio_cache", max_bytes: int = 2 * 1024 * 1024 * 1024,
+                    segment_bytes: int = 64 * 1024 * 1024):
+    """Initialize the global disk cache"""
+    global disk_cache
+    disk_cache = DiskAudioCache(base_path, max_bytes, segment_bytes)
+    logger.info(f"Disk cache initialized at {base_path} (budget: {max_bytes} bytes)")
+
+
+def get_disk_cache() -> DiskAudioCache:
+    """Get the global disk cache (initialize if needed)"""
+    global disk_cache
+    if disk_cache is None:
+        init_disk_cache()
+    return disk_cache
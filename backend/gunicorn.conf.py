@@ -3,6 +3,17 @@
 
 import os
 import multiprocessing
+import tempfile
+
+# Prometheus samples of all workers are collected here and summed on /metrics.
+# Must be set before the app (and prometheus_client) is imported; samples of
+# a previous run are removed
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR",
+                      os.path.join(tempfile.gettempdir(), "plattdeutsch-tts-metrics"))
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+for _name in os.listdir(os.environ["PROMETHEUS_MULTIPROC_DIR"]):
+    if _name.endswith(".db"):
+        os.remove(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], _name))
 
 # Server socket
 bind = "0.0.0.0:" + os.environ.get("PORT", "5000")
@@ -11,12 +22,21 @@ backlog = 2048
 # Worker processes
 # For TTS (CPU-intensive), use fewer workers with more threads
 workers = int(os.environ.get("WEB_CONCURRENCY", 2))
-worker_class = "sync"  # Use sync for CPU-bound TTS operations
-threads = 1  # Single thread per worker for TTS
+# gthread front tier: HTTP threads only wait for the worker's inference pool
+# (INFERENCE_WORKERS threads run the model). At most INFERENCE_MAX_PENDING
+# threads are taken by synthesis requests, the rest answer /api/health,
+# /api/status and static files even while inference is saturated
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+worker_class = "gthread"
+inference_max_pending = int(os.environ.get("INFERENCE_MAX_PENDING", max(1, threads - 2)))
 worker_connections = 1000
 timeout = 120  # TTS generation can take time
 keepalive = 5
 
+# Load the active model once in the master; workers share its weights
+# copy-on-write and a respawned worker starts without reloading from disk
+preload_app = os.environ.get("PRELOAD_MODEL", "true").lower() == "true"
+
 # Spew (debugging) - keep False in production
 spew = False
 
@@ -41,7 +61,27 @@ proc_name = "plattdeutsch-tts"
 # Server hooks
 def on_starting(server):
     """Called before master process is initialized."""
-    pass
+    if threads <= inference_max_pending:
+        server.log.warning(f"GUNICORN_THREADS={threads} leaves no thread for health checks "
+                           f"(INFERENCE_MAX_PENDING={inference_max_pending}); "
+                           f"raise it to at least {inference_max_pending + 1}")
+    # Outstanding work of the previous run's workers is not coming back
+    from admission import reset_state, STATE_FILE
+    reset_state(os.path.join(os.environ.get("MODEL_BASE_PATH", "/var/app/models"), STATE_FILE))
+    if int(os.environ.get("INFERENCE_PROCESSES", 0)) > 0:
+        # Model replicas in their own processes (forked before the workers, which
+        # connect to their supervisor); web workers stay light
+        import application
+        application.start_inference_processes()
+    elif preload_app:
+        # The app module is already imported by the master when preloading
+        import application
+        application.preload_active_model()
+
+def on_exit(server):
+    """Called just before exiting gunicorn."""
+    import application
+    application.stop_inference_processes()
 
 def on_reload(server):
     """Called when USR1 is received."""
@@ -57,20 +97,32 @@ def worker_abort(worker):
 
 def pre_fork(server, worker):
     """Called just before a worker is forked."""
-    pass
+    # Give the worker the lowest free slot; a respawned worker takes over
+    # the cores of the one it replaces
+    used = {getattr(w, "cpu_slot", None) for w in server.WORKERS.values()}
+    worker.cpu_slot = next(slot for slot in range(len(used) + 1) if slot not in used)
 
 def post_fork(server, worker):
     """Called just after a worker has been forked."""
-    pass
+    # Disjoint core set per worker, inference threads sized to match
+    import application
+    application.configure_worker_cpus(worker.cpu_slot, workers)
 
 def post_worker_init(worker):
     """Called just after a worker has initialized."""
-    pass
+    import application
+    application.init_worker(workers)
 
 def worker_exit(server, worker):
     """Called just after a worker has exited."""
     pass
 
+def child_exit(server, worker):
+    """Called in the master after a worker has exited."""
+    # Drop the worker's live gauges (in-flight requests, model state)
+    from metrics import mark_worker_dead
+    mark_worker_dead(worker.pid)
+
 def nworkers_changed(server, new_value, old_value):
     """Called when worker count changes."""
     pass
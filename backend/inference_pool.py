@@ -0,0 +1,374 @@
+"""
+Inference Pool - Synthesis off the HTTP Threads
+Model calls run on a small per-worker set of inference threads instead of
+the request thread, and synthesis requests are admitted against a fixed
+number of slots. The remaining gthread threads of the worker are never
+occupied by synthesis, so health checks, status and static files are
+answered while every inference slot is busy.
+
+    HTTP threads (GUNICORN_THREADS)
+      ├─ up to max_pending synthesis requests, waiting in the fair queue
+      └─ the rest: /api/health, /api/status, frontend
+    inference threads (max_workers) -> model.tts()
+
+Waiting model calls are ordered by start-time fair queuing: every client
+gets a share of inference proportional to its weight, whatever its request
+rate, and interactive calls go ahead of bulk ones. Bulk work keeps a
+minimum share of inference (bulk_share of the predicted seconds) while
+both are waiting, so batch chunks and job sentences do not starve under
+steady interactive load. Within one client, interactive calls run
+shortest job first (by predicted cost), so a short sentence is not stuck
+behind a long article; bulk calls keep their order.
+"""
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import copy_context
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE, BULK = 0, 1
+STATS_WINDOW = 60.0  # Seconds of history behind per-client rates and waits
+
+
+class PoolBusy(Exception):
+    """Raised when all synthesis slots of this worker are taken"""
+
+
+class _Call:
+    """One model call waiting for an inference thread"""
+
+    __slots__ = ('fn', 'context', 'client', 'cost', 'enqueued_at', 'started_at', 'done', 'result',
+                 'error', 'cancelled', 'holds_slot')
+
+    def __init__(self, fn: Callable, context, client: str, cost: float):
+        self.fn = fn
+        self.context = context
+        self.client = client
+        self.cost = cost
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.cancelled = False
+        self.holds_slot = False  # Outlived its caller: keeps a synthesis slot until it finishes
+
+
+class _ClientStats:
+    """Recent calls of one client in this worker"""
+
+    __slots__ = ('requests', 'queued', 'running', 'recent')
+
+    def __init__(self):
+        self.requests = 0
+        self.queued = 0
+        self.running = 0
+        self.recent = deque()  # (started_at, queue wait)
+
+    def trim(self, now: float):
+        while self.recent and self.recent[0][0] < now - STATS_WINDOW:
+            self.recent.popleft()
+
+
+class _Flow:
+    """Waiting calls of one client in one class"""
+
+    __slots__ = ('calls', 'weight', 'finish', 'scheduled')
+
+    def __init__(self):
+        self.calls = []  # (order, seq, call)
+        self.weight = 1.0
+        self.finish = 0.0  # Finish tag of the flow's last dispatched call
+        self.scheduled = False
+
+
+class InferencePool:
+    """Runs model calls on bounded inference threads in weighted fair order"""
+
+    def __init__(self, max_workers: int = 1, max_pending: int = 4, bulk_share: float = 0.1):
+        """
+        Initialize pool. The inference threads start on first use.
+
+        Args:
+            max_workers: Model calls running concurrently in this worker
+            max_pending: Synthesis requests admitted at once (running + waiting);
+                must stay below the gunicorn thread count
+            bulk_share: Minimum share of inference seconds for bulk calls while
+                interactive calls are waiting too (0 = bulk only runs when idle)
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self.bulk_share = min(max(bulk_share, 0.0), 0.9)
+
+        self._cond = threading.Condition()
+        self._threads = []
+        self._pid = None
+        self._admitted = 0
+        self._running = 0
+        self._queues = ([], [])  # per class: (start tag, seq, flow key) per flow with waiting calls
+        self._bulk_credit = 0.0  # Inference seconds bulk calls have earned while interactive ones ran
+        self._seq = itertools.count()
+        self._virtual_time = [0.0, 0.0]  # per class
+        self._flows = {}  # (class, client) -> _Flow
+        self._clients = {}
+
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def _ensure_threads(self):
+        """Start the inference threads (again after fork, threads do not survive it)"""
+        if self._threads and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._admitted = self._running = 0
+        self._queues = ([], [])
+        self._bulk_credit = 0.0
+        self._virtual_time = [0.0, 0.0]
+        self._flows = {}
+        self._clients = {}
+        self._threads = [threading.Thread(target=self._work, name=f'inference-{index}', daemon=True)
+                         for index in range(self.max_workers)]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Inference pool started (workers={self.max_workers}, "
+                    f"max_pending={self.max_pending})")
+
+    # ------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------
+
+    def try_admit(self) -> bool:
+        """Take a synthesis slot without waiting. Returns False if the pool is full."""
+        with self._cond:
+            self._ensure_threads()
+            if self._admitted >= self.max_pending:
+                self.rejected += 1
+                return False
+            self._admitted += 1
+            return True
+
+    def release(self):
+        """Return a slot taken with try_admit()."""
+        with self._cond:
+            if self._pid == os.getpid():
+                self._admitted = max(0, self._admitted - 1)
+
+    @contextmanager
+    def admit(self):
+        """Hold a synthesis slot for the block (raises PoolBusy if none is free)."""
+        if not self.try_admit():
+            raise PoolBusy("All inference slots are busy")
+        try:
+            yield
+        finally:
+            self.release()
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def _client_stats(self, client: str) -> _ClientStats:
+        stats = self._clients.get(client)
+        if stats is None:
+            stats = self._clients[client] = _ClientStats()
+        return stats
+
+    def _schedule(self, key):
+        """Queue a flow for its next call: start tag = max(virtual time, its last finish tag)"""
+        flow = self._flows[key]
+        while flow.calls and flow.calls[0][2].cancelled:
+            heapq.heappop(flow.calls)
+        flow.scheduled = bool(flow.calls)
+        if flow.scheduled:
+            start = max(self._virtual_time[key[0]], flow.finish)
+            heapq.heappush(self._queues[key[0]], (start, next(self._seq), key))
+
+    def _next_class(self) -> int:
+        """Interactive, unless bulk calls have earned their share of inference"""
+        interactive, bulk = self._queues
+        if not bulk:
+            self._bulk_credit = 0.0
+            return INTERACTIVE
+        if not interactive:
+            return BULK
+        flow = self._flows[bulk[0][2]]
+        next_cost = flow.calls[0][2].cost if flow.calls else 0.0
+        return BULK if self._bulk_credit >= next_cost else INTERACTIVE
+
+    def _next_call(self) -> _Call:
+        """Take the next call of the flow with the smallest start tag (waits for one)"""
+        while True:
+            while not any(self._queues):
+                self._cond.wait()
+            priority = self._next_class()
+            start, _, key = heapq.heappop(self._queues[priority])
+            flow = self._flows[key]
+            while flow.calls:
+                _, _, call = heapq.heappop(flow.calls)
+                if not call.cancelled:
+                    break
+            else:
+                flow.scheduled = False
+                continue
+            self._virtual_time[priority] = start
+            if priority == BULK:
+                self._bulk_credit = max(0.0, self._bulk_credit - call.cost) if self._queues[INTERACTIVE] else 0.0
+            elif self._queues[BULK]:
+                self._bulk_credit += call.cost * self.bulk_share / (1.0 - self.bulk_share)
+            # A client that used a lot of inference recently starts its next call later
+            flow.finish = start + max(call.cost, 1e-6) / flow.weight
+            self._schedule(key)
+            return call
+
+    def _work(self):
+        """Inference thread main loop: run the next call in fair order"""
+        while True:
+            with self._cond:
+                call = self._next_call()
+                client = self._client_stats(call.client)
+                client.queued -= 1
+                call.started_at = time.monotonic()
+                client.running += 1
+                client.recent.append((call.started_at, call.started_at - call.enqueued_at))
+                self._running += 1
+            try:
+                call.result = call.context.run(call.fn)
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._cond:
+                    self._running -= 1
+                    client.running -= 1
+                    self.completed += 1
+                    if call.holds_slot:
+                        self._admitted = max(0, self._admitted - 1)
+                    call.done.set()
+
+    def run(self, fn: Callable, *args, timeout: Optional[float] = None,
+            stats: Optional[Dict] = None, client: str = 'public', weight: float = 1.0,
+            bulk: bool = False, cost: float = 1.0, **kwargs):
+        """
+        Run fn(*args, **kwargs) on an inference thread and wait for its result.
+        The caller's context variables (e.g. phonemization tracking) are
+        visible to fn.
+
+        Args:
+            fn: Model call
+            timeout: Maximum seconds to wait, including time in the queue. A call that
+                already started keeps running and holds a synthesis slot until it finishes
+            stats: If given, 'queue_wait' is set to the seconds fn waited for a thread
+            client: Name of the API client the call is made for
+            weight: The client's share of inference relative to other clients
+            bulk: Queue behind all interactive calls
+            cost: Predicted inference seconds (larger calls use up more of the client's share,
+                and shorter interactive calls of a client run first)
+
+        Raises:
+            TimeoutError: If fn did not finish in time
+        """
+        call = _Call(lambda: fn(*args, **kwargs), copy_context(), client, cost)
+        priority = BULK if bulk else INTERACTIVE
+
+        with self._cond:
+            self._ensure_threads()
+            key = (priority, client)
+            flow = self._flows.get(key)
+            if flow is None:
+                flow = self._flows[key] = _Flow()
+            flow.weight = max(weight, 1e-6)
+            heapq.heappush(flow.calls, (cost if priority == INTERACTIVE else 0.0, next(self._seq), call))
+            if not flow.scheduled:
+                self._schedule(key)
+            client_stats = self._client_stats(client)
+            client_stats.requests += 1
+            client_stats.queued += 1
+            self._cond.notify()
+
+        finished = call.done.wait(timeout)
+        if not finished:
+            with self._cond:
+                finished = call.done.is_set()
+                if not finished:
+                    self.timeouts += 1
+                    if call.started_at is None:
+                        call.cancelled = True
+                        self._client_stats(client).queued -= 1
+                    else:
+                        # The model call keeps its inference thread busy after the caller
+                        # (and its slot) is gone: count it against max_pending until it ends
+                        call.holds_slot = True
+                        self._admitted += 1
+        if stats is not None:
+            stats['queue_wait'] = (call.started_at or time.monotonic()) - call.enqueued_at
+        if not finished:
+            raise TimeoutError("Synthesis timed out in inference pool")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def client_stats(self) -> Dict[str, Dict]:
+        """Per-client requests, rate and queue wait over the last minute in this worker"""
+        now = time.monotonic()
+        result = {}
+        with self._cond:
+            if self._pid != os.getpid():
+                return result
+            for name, stats in self._clients.items():
+                stats.trim(now)
+                waits = [wait for _, wait in stats.recent]
+                result[name] = {
+                    'requests': stats.requests,
+                    'queued': stats.queued,
+                    'running': stats.running,
+                    'requests_per_minute': round(len(waits) * 60.0 / STATS_WINDOW, 2),
+                    'avg_queue_wait_ms': round(sum(waits) / len(waits) * 1000, 2) if waits else 0.0,
+                    'max_queue_wait_ms': round(max(waits) * 1000, 2) if waits else 0.0
+                }
+        return result
+
+    def get_stats(self) -> Dict:
+        """Get pool statistics for this worker"""
+        current = self._pid == os.getpid()
+        queued = [0, 0]
+        with self._cond:
+            for (priority, _), flow in (self._flows.items() if current else ()):
+                queued[priority] += sum(1 for _, _, call in flow.calls if not call.cancelled)
+        return {
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'admitted': self._admitted if current else 0,
+            'running': self._running if current else 0,
+            'queued': sum(queued),
+            'queued_bulk': queued[BULK],
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'timeouts': self.timeouts
+        }
+
+
+# Global inference pool instance
+inference_pool = None
+
+
+def init_inference_pool(max_workers: int = 1, max_pending: int = 4, **kwargs):
+    """Initialize the global inference pool"""
+    global inference_pool
+    inference_pool = InferencePool(max_workers, max_pending, **kwargs)
+    logger.info(f"Inference pool initialized (workers={max_workers}, max_pending={max_pending})")
+
+
+def get_inference_pool() -> InferencePool:
+    """Get the global inference pool (initialize if needed)"""
+    global inference_pool
+    if inference_pool is None:
+        init_inference_pool()
+    return inference_pool
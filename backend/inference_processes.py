@@ -0,0 +1,464 @@
+"""
+Inference Processes - Model Replicas outside the Web Workers
+A fixed number of inference processes hold the model; gunicorn workers
+only handle HTTP. Web workers send normalized text and parameters to the
+supervisor, which hands each request to an idle inference process and
+routes the answer back to the web worker that asked. The float32 waveform
+itself is not pickled: it is written into a POSIX shared-memory segment,
+and only the segment name travels back.
+
+    gunicorn master
+      ├─ web workers (WEB_CONCURRENCY, light: no model)
+      │     └─ own connection to the supervisor (Unix socket, opened in attach())
+      └─ supervisor (loads the model once, routes requests, respawns replicas)
+           └─ inference processes (INFERENCE_PROCESSES, share weights copy-on-write)
+                 └─ own pipe to the supervisor
+
+Every channel has exactly one process on each end, so no cross-process lock
+is ever held while waiting: a web worker or inference process that dies
+only closes its own channel. The supervisor fails the request a dead
+inference process was working on and gives its replacement a new pipe;
+a recycled web worker (new pid) simply connects again.
+
+The supervisor is forked from the gunicorn master before the web workers,
+and its socket is created there, so workers can connect while the model
+is still loading. Web workers use RemoteModel in place of the Coqui/ONNX
+model, so all endpoints work unchanged.
+"""
+
+import itertools
+import logging
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+from collections import deque
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Connection, wait
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from metrics import record_phonemization
+
+logger = logging.getLogger(__name__)
+
+_ctx = multiprocessing.get_context('fork')
+
+POLL_SECONDS = 1.0  # Longest a loop blocks before it checks whether its peer is still there
+
+
+def _write_shared(wav: np.ndarray) -> Optional[str]:
+    """Copy a waveform into a new shared-memory segment; the reader unlinks it."""
+    if not len(wav):
+        return None
+    shm = SharedMemory(create=True, size=wav.nbytes)
+    np.ndarray(wav.shape, dtype=np.float32, buffer=shm.buf)[:] = wav
+    # The segment outlives this process's interest in it: the web worker unlinks it
+    resource_tracker.unregister(shm._name, 'shared_memory')
+    shm.close()
+    return shm.name
+
+
+def _read_shared(name: Optional[str], length: int) -> np.ndarray:
+    """Take a waveform out of a shared-memory segment and remove the segment."""
+    if name is None:
+        return np.zeros(0, dtype=np.float32)
+    shm = SharedMemory(name=name)
+    try:
+        return np.ndarray((length,), dtype=np.float32, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _discard_shared(name: Optional[str]):
+    """Remove the segment of an answer nobody will read."""
+    if name is None:
+        return
+    try:
+        shm = SharedMemory(name=name)
+        shm.close()
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class _Waiter:
+    """One request waiting for its answer"""
+
+    __slots__ = ('done', 'result', 'details', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.details = None
+        self.error = None
+
+
+class _Replica:
+    """Supervisor's view of one inference process"""
+
+    __slots__ = ('index', 'process', 'conn', 'request')
+
+    def __init__(self, index: int, process, conn: Connection):
+        self.index = index
+        self.process = process
+        self.conn = conn
+        self.request = None  # (web worker connection, request id) being synthesized
+
+
+class InferenceProcessPool:
+    """Fixed set of model processes serving synthesis requests of all web workers"""
+
+    def __init__(self, num_processes: int,
+                 synthesize_fn: Callable[[str, Dict, Optional[str]], Tuple[np.ndarray, Dict]],
+                 setup_fn: Optional[Callable[[int, int], None]] = None,
+                 preload_fn: Optional[Callable[[], None]] = None):
+        """
+        Initialize pool. Create and start it before forking the web workers.
+
+        Args:
+            num_processes: Inference processes (model replicas)
+            synthesize_fn: Called in an inference process with (text, params, fingerprint);
+                           returns (float32 waveform, details dict)
+            setup_fn: Called in each inference process with (index, num_processes) before serving
+            preload_fn: Called once in the supervisor before the processes are forked
+        """
+        self.num_processes = max(1, num_processes)
+        self.synthesize_fn = synthesize_fn
+        self.setup_fn = setup_fn
+        self.preload_fn = preload_fn
+
+        self._dir = tempfile.mkdtemp(prefix='plattdeutsch-tts-inference-')
+        self.address = os.path.join(self._dir, 'supervisor.sock')
+        self._pids = _ctx.Array('i', self.num_processes, lock=False)
+        self._supervisor = None
+
+        # Web worker side
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._conn = None
+        self._waiting = {}
+        self._ids = itertools.count()
+        self._receiver = None
+        self._pid = None
+
+        self.completed = 0
+        self.errors = 0
+        self.timeouts = 0
+
+    # ------------------------------------------------------------------
+    # Supervisor and inference processes
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Fork the supervisor, which loads the model and forks the inference processes."""
+        # One resource tracker for the whole process tree, so segments created by an
+        # inference process and removed by a web worker are accounted in one place
+        resource_tracker.ensure_running()
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.address)
+        listener.listen(64)
+        parent_pid = os.getpid()
+        # A plain fork: a multiprocessing child would be registered in the master
+        # and then joined by every gunicorn worker at exit
+        pid = os.fork()
+        if pid == 0:
+            try:
+                self._supervise(parent_pid, listener)
+            finally:
+                os._exit(0)
+        listener.close()
+        self._supervisor = pid
+        logger.info(f"Inference supervisor started (pid {pid}, {self.num_processes} process(es))")
+
+    def stop(self):
+        """Stop the supervisor and its inference processes (gunicorn on_exit)."""
+        if self._supervisor is None:
+            return
+        pid, self._supervisor = self._supervisor, None
+        try:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            # Already reaped (gunicorn's master reaps any exited child)
+            pass
+        except ProcessLookupError:
+            pass
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+    def _spawn(self, index: int) -> _Replica:
+        supervisor_end, process_end = _ctx.Pipe()
+        process = _ctx.Process(target=self._serve, args=(index, process_end),
+                               name=f'inference-{index}', daemon=True)
+        process.start()
+        process_end.close()
+        self._pids[index] = process.pid
+        return _Replica(index, process, supervisor_end)
+
+    def _supervise(self, parent_pid: int, listener: socket.socket):
+        """Supervisor main loop: route requests to idle processes, keep them alive"""
+        stopping = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        if self.preload_fn is not None:
+            try:
+                self.preload_fn()
+            except Exception as e:
+                # Each inference process loads the model itself then
+                logger.error(f"Inference supervisor failed to preload the model: {e}", exc_info=True)
+
+        replicas = [self._spawn(index) for index in range(self.num_processes)]
+        clients = []
+        pending = deque()  # (web worker connection, message)
+
+        def answer(conn, reply):
+            try:
+                conn.send(reply)
+            except OSError:
+                # The web worker is gone - nobody reads the audio
+                _discard_shared(reply[1])
+
+        while not stopping.is_set() and os.getppid() == parent_pid:
+            ready = wait([listener] + clients + [replica.conn for replica in replicas] +
+                         [replica.process.sentinel for replica in replicas], timeout=POLL_SECONDS)
+
+            if listener in ready:
+                sock, _ = listener.accept()
+                clients.append(Connection(sock.detach()))
+
+            for conn in [conn for conn in clients if conn in ready]:
+                try:
+                    pending.append((conn, conn.recv()))
+                except (EOFError, OSError):
+                    # Web worker exited or was recycled; drop its queued requests
+                    clients.remove(conn)
+                    conn.close()
+                    pending = deque(item for item in pending if item[0] is not conn)
+
+            for replica in replicas:
+                if replica.conn in ready:
+                    try:
+                        reply = replica.conn.recv()
+                    except (EOFError, OSError):
+                        continue  # Exited - handled below
+                    if replica.request is not None:
+                        conn, _ = replica.request
+                        replica.request = None
+                        if conn in clients:
+                            answer(conn, reply)
+                        else:
+                            _discard_shared(reply[1])
+
+            for index, replica in enumerate(replicas):
+                if replica.process.is_alive() or stopping.is_set():
+                    continue
+                replica.process.join()
+                logger.warning(f"Inference process {index} (pid {replica.process.pid}) exited "
+                               f"with code {replica.process.exitcode} - restarting")
+                if replica.request is not None:
+                    conn, request_id = replica.request
+                    if conn in clients:
+                        answer(conn, (request_id, None, 0, None,
+                                      f"Inference process exited with code {replica.process.exitcode}"))
+                replica.conn.close()
+                replicas[index] = self._spawn(index)
+
+            # Hand waiting requests to idle processes, oldest first
+            for replica in replicas:
+                if not pending:
+                    break
+                if replica.request is None and replica.process.is_alive():
+                    conn, message = pending.popleft()
+                    try:
+                        replica.conn.send(message)
+                    except OSError:
+                        # Died since the check above - respawned on the next round
+                        pending.appendleft((conn, message))
+                        continue
+                    replica.request = (conn, message[0])
+
+        for replica in replicas:
+            replica.process.terminate()
+        for replica in replicas:
+            replica.process.join(5)
+
+    def _serve(self, index: int, conn: Connection):
+        """Inference process main loop"""
+        # Not the supervisor's handler: terminate() has to end this process
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        if self.setup_fn is not None:
+            self.setup_fn(index, self.num_processes)
+        logger.info(f"Inference process {index} ready (pid {os.getpid()})")
+
+        while True:
+            try:
+                request_id, text, params, fingerprint = conn.recv()
+            except EOFError:
+                break  # Supervisor gone
+            try:
+                wav, details = self.synthesize_fn(text, params, fingerprint)
+                wav = np.ascontiguousarray(wav, dtype=np.float32).reshape(-1)
+                reply = (request_id, _write_shared(wav), len(wav), dict(details, process=index), None)
+            except Exception as e:
+                logger.error(f"Inference process {index} failed: {e}", exc_info=True)
+                reply = (request_id, None, 0, None, f"{type(e).__name__}: {e}")
+            conn.send(reply)
+
+    # ------------------------------------------------------------------
+    # Web worker side
+    # ------------------------------------------------------------------
+
+    def attach(self):
+        """Open this web worker's connection to the supervisor (call after fork, in the worker)."""
+        with self._lock:
+            self._ensure_connection()
+
+    def _ensure_connection(self):
+        """Connect and start the response thread (again after fork, neither survives it)"""
+        if self._conn is not None and self._pid == os.getpid():
+            return
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.address)
+        except OSError:
+            sock.close()
+            raise
+        self._pid = os.getpid()
+        self._conn = Connection(sock.detach())
+        self._waiting = {}
+        self._receiver = threading.Thread(target=self._receive, args=(self._conn,),
+                                          name='inference-responses', daemon=True)
+        self._receiver.start()
+
+    def _receive(self, conn: Connection):
+        """Hand answers to the waiting requests; answers nobody waits for are discarded"""
+        while True:
+            try:
+                if not conn.poll(POLL_SECONDS):
+                    continue
+                request_id, name, length, details, error = conn.recv()
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                waiter = self._waiting.pop(request_id, None)
+            try:
+                wav = _read_shared(name, length)
+            except Exception as e:
+                wav, error = None, f"Reading shared audio failed: {e}"
+            if waiter is None:
+                continue
+            waiter.result, waiter.details, waiter.error = wav, details, error
+            waiter.done.set()
+
+        # Supervisor gone: fail everything still waiting, reconnect on the next request
+        logger.error("Connection to the inference supervisor closed")
+        with self._lock:
+            if self._conn is conn:
+                self._conn = None
+            waiting, self._waiting = self._waiting, {}
+        for waiter in waiting.values():
+            waiter.error = "Inference supervisor unavailable"
+            waiter.done.set()
+
+    def synthesize(self, text: str, params: Dict, fingerprint: Optional[str] = None,
+                   timeout: Optional[float] = None) -> Tuple[np.ndarray, Dict]:
+        """
+        Synthesize text on an inference process.
+
+        Args:
+            text: Normalized text
+            params: length_scale, noise_scale, noise_scale_w
+            fingerprint: Model the caller expects (processes behind on a swap catch up first)
+            timeout: Maximum seconds to wait for the answer
+
+        Returns:
+            (float32 waveform, details from the inference process)
+        """
+        waiter = _Waiter()
+        with self._lock:
+            try:
+                self._ensure_connection()
+            except OSError as e:
+                raise RuntimeError(f"Inference supervisor unavailable: {e}")
+            conn = self._conn
+            request_id = f"{os.getpid()}-{next(self._ids)}"
+            self._waiting[request_id] = waiter
+        try:
+            with self._send_lock:
+                conn.send((request_id, text, params, fingerprint))
+        except OSError as e:
+            with self._lock:
+                self._waiting.pop(request_id, None)
+            raise RuntimeError(f"Inference supervisor unavailable: {e}")
+
+        if not waiter.done.wait(timeout):
+            with self._lock:
+                self._waiting.pop(request_id, None)
+                self.timeouts += 1
+            raise TimeoutError("Synthesis timed out in inference processes")
+        with self._lock:
+            if waiter.error is not None:
+                self.errors += 1
+            else:
+                self.completed += 1
+        if waiter.error is not None:
+            raise RuntimeError(f"Inference process error: {waiter.error}")
+        return waiter.result, waiter.details
+
+    def get_stats(self) -> Dict:
+        """Get pool statistics (request counts are for this web worker)"""
+        current = self._pid == os.getpid()
+        return {
+            'processes': self.num_processes,
+            'pids': [pid for pid in self._pids if pid],
+            'connected': current and self._conn is not None,
+            'waiting': len(self._waiting) if current else 0,
+            'completed': self.completed,
+            'errors': self.errors,
+            'timeouts': self.timeouts
+        }
+
+
+class RemoteModel:
+    """Serving model of a web worker: tts() runs on the inference processes"""
+
+    engine = 'remote'
+
+    def __init__(self, pool: InferenceProcessPool, fingerprint: Optional[str] = None,
+                 timeout: Optional[float] = None):
+        self.pool = pool
+        self.fingerprint = fingerprint
+        self.timeout = timeout
+
+    def tts(self, text: str, length_scale: float = 1.0, noise_scale: float = 0.667,
+            noise_scale_w: float = 0.8, **kwargs) -> np.ndarray:
+        params = {'length_scale': length_scale, 'noise_scale': noise_scale, 'noise_scale_w': noise_scale_w}
+        wav, details = self.pool.synthesize(text, params, self.fingerprint, self.timeout)
+        # Front-end time measured in the inference process counts for this request
+        record_phonemization(details.get('phonemize_seconds', 0.0), details.get('tokens', 0))
+        return wav
+
+
+# Global inference process pool (None unless started from the gunicorn master)
+inference_processes = None
+
+
+def init_inference_processes(num_processes: int, synthesize_fn: Callable, **kwargs):
+    """Initialize the global inference process pool"""
+    global inference_processes
+    inference_processes = InferenceProcessPool(num_processes, synthesize_fn, **kwargs)
+    logger.info(f"Inference processes initialized (processes={num_processes})")
+    return inference_processes
+
+
+def get_inference_processes() -> Optional[InferenceProcessPool]:
+    """Get the global inference process pool (None if this deployment runs the model in-process)"""
+    return inference_processes
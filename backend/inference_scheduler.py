@@ -0,0 +1,224 @@
+"""
+Inference Scheduler - Micro-Batching
+Collects synthesis requests that arrive within a short window, groups them
+into length buckets with identical parameters and runs one padded batched
+VITS inference per bucket. Each caller gets back its own trimmed waveform.
+
+Only useful when a worker handles several requests concurrently
+(gunicorn gthread workers, GUNICORN_THREADS > 1).
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from vits_inference import infer_batch
+
+logger = logging.getLogger(__name__)
+
+
+class _WorkItem:
+    """One text waiting for synthesis"""
+
+    __slots__ = ('model', 'text', 'params', 'enqueued_at', 'started_at', 'done', 'result', 'error')
+
+    def __init__(self, model, text: str, params: tuple):
+        self.model = model
+        self.text = text
+        self.params = params
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class InferenceScheduler:
+    """Merges concurrent synthesis requests into batched forward passes"""
+
+    def __init__(self, max_batch_size: int = 8, max_wait_ms: float = 20,
+                 bucket_width: int = 40, infer_fn: Callable = infer_batch):
+        """
+        Initialize scheduler. The worker thread starts on first use.
+
+        Args:
+            max_batch_size: Maximum number of texts per forward pass
+            max_wait_ms: How long to wait for more requests before running a batch
+            bucket_width: Texts whose lengths differ by less than this share a batch
+            infer_fn: Batched inference function (see vits_inference.infer_batch)
+        """
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.bucket_width = max(1, bucket_width)
+        self.infer_fn = infer_fn
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pid = None
+
+        self.batches = 0
+        self.items = 0
+        self.max_batch_seen = 0
+
+    def _ensure_thread(self):
+        """Start the batching thread (again after fork, threads do not survive it)"""
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._queue.clear()
+        self._thread = threading.Thread(target=self._run, name='inference-scheduler', daemon=True)
+        self._thread.start()
+        logger.info(f"Inference scheduler started (max_batch_size={self.max_batch_size}, "
+                    f"max_wait={self.max_wait * 1000:.0f}ms)")
+
+    def submit(self, model, texts: List[str], length_scale: float, noise_scale: float,
+               noise_scale_w: float, timeout: Optional[float] = None,
+               return_exceptions: bool = False, stats: Optional[Dict] = None) -> List[np.ndarray]:
+        """
+        Queue texts for synthesis and wait for their waveforms.
+
+        Args:
+            model: Loaded TTS model the texts should be synthesized with
+            texts: Normalized texts (e.g. the sentences of one request)
+            length_scale, noise_scale, noise_scale_w: Clamped synthesis parameters
+            timeout: Maximum seconds to wait for the results
+            return_exceptions: Return per-text exceptions instead of raising the first
+            stats: If given, 'queue_wait' is set to the longest time a text waited for its batch
+
+        Returns:
+            One float32 waveform (or exception) per text
+        """
+        params = (length_scale, noise_scale, noise_scale_w)
+        items = [_WorkItem(model, text, params) for text in texts]
+
+        with self._cond:
+            self._ensure_thread()
+            self._queue.extend(items)
+            self._cond.notify()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for item in items:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not item.done.wait(remaining):
+                item.error = TimeoutError("Synthesis timed out in inference queue")
+                if not return_exceptions:
+                    raise item.error
+            elif item.error is not None and not return_exceptions:
+                raise item.error
+        if stats is not None:
+            stats['queue_wait'] = max((item.started_at - item.enqueued_at for item in items
+                                       if item.started_at is not None), default=0.0)
+        return [item.error if item.error is not None else item.result for item in items]
+
+    def _collect(self) -> List[_WorkItem]:
+        """Wait for work, then keep collecting until the window closes or the batch is full"""
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+
+            window_end = self._queue[0].enqueued_at + self.max_wait
+            while len(self._queue) < self.max_batch_size:
+                remaining = window_end - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            pending = list(self._queue)
+            self._queue.clear()
+        return pending
+
+    def _buckets(self, pending: List[_WorkItem]) -> List[List[_WorkItem]]:
+        """Group items by model/parameters, then by similar length"""
+        groups: Dict[tuple, List[_WorkItem]] = {}
+        for item in pending:
+            groups.setdefault((id(item.model), item.params), []).append(item)
+
+        batches = []
+        for items in groups.values():
+            items.sort(key=lambda item: len(item.text))
+            batch = []
+            for item in items:
+                if batch and (len(batch) >= self.max_batch_size or
+                              len(item.text) - len(batch[0].text) >= self.bucket_width):
+                    batches.append(batch)
+                    batch = []
+                batch.append(item)
+            if batch:
+                batches.append(batch)
+        return batches
+
+    def _infer(self, batch: List[_WorkItem], length_scale: float, noise_scale: float,
+               noise_scale_w: float):
+        results = self.infer_fn(batch[0].model, [item.text for item in batch],
+                                length_scale=length_scale, noise_scale=noise_scale,
+                                noise_scale_w=noise_scale_w)
+        for item, result in zip(batch, results):
+            item.result = result
+
+    def _run(self):
+        """Batching thread main loop"""
+        while True:
+            pending = self._collect()
+            for batch in self._buckets(pending):
+                first = batch[0]
+                length_scale, noise_scale, noise_scale_w = first.params
+                started_at = time.monotonic()
+                for item in batch:
+                    item.started_at = started_at
+                try:
+                    self._infer(batch, length_scale, noise_scale, noise_scale_w)
+                except Exception as e:
+                    logger.error(f"Batched inference failed ({len(batch)} items): {e}", exc_info=True)
+                    # Retry one by one so a single bad text does not fail its neighbours
+                    for item in batch:
+                        if len(batch) == 1:
+                            item.error = e
+                            continue
+                        try:
+                            self._infer([item], length_scale, noise_scale, noise_scale_w)
+                        except Exception as item_error:
+                            item.error = item_error
+                finally:
+                    for item in batch:
+                        item.done.set()
+
+                self.batches += 1
+                self.items += len(batch)
+                self.max_batch_seen = max(self.max_batch_seen, len(batch))
+
+    def get_stats(self) -> Dict:
+        """Get scheduler statistics"""
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': round(self.max_wait * 1000, 1),
+            'queued': len(self._queue),
+            'batches': self.batches,
+            'items': self.items,
+            'avg_batch_size': round(self.items / self.batches, 2) if self.batches else 0.0,
+            'max_batch_seen': self.max_batch_seen
+        }
+
+
+# Global inference scheduler instance
+inference_scheduler = None
+
+
+def init_inference_scheduler(max_batch_size: int = 8, max_wait_ms: float = 20):
+    """Initialize the global inference scheduler"""
+    global inference_scheduler
+    inference_scheduler = InferenceScheduler(max_batch_size, max_wait_ms)
+    logger.info(f"Inference scheduler initialized (batch={max_batch_size}, wait={max_wait_ms}ms)")
+
+
+def get_inference_scheduler() -> InferenceScheduler:
+    """Get the global inference scheduler (initialize if needed)"""
+    global inference_scheduler
+    if inference_scheduler is None:
+        init_inference_scheduler()
+    return inference_scheduler
@@ -0,0 +1,229 @@
+"""
+Metrics - Prometheus Instrumentation
+Request counts, latency histograms per synthesis stage, input/output size
+distributions and model state, exposed on /metrics.
+
+Under gunicorn every worker writes its samples to PROMETHEUS_MULTIPROC_DIR
+(set in gunicorn.conf.py before the app is imported) and a scrape of any
+worker returns the sum over all of them. Without prometheus_client all
+recording functions are no-ops and /metrics answers 503.
+"""
+
+import importlib.util
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Stages of /api/tts, in pipeline order
+STAGES = ('normalize', 'phonemize', 'inference', 'peak_normalize', 'int16', 'encode')
+
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                 1.0, 2.5, 5.0, 10.0, 30.0)
+REQUEST_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+CHARACTER_BUCKETS = (10, 25, 50, 100, 200, 400, 700, 1000, 5000, 20000, 100000)
+AUDIO_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 40.0, 60.0, 120.0, 300.0, 900.0)
+
+_metrics = None
+# Totals of the enclosing track_phonemization() block; a context variable so the
+# inference pool's threads add to the tracker of the request they work for
+_phonemize = ContextVar('phonemize', default=None)
+
+
+def metrics_available() -> bool:
+    """True if prometheus_client is installed."""
+    return importlib.util.find_spec('prometheus_client') is not None
+
+
+def multiprocess_dir() -> Optional[str]:
+    """Shared sample directory of the gunicorn workers (None in single-process mode)."""
+    return os.environ.get('PROMETHEUS_MULTIPROC_DIR') or os.environ.get('prometheus_multiproc_dir')
+
+
+def _get_metrics() -> Optional[Dict]:
+    """Create the metric objects on first use (None without prometheus_client)."""
+    global _metrics
+    if _metrics is not None or not metrics_available():
+        return _metrics
+
+    from prometheus_client import Counter, Gauge, Histogram
+
+    _metrics = {
+        'requests': Counter('tts_http_requests_total', 'HTTP requests by endpoint and status',
+                            ['endpoint', 'method', 'status']),
+        'request_seconds': Histogram('tts_http_request_duration_seconds', 'HTTP request latency',
+                                     ['endpoint'], buckets=REQUEST_BUCKETS),
+        'in_flight': Gauge('tts_http_requests_in_flight', 'Requests currently being handled',
+                           ['endpoint'], multiprocess_mode='livesum'),
+        'stage_seconds': Histogram('tts_stage_duration_seconds', 'Time per /api/tts synthesis stage',
+                                   ['stage'], buckets=STAGE_BUCKETS),
+        'input_characters': Histogram('tts_input_characters', 'Normalized input text length',
+                                      ['endpoint'], buckets=CHARACTER_BUCKETS),
+        'audio_seconds': Histogram('tts_output_audio_seconds', 'Duration of synthesized audio',
+                                   ['endpoint'], buckets=AUDIO_BUCKETS),
+        'model_load_seconds': Gauge('tts_model_load_seconds', 'Load time of the serving model (0 = none)',
+                                    multiprocess_mode='liveall'),
+        'model_generation': Gauge('tts_model_generation', 'Model generation applied by this worker',
+                                  multiprocess_mode='liveall'),
+    }
+    return _metrics
+
+
+# =============================================================================
+# RECORDING
+# =============================================================================
+
+def observe_stage(stage: str, seconds: float, timings: Optional[Dict] = None):
+    """Record a stage duration (and add it to a per-request timings dict, if given)."""
+    seconds = max(0.0, seconds)
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+    metrics = _get_metrics()
+    if metrics is not None:
+        metrics['stage_seconds'].labels(stage).observe(seconds)
+
+
+@contextmanager
+def stage_timer(stage: str, timings: Optional[Dict] = None):
+    """Time a block as one synthesis stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start, timings)
+
+
+def server_timing(timings: Dict, **descriptions) -> str:
+    """Format stage durations (seconds) as a Server-Timing header value."""
+    entries = []
+    for stage, seconds in timings.items():
+        entry = f"{stage};dur={seconds * 1000:.1f}"
+        if stage in descriptions:
+            entry += f';desc="{descriptions[stage]}"'
+        entries.append(entry)
+    entries += [f'{name};desc="{value}"' for name, value in descriptions.items() if name not in timings]
+    return ", ".join(entries)
+
+
+def observe_input(endpoint: str, characters: int):
+    metrics = _get_metrics()
+    if metrics is not None:
+        metrics['input_characters'].labels(endpoint).observe(characters)
+
+
+def observe_audio(endpoint: str, seconds: float):
+    metrics = _get_metrics()
+    if metrics is not None:
+        metrics['audio_seconds'].labels(endpoint).observe(seconds)
+
+
+def request_started(endpoint: str):
+    metrics = _get_metrics()
+    if metrics is not None:
+        metrics['in_flight'].labels(endpoint).inc()
+
+
+def request_finished(endpoint: str, method: str, status: int, seconds: float):
+    metrics = _get_metrics()
+    if metrics is not None:
+        metrics['in_flight'].labels(endpoint).dec()
+        metrics['requests'].labels(endpoint, method, str(status)).inc()
+        metrics['request_seconds'].labels(endpoint).observe(seconds)
+
+
+def set_model_load_time(info: Dict):
+    """Publish this worker's serving model load time (0 without a model)."""
+    metrics = _get_metrics()
+    if metrics is not None:
+        metrics['model_load_seconds'].set((info.get('load_seconds') or 0.0) if info.get('loaded') else 0.0)
+
+
+def set_model_generation(generation: Optional[int]):
+    """Publish the model generation this worker has applied."""
+    metrics = _get_metrics()
+    if metrics is not None and generation is not None:
+        metrics['model_generation'].set(generation)
+
+
+# =============================================================================
+# PHONEMIZATION TRACKING
+# =============================================================================
+
+@contextmanager
+def track_phonemization():
+    """
+    Collect front-end time of the model calls made in this block (this context).
+    Yields a dict with the accumulated 'seconds' and the number of 'tokens'.
+    """
+    totals = {'seconds': 0.0, 'tokens': 0}
+    token = _phonemize.set(totals)
+    try:
+        yield totals
+    finally:
+        _phonemize.reset(token)
+
+
+def record_phonemization(seconds: float, tokens: int):
+    """Add front-end time to the enclosing track_phonemization() block, if any."""
+    tracker = _phonemize.get()
+    if tracker is not None:
+        tracker['seconds'] += seconds
+        tracker['tokens'] += tokens
+
+
+def _timed_frontend(fn: Callable) -> Callable:
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        ids = None
+        try:
+            ids = fn(*args, **kwargs)
+            return ids
+        finally:
+            record_phonemization(time.perf_counter() - start, len(ids) if ids is not None else 0)
+    wrapper._phonemize_timed = True
+    return wrapper
+
+
+def instrument_frontend(tokenizer) -> bool:
+    """Time a model's text_to_ids (Coqui tokenizer or ONNX front end) for track_phonemization()."""
+    if tokenizer is None or getattr(tokenizer.text_to_ids, '_phonemize_timed', False):
+        return False
+    tokenizer.text_to_ids = _timed_frontend(tokenizer.text_to_ids)
+    return True
+
+
+# =============================================================================
+# EXPOSITION
+# =============================================================================
+
+def generate_metrics() -> Tuple[bytes, str]:
+    """
+    Render all metrics (summed over workers in multiprocess mode).
+
+    Returns:
+        (body, content type)
+    """
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, REGISTRY, generate_latest
+
+    _get_metrics()
+    if multiprocess_dir():
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid: int):
+    """Drop live gauges of an exited worker (gunicorn child_exit)."""
+    if multiprocess_dir() and metrics_available():
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,301 @@
+"""
+Model Artifacts - Inference-Only Checkpoints
+A Coqui VITS training checkpoint carries discriminator weights, optimizer
+and grad-scaler state that inference never touches. At upload time the
+generator weights are written to a slim checkpoint next to config.json,
+and to a flat safetensors file that workers memory-map instead of
+unpickling. The loader prefers safetensors, then the slim checkpoint,
+then best_model.pth.
+
+The opt-in int8 variant applies dynamic quantization to the Linear and
+Conv1d layers; its weights are kept as model_int8.pth in the same
+directory after the first quantized activation.
+"""
+
+import importlib.util
+import json
+import logging
+import shutil
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+from onnx_engine import ONNX_MODEL, ONNX_FRONTEND
+
+logger = logging.getLogger(__name__)
+
+ORIGINAL_CHECKPOINT = 'best_model.pth'
+ORIGINAL_CONFIG = 'config.json'
+INFERENCE_CHECKPOINT = 'inference_model.pth'
+INFERENCE_CONFIG = 'inference_config.json'
+SAFETENSORS_WEIGHTS = 'model.safetensors'
+QUANTIZED_WEIGHTS = 'model_int8.pth'
+ARCHIVE_DIR = 'archive'
+
+# State dict prefixes only needed for training
+TRAINING_ONLY_PREFIXES = ('disc.',)
+
+# Activation variants: float weights or int8 dynamic quantization
+MODEL_VARIANTS = ('float', 'int8')
+
+
+def slim_checkpoint(model_dir: Path, archive_original: bool = True) -> Dict:
+    """
+    Write a generator-only inference checkpoint for a model directory.
+
+    Args:
+        model_dir: Directory containing best_model.pth and config.json
+        archive_original: Move best_model.pth to archive/ (True) or delete it (False)
+
+    Returns:
+        Dictionary with original/slim sizes and the number of dropped tensors
+    """
+    import torch
+
+    model_dir = Path(model_dir)
+    original_path = model_dir / ORIGINAL_CHECKPOINT
+
+    generator, dropped = _load_generator_state(original_path)
+
+    slim_path = model_dir / INFERENCE_CHECKPOINT
+    temp_path = model_dir / (INFERENCE_CHECKPOINT + '.tmp')
+    try:
+        torch.save({'model': generator}, str(temp_path))
+        temp_path.replace(slim_path)
+    except Exception:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    write_inference_config(model_dir)
+
+    original_bytes = original_path.stat().st_size
+    if archive_original:
+        archive_dir = model_dir / ARCHIVE_DIR
+        archive_dir.mkdir(exist_ok=True)
+        shutil.move(str(original_path), str(archive_dir / ORIGINAL_CHECKPOINT))
+    else:
+        original_path.unlink()
+
+    result = {
+        'original_bytes': original_bytes,
+        'slim_bytes': slim_path.stat().st_size,
+        'dropped_tensors': dropped,
+        'original_archived': archive_original
+    }
+    logger.info(f"Slimmed checkpoint in {model_dir.name}: "
+                f"{original_bytes / 1e6:.1f} MB -> {result['slim_bytes'] / 1e6:.1f} MB")
+    return result
+
+
+def _load_generator_state(checkpoint_path: Path) -> Tuple[Dict, int]:
+    """Load a checkpoint and return (generator state dict, number of dropped tensors)."""
+    import torch
+
+    checkpoint = torch.load(str(checkpoint_path), map_location='cpu')
+    state = checkpoint['model'] if isinstance(checkpoint, dict) and 'model' in checkpoint else checkpoint
+
+    generator = {
+        key: value for key, value in state.items()
+        if not key.startswith(TRAINING_ONLY_PREFIXES)
+    }
+    return generator, len(state) - len(generator)
+
+
+def write_inference_config(model_dir: Path):
+    """Write inference_config.json: config.json without a discriminator."""
+    model_dir = Path(model_dir)
+    with open(model_dir / ORIGINAL_CONFIG, 'r') as f:
+        config = json.load(f)
+
+    # Without a discriminator in the state dict, the model must not build one
+    config.setdefault('model_args', {})['init_discriminator'] = False
+
+    with open(model_dir / INFERENCE_CONFIG, 'w') as f:
+        json.dump(config, f, indent=4)
+
+
+def safetensors_available() -> bool:
+    """True if the safetensors package is installed."""
+    return importlib.util.find_spec('safetensors') is not None
+
+
+def convert_to_safetensors(model_dir: Path) -> Dict:
+    """
+    Write the generator weights as model.safetensors (flat, mmap-able layout).
+
+    Args:
+        model_dir: Directory with inference_model.pth or best_model.pth
+
+    Returns:
+        Dictionary with the file size and tensor count
+    """
+    from safetensors.torch import save_file
+
+    model_dir = Path(model_dir)
+    source = model_dir / INFERENCE_CHECKPOINT
+    if not source.exists():
+        source = model_dir / ORIGINAL_CHECKPOINT
+
+    generator, _ = _load_generator_state(source)
+    # safetensors needs contiguous tensors that do not share storage
+    generator = {key: value.detach().contiguous().clone() for key, value in generator.items()}
+
+    target = model_dir / SAFETENSORS_WEIGHTS
+    temp_path = model_dir / (SAFETENSORS_WEIGHTS + '.tmp')
+    try:
+        save_file(generator, str(temp_path), metadata={'format': 'pt', 'source': source.name})
+        temp_path.replace(target)
+    except Exception:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    if not (model_dir / INFERENCE_CONFIG).exists():
+        write_inference_config(model_dir)
+
+    result = {'safetensors_bytes': target.stat().st_size, 'tensors': len(generator)}
+    logger.info(f"Wrote {SAFETENSORS_WEIGHTS} for {model_dir.name} ({len(generator)} tensors)")
+    return result
+
+
+def load_safetensors_state(path: Path) -> Dict:
+    """
+    Memory-map a safetensors file. Tensors are backed by a private file mapping,
+    so all worker processes share the same page-cache pages.
+    """
+    from safetensors.torch import load_file
+
+    return load_file(str(path), device='cpu')
+
+
+def quantization_available(import_torch: bool = True) -> bool:
+    """
+    True if torch can run dynamically quantized int8 layers on this CPU.
+    With import_torch=False, a process that has not loaded torch (onnx engine,
+    web workers in front of inference processes) only checks that it is installed.
+    """
+    if not import_torch and 'torch' not in sys.modules:
+        return importlib.util.find_spec('torch') is not None
+    try:
+        import torch
+    except ImportError:
+        return False
+    return any(engine in torch.backends.quantized.supported_engines for engine in ('fbgemm', 'qnnpack'))
+
+
+def remove_weight_norms(module):
+    """
+    Fold weight norm into plain weights in every submodule (decoder, flows,
+    posterior encoder), whether applied as a hook or as a parametrization.
+    """
+    import torch
+    from torch.nn.utils import parametrize
+
+    for submodule in module.modules():
+        if parametrize.is_parametrized(submodule, 'weight'):
+            parametrize.remove_parametrizations(submodule, 'weight', leave_parametrized=True)
+        elif 'weight_g' in submodule._parameters and 'weight_v' in submodule._parameters:
+            torch.nn.utils.remove_weight_norm(submodule)
+    return module
+
+
+def quantize_vits(vits, include_conv: bool = True):
+    """
+    Apply dynamic int8 quantization to a Vits module in place.
+    Weights are stored as int8; activations are quantized on the fly, so no
+    calibration data is needed.
+
+    Args:
+        vits: Coqui Vits module (weights loaded or not - the structure is what matters)
+        include_conv: Also quantize Conv1d layers (text encoder, flows, vocoder)
+    """
+    import torch
+    from torch.ao.quantization import quantize_dynamic, default_dynamic_qconfig
+    from torch.ao.quantization.quantization_mappings import get_default_dynamic_quant_module_mappings
+
+    # Quantization reads .weight, which weight norm only recomputes from weight_g/weight_v
+    remove_weight_norms(vits)
+
+    qconfig_spec = {torch.nn.Linear: default_dynamic_qconfig}
+    mapping = get_default_dynamic_quant_module_mappings()
+    if include_conv:
+        import torch.ao.nn.quantized.dynamic as nnqd
+        qconfig_spec[torch.nn.Conv1d] = default_dynamic_qconfig
+        mapping = dict(mapping, **{torch.nn.Conv1d: nnqd.Conv1d})
+
+    quantize_dynamic(vits, qconfig_spec=qconfig_spec, mapping=mapping, inplace=True)
+    return vits
+
+
+def save_quantized_weights(model_dir: Path, vits, include_conv: bool = True) -> Dict:
+    """
+    Write the state of a quantized Vits module as model_int8.pth.
+
+    Returns:
+        Dictionary with the file size
+    """
+    import torch
+
+    model_dir = Path(model_dir)
+    if not (model_dir / INFERENCE_CONFIG).exists():
+        write_inference_config(model_dir)
+
+    target = model_dir / QUANTIZED_WEIGHTS
+    temp_path = model_dir / (QUANTIZED_WEIGHTS + '.tmp')
+    try:
+        torch.save({'model': vits.state_dict(), 'include_conv': include_conv}, str(temp_path))
+        temp_path.replace(target)
+    except Exception:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    result = {'quantized_bytes': target.stat().st_size}
+    logger.info(f"Wrote {QUANTIZED_WEIGHTS} for {model_dir.name} ({result['quantized_bytes'] / 1e6:.1f} MB)")
+    return result
+
+
+def load_quantized_weights(vits, path: Path, strict: bool = True):
+    """Give a freshly built Vits module the quantized structure and load model_int8.pth into it."""
+    import torch
+
+    checkpoint = torch.load(str(path), map_location='cpu')
+    quantize_vits(vits, include_conv=checkpoint.get('include_conv', True))
+    vits.load_state_dict(checkpoint['model'], strict=strict)
+
+
+def remove_derived_artifacts(model_dir: Path):
+    """Delete artifacts derived from a previous checkpoint (e.g. before a re-upload)."""
+    model_dir = Path(model_dir)
+    for name in (INFERENCE_CHECKPOINT, INFERENCE_CONFIG, SAFETENSORS_WEIGHTS, QUANTIZED_WEIGHTS,
+                 ONNX_MODEL, ONNX_FRONTEND):
+        (model_dir / name).unlink(missing_ok=True)
+
+
+def resolve_model_files(model_dir: Path, variant: str = 'float') -> Tuple[Path, Path]:
+    """
+    Pick the checkpoint/config pair to load from a model directory.
+    Prefers memory-mapped safetensors, then the slim inference checkpoint,
+    and falls back to the training checkpoint. For the int8 variant the
+    quantized weights are used once they exist; until then the float
+    weights are loaded and quantized after loading.
+
+    Returns:
+        (model_path, config_path)
+    """
+    model_dir = Path(model_dir)
+    slim_model = model_dir / INFERENCE_CHECKPOINT
+    slim_config = model_dir / INFERENCE_CONFIG
+    mmap_model = model_dir / SAFETENSORS_WEIGHTS
+    quantized_model = model_dir / QUANTIZED_WEIGHTS
+    if variant == 'int8' and quantized_model.exists() and slim_config.exists():
+        return quantized_model, slim_config
+    if mmap_model.exists() and slim_config.exists() and safetensors_available():
+        return mmap_model, slim_config
+    if slim_model.exists() and slim_config.exists():
+        return slim_model, slim_config
+    return model_dir / ORIGINAL_CHECKPOINT, model_dir / ORIGINAL_CONFIG
+
+
+def has_checkpoint(model_dir: Path) -> bool:
+    """True if the directory holds a loadable checkpoint (slim or original)."""
+    model_path, config_path = resolve_model_files(model_dir)
+    return model_path.exists() and config_path.exists()
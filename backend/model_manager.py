@@ -2,10 +2,16 @@
 Model Management System - Production-Ready
 Handles model lifecycle: upload, validation, activation, deactivation.
 Supports safe dynamic model switching without server restart.
+
+Activation does not copy model files: active/current.json names the
+active model in inactive/ and is replaced atomically via rename, so a
+switch is O(1) in model size and a crash never leaves a half-written
+active directory.
 """
 
 import json
 import logging
+import os
 import shutil
 from pathlib import Path
 from datetime import datetime
@@ -13,6 +19,79 @@ from typing import Optional, Dict, List
 
 logger = logging.getLogger(__name__)
 
+ACTIVE_POINTER = "current.json"
+
+
+def write_active_pointer(active_dir: Path, model_name: str):
+    """
+    Atomically point the active directory at a model (no data copy).
+
+    Args:
+        active_dir: The models/active directory
+        model_name: Name of the model directory in models/inactive
+    """
+    active_dir.mkdir(parents=True, exist_ok=True)
+    pointer = active_dir / ACTIVE_POINTER
+    temp_pointer = active_dir / f".{ACTIVE_POINTER}.{os.getpid()}.tmp"
+
+    with open(temp_pointer, 'w') as f:
+        json.dump({
+            "model": model_name,
+            "activated_at": datetime.now().isoformat()
+        }, f)
+        f.flush()
+        os.fsync(f.fileno())
+
+    # rename() replaces the old pointer atomically
+    os.replace(temp_pointer, pointer)
+    _fsync_dir(active_dir)
+
+
+def read_active_pointer(active_dir: Path) -> Optional[str]:
+    """Return the model name the active pointer refers to (or None)."""
+    pointer = active_dir / ACTIVE_POINTER
+    try:
+        with open(pointer, 'r') as f:
+            return json.load(f).get("model")
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.error(f"Error reading active pointer: {e}")
+        return None
+
+
+def clear_active_pointer(active_dir: Path):
+    """Remove the active pointer (deactivation)."""
+    try:
+        (active_dir / ACTIVE_POINTER).unlink()
+        _fsync_dir(active_dir)
+    except FileNotFoundError:
+        pass
+
+
+def remove_legacy_active_copies(active_dir: Path):
+    """Delete model copies left in active/ by the old copy-based activation."""
+    if not active_dir.exists():
+        return
+    for item in active_dir.iterdir():
+        if item.is_dir() and not item.is_symlink():
+            shutil.rmtree(item, ignore_errors=True)
+            logger.info(f"Removed legacy active copy: {item.name}")
+
+
+def _fsync_dir(directory: Path):
+    """Persist a rename in a directory (best effort, not supported everywhere)."""
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
 
 class ModelManager:
     """Production-grade model lifecycle manager"""
@@ -69,8 +148,9 @@ class ModelManager:
     def get_active_model(self) -> Optional[Dict]:
         """Get information about active model"""
         metadata = self._load_metadata()
-        if metadata.get("active_model"):
-            active_path = self.active_dir / metadata["active_model"]
+        active_name = read_active_pointer(self.active_dir)
+        if active_name:
+            active_path = self.inactive_dir / active_name
             if active_path.exists():
                 config_path = active_path / "config.json"
                 if config_path.exists():
@@ -78,7 +158,7 @@ class ModelManager:
                         with open(config_path, 'r') as f:
                             config = json.load(f)
                         return {
-                            "name": metadata["active_model"],
+                            "name": active_name,
                             "path": str(active_path),
                             "config_path": str(config_path),
                             "activated_at": metadata.get("last_activated"),
@@ -137,14 +217,9 @@ class ModelManager:
                 logger.error(f"Config not found for {model_name}")
                 return False
             
-            # Clear active directory
-            if self.active_dir.exists():
-                shutil.rmtree(self.active_dir)
-            self.active_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Move model to active directory
-            active_model_path = self.active_dir / model_name
-            shutil.copytree(model_path, active_model_path)
+            # Swap the active pointer - the model stays where it is
+            write_active_pointer(self.active_dir, model_name)
+            remove_legacy_active_copies(self.active_dir)
             
             # Update metadata
             metadata = self._load_metadata()
@@ -167,9 +242,8 @@ class ModelManager:
             True if successful
         """
         try:
-            if self.active_dir.exists():
-                shutil.rmtree(self.active_dir)
-            self.active_dir.mkdir(parents=True, exist_ok=True)
+            clear_active_pointer(self.active_dir)
+            remove_legacy_active_copies(self.active_dir)
             
             metadata = self._load_metadata()
             metadata["active_model"] = None
@@ -195,6 +269,10 @@ class ModelManager:
         try:
             model_path = self.inactive_dir / model_name
             
+            if read_active_pointer(self.active_dir) == model_name:
+                logger.error(f"Cannot delete active model: {model_name}")
+                return False
+            
             if model_path.exists():
                 shutil.rmtree(model_path)
                 logger.info(f"Model deleted: {model_name}")
@@ -0,0 +1,262 @@
+"""
+Model Sync - Cross-Worker Activation
+An activation is handled by one gunicorn worker only. It publishes a new
+model generation in generation.json next to metadata.json; every worker
+polls that file and reloads (or drops) its model when the generation
+changes, so all workers converge within MODEL_SYNC_INTERVAL plus load time.
+Each worker reports its applied generation in workers/<pid>.json.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from metrics import set_model_generation
+
+logger = logging.getLogger(__name__)
+
+GENERATION_FILE = "generation.json"
+GENERATION_LOCK = "generation.lock"
+WORKERS_DIR = "workers"
+
+
+def _write_json_atomic(path: Path, data: Dict):
+    """Write JSON to a temp file and rename it over the target."""
+    temp_path = path.parent / f".{path.name}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+
+def read_generation(base_path: Path) -> Dict:
+    """Return the published model generation (generation 0 = nothing published yet)."""
+    try:
+        with open(Path(base_path) / GENERATION_FILE, 'r') as f:
+            state = json.load(f)
+        return {
+            'generation': int(state.get('generation', 0)),
+            'active_model': state.get('active_model'),
+            'variant': state.get('variant', 'float'),
+            'updated_at': state.get('updated_at')
+        }
+    except FileNotFoundError:
+        return {'generation': 0, 'active_model': None, 'variant': 'float', 'updated_at': None}
+    except Exception as e:
+        logger.error(f"Error reading model generation: {e}")
+        return {'generation': 0, 'active_model': None, 'variant': 'float', 'updated_at': None}
+
+
+def bump_generation(base_path: Path, active_model: Optional[str], variant: str = 'float') -> int:
+    """
+    Publish a new model generation for all workers.
+
+    Args:
+        base_path: Model base directory (holds metadata.json)
+        active_model: Model every worker should serve (None = no model)
+        variant: Model variant to load ('float' or 'int8')
+
+    Returns:
+        The new generation number
+    """
+    base_path = Path(base_path)
+    base_path.mkdir(parents=True, exist_ok=True)
+    with open(base_path / GENERATION_LOCK, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            generation = read_generation(base_path)['generation'] + 1
+            _write_json_atomic(base_path / GENERATION_FILE, {
+                'generation': generation,
+                'active_model': active_model,
+                'variant': variant,
+                'updated_at': datetime.now().isoformat()
+            })
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+    logger.info(f"Published model generation {generation} ({active_model or 'no model'})")
+    return generation
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class ModelSync:
+    """Keeps this worker's model in step with the published generation"""
+
+    def __init__(self, base_path: str, interval: float = 2.0,
+                 reload_fn: Optional[Callable[[Dict], Optional[Callable]]] = None):
+        """
+        Initialize model sync. The watcher thread starts with start().
+
+        Args:
+            base_path: Model base directory (holds generation.json)
+            interval: Seconds between generation checks (0 disables the watcher)
+            reload_fn: Called with the published state when the generation changed;
+                       must make this worker serve state['active_model']. May return a
+                       cleanup (draining the previous model), run in the background once
+                       the lock is released
+        """
+        self.base_path = Path(base_path)
+        self.interval = interval
+        self.reload_fn = reload_fn
+        self.generation = None
+        self.model_name = None
+        self.last_error = None
+        # Held while this worker switches models, so a local activation and
+        # the watcher never install models out of order
+        self.lock = threading.RLock()
+        self._thread = None
+        self._pid = None
+
+    def start(self, model_name: Optional[str] = None, generation: Optional[int] = None):
+        """
+        Adopt a generation and start watching (again after fork).
+
+        Args:
+            model_name: Model this worker serves
+            generation: Generation read before that model was loaded (default: the
+                current one); later activations are then applied by the watcher
+        """
+        with self.lock:
+            self.generation = read_generation(self.base_path)['generation'] if generation is None else generation
+            self.model_name = model_name
+        self.report()
+
+        if self.interval <= 0:
+            return
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name='model-sync', daemon=True)
+        self._thread.start()
+        logger.info(f"Model sync started (generation={self.generation}, interval={self.interval}s)")
+
+    def publish(self, active_model: Optional[str], variant: str = 'float') -> int:
+        """Publish a model change made by this worker; it is already applied here"""
+        with self.lock:
+            self.generation = bump_generation(self.base_path, active_model, variant)
+            self.model_name = active_model
+            self.last_error = None
+        self.report()
+        return self.generation
+
+    def check(self) -> bool:
+        """
+        Apply a newer published generation to this worker.
+
+        Returns:
+            True if the worker switched models
+        """
+        cleanup = None
+        with self.lock:
+            state = read_generation(self.base_path)
+            if state['generation'] == self.generation:
+                return False
+            try:
+                if self.reload_fn is not None:
+                    cleanup = self.reload_fn(state)
+            except Exception as e:
+                # Keep the old generation so the next check retries
+                logger.error(f"Worker {os.getpid()} failed to apply generation "
+                             f"{state['generation']}: {e}", exc_info=True)
+                self.last_error = str(e)
+                changed = False
+            else:
+                logger.info(f"Worker {os.getpid()} applied model generation {state['generation']} "
+                            f"({state['active_model'] or 'no model'})")
+                self.generation = state['generation']
+                self.model_name = state['active_model']
+                self.last_error = None
+                changed = True
+        if cleanup is not None:
+            # Neither local activations nor the caller wait for the old model to drain
+            threading.Thread(target=cleanup, name='model-release', daemon=True).start()
+        self.report()
+        return changed
+
+    def _run(self):
+        """Watcher thread main loop"""
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Model sync check failed: {e}")
+
+    def report(self):
+        """Write this worker's applied generation for /api/status"""
+        set_model_generation(self.generation)
+        workers_dir = self.base_path / WORKERS_DIR
+        try:
+            workers_dir.mkdir(parents=True, exist_ok=True)
+            _write_json_atomic(workers_dir / f"{os.getpid()}.json", {
+                'pid': os.getpid(),
+                'generation': self.generation,
+                'model': self.model_name,
+                'error': self.last_error,
+                'updated_at': datetime.now().isoformat()
+            })
+        except Exception as e:
+            logger.error(f"Error writing worker state: {e}")
+
+    def worker_states(self) -> List[Dict]:
+        """Applied generation of every live worker (stale entries are removed)"""
+        workers_dir = self.base_path / WORKERS_DIR
+        if not workers_dir.exists():
+            return []
+
+        states = []
+        for path in workers_dir.glob('*.json'):
+            try:
+                with open(path, 'r') as f:
+                    state = json.load(f)
+            except Exception:
+                continue
+            if not _pid_alive(int(state.get('pid', 0))):
+                path.unlink(missing_ok=True)
+                continue
+            states.append(state)
+        return sorted(states, key=lambda state: state['pid'])
+
+    def get_stats(self) -> Dict:
+        """Get sync state of this worker and the published generation"""
+        published = read_generation(self.base_path)
+        return {
+            'generation': self.generation,
+            'published_generation': published['generation'],
+            'in_sync': self.generation == published['generation'],
+            'interval': self.interval,
+            'last_error': self.last_error
+        }
+
+
+# Global model sync instance
+model_sync = None
+
+
+def init_model_sync(base_path: str, interval: float = 2.0,
+                    reload_fn: Optional[Callable[[Dict], Optional[Callable]]] = None):
+    """Initialize the global model sync"""
+    global model_sync
+    model_sync = ModelSync(base_path, interval, reload_fn)
+    logger.info(f"Model sync initialized at {base_path}")
+
+
+def get_model_sync() -> ModelSync:
+    """Get the global model sync (initialize if needed)"""
+    global model_sync
+    if model_sync is None:
+        init_model_sync("./models")
+    return model_sync
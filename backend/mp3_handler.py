@@ -2,20 +2,126 @@
 MP3 Download Handler - Production-Ready
 Robust MP3 conversion and download mechanism with proper error handling,
 temporary file management, and browser compatibility.
+
+Also the server-side encoder stage: 16-bit PCM is encoded incrementally
+to MP3, Opus (Ogg) or FLAC with PyAV as the model produces it, so clients
+no longer download WAV and transcode it themselves.
 """
 
 import os
+import importlib.util
 import tempfile
 from pathlib import Path
-from io import BytesIO
 import logging
 from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from audio_processing import read_pcm16
 
 logger = logging.getLogger(__name__)
 
+# Output formats of /api/tts; WAV needs no encoder
+AUDIO_FORMATS = {
+    'wav': {'mimetype': 'audio/wav', 'extension': 'wav'},
+    'mp3': {'mimetype': 'audio/mpeg', 'extension': 'mp3',
+            'container': 'mp3', 'codec': 'libmp3lame', 'bit_rate': 64000},
+    'opus': {'mimetype': 'audio/ogg', 'extension': 'opus',
+             'container': 'ogg', 'codec': 'libopus', 'bit_rate': 32000,
+             'sample_rate': 24000},  # Opus does not support 22.05 kHz
+    'flac': {'mimetype': 'audio/flac', 'extension': 'flac',
+             'container': 'flac', 'codec': 'flac'},
+}
+
+# Accept header media types per format (first match wins, WAV first for */*)
+ACCEPT_MIMETYPES = [
+    ('audio/wav', 'wav'), ('audio/x-wav', 'wav'), ('audio/wave', 'wav'),
+    ('audio/mpeg', 'mp3'), ('audio/mp3', 'mp3'),
+    ('audio/ogg', 'opus'), ('audio/opus', 'opus'),
+    ('audio/flac', 'flac'), ('audio/x-flac', 'flac'),
+]
+
+# Samples fed to the encoder per call when encoding a complete buffer
+ENCODE_CHUNK_SAMPLES = 22050
+
+
+def encoder_available() -> bool:
+    """True if PyAV (FFmpeg bindings) is installed."""
+    return importlib.util.find_spec('av') is not None
+
+
+class _ChunkSink:
+    """Write-only file object collecting muxer output (not seekable, so muxers never rewind)"""
+
+    def __init__(self, chunks: List[bytes]):
+        self._chunks = chunks
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+
+class StreamingEncoder:
+    """Encodes mono 16-bit PCM chunk by chunk; encoded bytes are returned as soon as they exist"""
+
+    def __init__(self, audio_format: str, sample_rate: int = 22050):
+        """
+        Open an encoder.
+
+        Args:
+            audio_format: 'mp3', 'opus' or 'flac'
+            sample_rate: Sample rate of the PCM passed to encode()
+        """
+        import av
+
+        spec = AUDIO_FORMATS[audio_format]
+        self.audio_format = audio_format
+        self.sample_rate = sample_rate
+        self._chunks = []
+        self._container = av.open(_ChunkSink(self._chunks), 'w', format=spec['container'])
+        self._stream = self._container.add_stream(spec['codec'], rate=spec.get('sample_rate', sample_rate))
+        self._stream.layout = 'mono'
+        if 'bit_rate' in spec:
+            self._stream.bit_rate = spec['bit_rate']
+        self._closed = False
+
+    def _drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+    def encode(self, pcm: np.ndarray) -> bytes:
+        """Encode the next PCM chunk; returns the encoded bytes available so far."""
+        import av
+
+        pcm = np.ascontiguousarray(pcm, dtype=np.int16).reshape(1, -1)
+        if pcm.shape[1]:
+            frame = av.AudioFrame.from_ndarray(pcm, format='s16', layout='mono')
+            frame.sample_rate = self.sample_rate
+            # PyAV resamples and re-frames to the codec's sample format and frame size
+            for packet in self._stream.encode(frame):
+                self._container.mux(packet)
+        return self._drain()
+
+    def finish(self) -> bytes:
+        """Flush the encoder and close the container; returns the remaining bytes."""
+        if self._closed:
+            return b''
+        self._closed = True
+        for packet in self._stream.encode(None):
+            self._container.mux(packet)
+        self._container.close()
+        return self._drain()
+
+
+def wav_to_pcm16(wav_bytes: bytes) -> np.ndarray:
+    """Read 16-bit PCM samples from a WAV file (e.g. cached audio)."""
+    return read_pcm16(wav_bytes)
+
 
 class MP3Handler:
-    """Production-grade MP3 download handler"""
+    """Production-grade MP3 download handler and streaming encoder"""
     
     def __init__(self, temp_dir: str = "./temp/mp3"):
         """
@@ -71,6 +177,56 @@ class MP3Handler:
             logger.error(f"Failed to save MP3 to disk: {e}")
             raise
     
+    def available_formats(self) -> List[str]:
+        """Formats this server can produce"""
+        if encoder_available():
+            return list(AUDIO_FORMATS)
+        return ['wav']
+
+    def negotiate_format(self, requested: Optional[str], accept_mimetypes=None) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Pick the output format from an explicit format parameter or the Accept header.
+
+        Args:
+            requested: Value of the 'format' parameter (takes precedence)
+            accept_mimetypes: werkzeug MIMEAccept of the request
+
+        Returns:
+            (format, error) - error is set if the requested format cannot be produced
+        """
+        available = self.available_formats()
+        if requested:
+            requested = str(requested).lower()
+            if requested not in AUDIO_FORMATS:
+                return None, f"Unsupported format: {requested} (use one of {', '.join(AUDIO_FORMATS)})"
+            if requested not in available:
+                return None, f"Format {requested} is not available on this server"
+            return requested, None
+
+        if accept_mimetypes:
+            offered = [mimetype for mimetype, audio_format in ACCEPT_MIMETYPES if audio_format in available]
+            best = accept_mimetypes.best_match(offered)
+            if best:
+                return dict(ACCEPT_MIMETYPES)[best], None
+        return 'wav', None
+
+    def create_encoder(self, audio_format: str, sample_rate: int = 22050) -> StreamingEncoder:
+        """Open a streaming encoder for one response"""
+        return StreamingEncoder(audio_format, sample_rate)
+
+    def iter_encode(self, pcm: np.ndarray, audio_format: str, sample_rate: int = 22050) -> Iterator[bytes]:
+        """Encode a complete PCM buffer, yielding encoded bytes chunk by chunk"""
+        encoder = self.create_encoder(audio_format, sample_rate)
+        for start in range(0, len(pcm), ENCODE_CHUNK_SAMPLES):
+            data = encoder.encode(pcm[start:start + ENCODE_CHUNK_SAMPLES])
+            if data:
+                yield data
+        yield encoder.finish()
+
+    def encode(self, pcm: np.ndarray, audio_format: str, sample_rate: int = 22050) -> bytes:
+        """Encode a complete PCM buffer"""
+        return b''.join(self.iter_encode(pcm, audio_format, sample_rate))
+
     def get_download_headers(self, filename: str) -> dict:
         """
         Get proper HTTP headers for browser download.
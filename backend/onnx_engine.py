@@ -0,0 +1,418 @@
+"""
+ONNX Runtime Engine - Torch-Free Inference
+At upload time the VITS inference path is exported to model.onnx together
+with onnx_frontend.json (tokenizer vocabulary, phonemizer settings and
+reference token ids). With TTS_ENGINE=onnx, workers serve synthesis through
+ONNX Runtime on CPU and this module's own text front end, so neither torch
+nor Coqui is imported.
+
+The front end mirrors Coqui's TTSTokenizer (cleaner -> espeak phonemes with
+punctuation restore -> ids -> blank interspersing). It is checked against
+the token ids recorded at export, so a mismatching espeak installation is
+detected at load instead of producing garbled speech.
+"""
+
+import importlib.util
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ONNX_MODEL = 'model.onnx'
+ONNX_FRONTEND = 'onnx_frontend.json'
+
+# Coqui's default phonemizer punctuation marks
+DEFAULT_PUNCTUATIONS = ';:,.!?¡¿—…"«»“”'
+
+# Sentences whose token ids are recorded at export to validate the front end
+CHECK_SENTENCES = [
+    "Moin, wo geiht di dat?",
+    "Dat Wedder is hüüt good; de Sünn schient!",
+    "Ik heff keen Tied - man morgen kaam ik.",
+]
+
+# ONNX Runtime intra-op threads per worker (set after fork)
+_num_threads = 1
+
+
+def onnxruntime_available() -> bool:
+    """True if onnxruntime is installed."""
+    return importlib.util.find_spec('onnxruntime') is not None
+
+
+def has_onnx_artifacts(model_dir: Path) -> bool:
+    """True if a model directory holds an exported ONNX graph and front end."""
+    model_dir = Path(model_dir)
+    return (model_dir / ONNX_MODEL).exists() and (model_dir / ONNX_FRONTEND).exists()
+
+
+def set_num_threads(num_threads: int):
+    """Threads for ONNX Runtime sessions created from now on in this process."""
+    global _num_threads
+    _num_threads = max(1, int(num_threads))
+
+
+# =============================================================================
+# EXPORT (runs where torch and Coqui are installed)
+# =============================================================================
+
+def export_onnx(model_dir: Path, vits) -> Dict:
+    """
+    Export the VITS inference path and its text front end.
+
+    Args:
+        model_dir: Model directory to write model.onnx and onnx_frontend.json to
+        vits: Loaded Coqui Vits module (float weights)
+
+    Returns:
+        Dictionary with the graph size
+    """
+    import torch
+
+    model_dir = Path(model_dir)
+    if getattr(vits, 'num_speakers', 0) > 0 or getattr(vits.args, 'use_language_embedding', False):
+        raise ValueError("ONNX export supports single-speaker, single-language models only")
+
+    original_forward = vits.forward
+    was_training = vits.training
+    vits.eval()
+
+    def onnx_forward(text, text_lengths, scales):
+        # Coqui reads these attributes inside inference(); as traced tensors they become graph inputs
+        vits.inference_noise_scale = scales[0]
+        vits.length_scale = scales[1]
+        vits.inference_noise_scale_dp = scales[2]
+        outputs = vits.inference(text, aux_input={'x_lengths': text_lengths, 'd_vectors': None,
+                                                  'speaker_ids': None, 'language_ids': None,
+                                                  'durations': None})
+        return outputs['model_outputs'], outputs['y_mask']
+
+    previous = (vits.inference_noise_scale, vits.length_scale, vits.inference_noise_scale_dp)
+    target = model_dir / ONNX_MODEL
+    temp_path = model_dir / (ONNX_MODEL + '.tmp')
+    try:
+        vits.forward = onnx_forward
+        tokens = torch.randint(low=1, high=len(vits.tokenizer.characters.vocab), size=(1, 100), dtype=torch.long)
+        lengths = torch.LongTensor([tokens.size(1)])
+        scales = torch.FloatTensor([0.667, 1.0, 0.8])
+        with torch.no_grad():
+            torch.onnx.export(
+                vits, (tokens, lengths, scales), str(temp_path),
+                opset_version=15,
+                input_names=['input', 'input_lengths', 'scales'],
+                output_names=['output', 'output_mask'],
+                dynamic_axes={
+                    'input': {0: 'batch_size', 1: 'phonemes'},
+                    'input_lengths': {0: 'batch_size'},
+                    'output': {0: 'batch_size', 2: 'samples'},
+                    'output_mask': {0: 'batch_size', 2: 'frames'}
+                }
+            )
+        temp_path.replace(target)
+    except Exception:
+        temp_path.unlink(missing_ok=True)
+        raise
+    finally:
+        vits.forward = original_forward
+        vits.inference_noise_scale, vits.length_scale, vits.inference_noise_scale_dp = previous
+        if was_training:
+            vits.train()
+
+    frontend = describe_frontend(vits)
+    with open(model_dir / ONNX_FRONTEND, 'w', encoding='utf-8') as f:
+        json.dump(frontend, f, indent=2, ensure_ascii=False)
+
+    result = {'onnx_bytes': target.stat().st_size}
+    logger.info(f"Exported {ONNX_MODEL} for {model_dir.name} ({result['onnx_bytes'] / 1e6:.1f} MB)")
+    return result
+
+
+def describe_frontend(vits) -> Dict:
+    """Capture everything the torch-free front end needs from a Coqui tokenizer."""
+    tokenizer = vits.tokenizer
+    characters = tokenizer.characters
+    phonemizer = tokenizer.phonemizer if tokenizer.use_phonemes else None
+    config = vits.config
+    audio = config.audio
+
+    text_cleaner = getattr(config, 'text_cleaner', None)
+    return {
+        'vocab': list(characters.vocab),
+        'blank': characters.blank,
+        'bos': characters.bos,
+        'eos': characters.eos,
+        'add_blank': bool(tokenizer.add_blank),
+        'use_eos_bos': bool(tokenizer.use_eos_bos),
+        'text_cleaner': text_cleaner,
+        'use_phonemes': bool(tokenizer.use_phonemes),
+        'phonemizer': phonemizer.name() if phonemizer else None,
+        'phoneme_language': phonemizer.language if phonemizer else None,
+        'espeak_backend': getattr(phonemizer, 'backend', None) if phonemizer else None,
+        'keep_puncs': bool(getattr(phonemizer, '_keep_puncs', True)) if phonemizer else None,
+        'punctuations': (phonemizer._punctuator.puncs if phonemizer and hasattr(phonemizer, '_punctuator')
+                         else DEFAULT_PUNCTUATIONS),
+        'sample_rate': int(audio.sample_rate),
+        'hop_length': int(audio.hop_length),
+        'win_length': int(audio.win_length),
+        'do_trim_silence': bool(audio.get('do_trim_silence') if hasattr(audio, 'get')
+                                else getattr(audio, 'do_trim_silence', False)),
+        'trim_db': getattr(audio, 'trim_db', None) or 45,
+        'checks': [{'text': text, 'ids': [int(i) for i in tokenizer.text_to_ids(text)]}
+                   for text in CHECK_SENTENCES]
+    }
+
+
+# =============================================================================
+# TEXT FRONT END (no torch, no Coqui)
+# =============================================================================
+
+class Punctuation:
+    """Split text at punctuation for phonemization and restore it afterwards (as Coqui does)"""
+
+    BEGIN, END, MIDDLE, ALONE = range(4)
+
+    def __init__(self, puncs: str = DEFAULT_PUNCTUATIONS):
+        self.puncs = puncs
+        self.regex = re.compile(rf"(\s*[{re.escape(puncs)}]+\s*)+")
+
+    def strip(self, text: str) -> str:
+        return re.sub(self.regex, " ", text).strip()
+
+    def strip_to_restore(self, text: str):
+        matches = list(re.finditer(self.regex, text))
+        if not matches:
+            return [text], []
+        if len(matches) == 1 and matches[0].group() == text:
+            return [], [(text, self.ALONE)]
+
+        puncs = []
+        for match in matches:
+            position = self.MIDDLE
+            if match == matches[0] and text.startswith(match.group()):
+                position = self.BEGIN
+            elif match == matches[-1] and text.endswith(match.group()):
+                position = self.END
+            puncs.append((match.group(), position))
+
+        parts = []
+        for index, (punc, _) in enumerate(puncs):
+            split = text.split(punc)
+            prefix, suffix = split[0], punc.join(split[1:])
+            text = suffix
+            if prefix == "":
+                continue
+            parts.append(prefix)
+            if index == len(puncs) - 1 and len(suffix) > 0:
+                parts.append(suffix)
+        return parts, puncs
+
+    def restore(self, parts: List[str], puncs: List[tuple]) -> List[str]:
+        if not puncs:
+            return parts
+        if not parts:
+            return ["".join(punc for punc, _ in puncs)]
+
+        punc, position = puncs[0]
+        if position == self.BEGIN:
+            return self.restore([punc + parts[0]] + parts[1:], puncs[1:])
+        if position == self.END:
+            return [parts[0] + punc] + self.restore(parts[1:], puncs[1:])
+        if position == self.ALONE:
+            return [punc] + self.restore(parts, puncs[1:])
+        if len(parts) == 1:
+            return self.restore([parts[0] + punc], puncs[1:])
+        return self.restore([parts[0] + punc + parts[1]] + parts[2:], puncs[1:])
+
+
+def _collapse_whitespace(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+# Cleaners supported without Coqui (the config names Coqui uses)
+CLEANERS = {
+    None: lambda text: text,
+    'basic_cleaners': lambda text: _collapse_whitespace(text.lower()),
+    'lowercase': lambda text: text.lower(),
+    'phoneme_cleaners': lambda text: _collapse_whitespace(text.replace('"', '')),
+}
+
+
+class TextFrontend:
+    """Text -> token ids, equivalent to the exported Coqui tokenizer"""
+
+    def __init__(self, spec: Dict):
+        """
+        Args:
+            spec: Contents of onnx_frontend.json
+        """
+        self.spec = spec
+        self.char_to_id = {char: index for index, char in enumerate(spec['vocab'])}
+        self.blank_id = self.char_to_id.get(spec.get('blank'))
+        self.bos_id = self.char_to_id.get(spec.get('bos'))
+        self.eos_id = self.char_to_id.get(spec.get('eos'))
+
+        cleaner = spec.get('text_cleaner')
+        if cleaner not in CLEANERS:
+            raise ValueError(f"Text cleaner not supported by the ONNX front end: {cleaner}")
+        self.cleaner = CLEANERS[cleaner]
+
+        self.espeak = None
+        self.punctuation = Punctuation(spec.get('punctuations') or DEFAULT_PUNCTUATIONS)
+        if spec.get('use_phonemes'):
+            if spec.get('phonemizer') not in ('espeak', None):
+                raise ValueError(f"Phonemizer not supported by the ONNX front end: {spec.get('phonemizer')}")
+            backend = spec.get('espeak_backend') or 'espeak-ng'
+            self.espeak = shutil.which(backend) or shutil.which('espeak-ng') or shutil.which('espeak')
+            if self.espeak is None:
+                raise RuntimeError("espeak-ng is required for phoneme-based models")
+            self.espeak_ng = 'espeak-ng' in os.path.basename(self.espeak)
+
+    def _espeak(self, text: str) -> str:
+        """Phonemize one punctuation-free segment (same flags as Coqui's ESpeak wrapper)."""
+        ipa = '--ipa=1' if self.espeak_ng else '--ipa=3'
+        args = [self.espeak, '-q', '-b', '1', '-v', self.spec['phoneme_language'], ipa, '"' + text + '"']
+        output = subprocess.run(args, capture_output=True, check=True).stdout
+        phonemes = ""
+        for line in output.splitlines():
+            decoded = line.decode('utf8').strip()
+            # espeak-ng marks language switches like "(en)" - drop them
+            decoded = re.sub(r"\(.+?\)", "", decoded)
+            phonemes += decoded.strip()
+        return phonemes.replace("_", "")
+
+    def phonemize(self, text: str) -> str:
+        text = text.strip()
+        if self.spec.get('keep_puncs', True):
+            parts, puncs = self.punctuation.strip_to_restore(text)
+        else:
+            parts, puncs = [self.punctuation.strip(text)], []
+        phonemized = [self._espeak(part) for part in parts]
+        if self.spec.get('keep_puncs', True):
+            return self.punctuation.restore(phonemized, puncs)[0]
+        return phonemized[0]
+
+    def text_to_ids(self, text: str) -> List[int]:
+        text = self.cleaner(text)
+        if self.espeak is not None:
+            text = self.phonemize(text)
+
+        # Unknown symbols are dropped, as in Coqui
+        ids = [self.char_to_id[char] for char in text if char in self.char_to_id]
+
+        if self.spec.get('add_blank'):
+            interspersed = [self.blank_id] * (len(ids) * 2 + 1)
+            interspersed[1::2] = ids
+            ids = interspersed
+        if self.spec.get('use_eos_bos'):
+            ids = [self.bos_id] + ids + [self.eos_id]
+        return ids
+
+    def verify(self) -> List[str]:
+        """Compare with the token ids recorded at export; returns the mismatching texts."""
+        return [check['text'] for check in self.spec.get('checks', [])
+                if self.text_to_ids(check['text']) != check['ids']]
+
+
+# =============================================================================
+# ENGINE
+# =============================================================================
+
+def split_into_sentences(text: str) -> List[str]:
+    """Sentence segmentation like Coqui's synthesizer (pysbd if installed)."""
+    if importlib.util.find_spec('pysbd') is not None:
+        import pysbd
+        return [s for s in pysbd.Segmenter(language='en', clean=True).segment(text) if s.strip()]
+    return [s for s in re.split(r"(?<=[.!?])\s+", text.strip()) if s]
+
+
+class OnnxTTS:
+    """Drop-in for TTS.api.TTS serving tts() through ONNX Runtime"""
+
+    engine = 'onnx'
+
+    def __init__(self, model_dir: Path, verify: bool = True):
+        """
+        Args:
+            model_dir: Directory with model.onnx and onnx_frontend.json
+            verify: Check the front end against the token ids recorded at export
+        """
+        self.model_dir = Path(model_dir)
+        self.model_path = self.model_dir / ONNX_MODEL
+        with open(self.model_dir / ONNX_FRONTEND, 'r', encoding='utf-8') as f:
+            self.spec = json.load(f)
+        self.frontend = TextFrontend(self.spec)
+        self.sample_rate = self.spec['sample_rate']
+
+        if verify:
+            mismatches = self.frontend.verify()
+            if mismatches:
+                raise RuntimeError(f"ONNX front end does not reproduce the exported tokenizer "
+                                   f"(espeak version?) for: {mismatches}")
+
+        # Sessions own thread pools, which do not survive fork(): one per process
+        self._session = None
+        self._session_pid = None
+        self._lock = threading.Lock()
+
+    def session(self):
+        if self._session is None or self._session_pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._session_pid != os.getpid():
+                    import onnxruntime as ort
+
+                    options = ort.SessionOptions()
+                    options.intra_op_num_threads = _num_threads
+                    options.inter_op_num_threads = 1
+                    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+                    self._session = ort.InferenceSession(str(self.model_path), sess_options=options,
+                                                         providers=['CPUExecutionProvider'])
+                    self._session_pid = os.getpid()
+                    logger.info(f"ONNX Runtime session ready (pid {os.getpid()}, {_num_threads} threads)")
+        return self._session
+
+    def infer(self, ids: List[int], length_scale: float, noise_scale: float,
+              noise_scale_w: float) -> np.ndarray:
+        """Run the graph for one token sequence; returns the trimmed float32 waveform."""
+        inputs = {
+            'input': np.asarray([ids], dtype=np.int64),
+            'input_lengths': np.asarray([len(ids)], dtype=np.int64),
+            'scales': np.asarray([noise_scale, length_scale, noise_scale_w], dtype=np.float32)
+        }
+        output, mask = self.session().run(['output', 'output_mask'], inputs)
+        samples = int(mask[0].sum()) * self.spec['hop_length']
+        return output[0, 0, :samples].astype(np.float32, copy=False)
+
+    def _trim_silence(self, wav: np.ndarray) -> np.ndarray:
+        import librosa
+
+        margin = int(self.sample_rate * 0.01)
+        wav = wav[margin:-margin]
+        return librosa.effects.trim(wav, top_db=self.spec['trim_db'],
+                                    frame_length=self.spec['win_length'],
+                                    hop_length=self.spec['hop_length'])[0]
+
+    def tts(self, text: str, length_scale: float = 1.0, noise_scale: float = 0.667,
+            noise_scale_w: float = 0.8, **kwargs) -> np.ndarray:
+        """Synthesize text sentence by sentence (same pause between sentences as Coqui)."""
+        parts = []
+        for sentence in split_into_sentences(text):
+            ids = self.frontend.text_to_ids(sentence)
+            if not ids:
+                continue
+            wav = self.infer(ids, length_scale, noise_scale, noise_scale_w)
+            if self.spec.get('do_trim_silence'):
+                wav = self._trim_silence(wav)
+            parts.append(wav)
+            parts.append(np.zeros(10000, dtype=np.float32))
+        if not parts:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(parts[:-1])
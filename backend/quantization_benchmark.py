@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Quantization Benchmark - float vs. int8
+Synthesizes a fixed Plattdeutsch sentence set with the float model and the
+int8 dynamic-quantized variant and reports real-time factor and an objective
+quality delta (mel cepstral distortion after DTW alignment, duration change).
+
+Usage:
+    python quantization_benchmark.py --model platt-v1
+    python quantization_benchmark.py --model platt-v1 --runs 5 --output report.json
+
+Loading the int8 variant writes <model>/model_int8.pth if it does not exist yet.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Fixed sentence set: short, medium and long inputs with typical Plattdeutsch spelling
+SENTENCES = [
+    "Moin!",
+    "Wo geiht di dat?",
+    "Hüüt is dat Wedder an de Küst good.",
+    "De Kinner speelt achter dat Huus in'n Goorn.",
+    "Ik heff di dat al gistern seggt, man du hest nich tohöört.",
+    "Wenn de Wind vun de Noordsee weiht, denn warrt dat op'n Diek gau koolt.",
+    "Mien Grootmoder hett jümmers seggt, dat en goden Kaffee an'n Morgen de halve Arbeit is.",
+    "De Schipper hett dat Boot fastmaakt, de Netten trechtleggt un is denn na Huus gahn, "
+    "wiel dat al düster weer.",
+]
+
+# Noise off so both variants synthesize the same utterance
+BENCHMARK_PARAMS = {'length_scale': 1.0, 'noise_scale': 0.0, 'noise_scale_w': 0.0}
+
+
+def mel_cepstral_distortion(reference: np.ndarray, candidate: np.ndarray, sample_rate: int) -> float:
+    """MCD in dB between two waveforms, frames aligned with DTW (c0 excluded)."""
+    import librosa
+
+    ref = librosa.feature.mfcc(y=reference, sr=sample_rate, n_mfcc=25)[1:]
+    cand = librosa.feature.mfcc(y=candidate, sr=sample_rate, n_mfcc=25)[1:]
+    _, path = librosa.sequence.dtw(X=ref, Y=cand, metric='euclidean')
+    diff = ref[:, path[:, 0]] - cand[:, path[:, 1]]
+    return float(np.mean((10.0 / np.log(10.0)) * np.sqrt(2.0 * np.sum(diff ** 2, axis=0))))
+
+
+def synthesize_all(model, runs: int) -> dict:
+    """Synthesize every sentence; returns waveforms and the best-of-runs timing per sentence."""
+    import torch
+
+    from application import normalize_text
+
+    waves, seconds = [], []
+    for sentence in SENTENCES:
+        text = normalize_text(sentence)
+        best = None
+        for _ in range(runs):
+            torch.manual_seed(0)
+            start = time.perf_counter()
+            wave = model.tts(text=text, **BENCHMARK_PARAMS)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        waves.append(np.asarray(wave, dtype=np.float32))
+        seconds.append(best)
+    return {'waves': waves, 'seconds': seconds}
+
+
+def run_benchmark(model_dir: Path, runs: int) -> dict:
+    """Load both variants of a model and compare them sentence by sentence."""
+    import torch
+
+    import application
+    from model_artifacts import quantization_available, ORIGINAL_CHECKPOINT, ORIGINAL_CONFIG
+
+    if not quantization_available():
+        raise RuntimeError("int8 quantization is not supported by this torch build/CPU")
+
+    sample_rate = application.SAMPLE_RATE
+    results = {}
+    for variant in ('float', 'int8'):
+        logger.info(f"Loading {model_dir.name} ({variant})...")
+        start = time.perf_counter()
+        model, info = application.build_model(model_dir / ORIGINAL_CHECKPOINT,
+                                               model_dir / ORIGINAL_CONFIG, variant)
+        load_seconds = time.perf_counter() - start
+        application.warm_up_model(model)
+        results[variant] = dict(synthesize_all(model, runs), load_seconds=load_seconds)
+        del model
+
+    sentences = []
+    for index, sentence in enumerate(SENTENCES):
+        reference = results['float']['waves'][index]
+        candidate = results['int8']['waves'][index]
+        float_audio = len(reference) / sample_rate
+        int8_audio = len(candidate) / sample_rate
+        sentences.append({
+            'text': sentence,
+            'float_rtf': round(results['float']['seconds'][index] / max(float_audio, 1e-6), 4),
+            'int8_rtf': round(results['int8']['seconds'][index] / max(int8_audio, 1e-6), 4),
+            'duration_delta': round((int8_audio - float_audio) / max(float_audio, 1e-6), 4),
+            'mcd_db': round(mel_cepstral_distortion(reference, candidate, sample_rate), 3)
+        })
+
+    def total_rtf(variant):
+        audio = sum(len(wave) for wave in results[variant]['waves']) / sample_rate
+        return round(sum(results[variant]['seconds']) / max(audio, 1e-6), 4)
+
+    summary = {
+        'model': model_dir.name,
+        'runs': runs,
+        'torch_threads': torch.get_num_threads(),
+        'float_rtf': total_rtf('float'),
+        'int8_rtf': total_rtf('int8'),
+        'speedup': round(total_rtf('float') / max(total_rtf('int8'), 1e-6), 3),
+        'mean_mcd_db': round(float(np.mean([s['mcd_db'] for s in sentences])), 3),
+        'max_mcd_db': round(float(np.max([s['mcd_db'] for s in sentences])), 3),
+        'float_load_seconds': round(results['float']['load_seconds'], 2),
+        'int8_load_seconds': round(results['int8']['load_seconds'], 2),
+    }
+    return {'summary': summary, 'sentences': sentences}
+
+
+def print_report(report: dict):
+    summary = report['summary']
+    print('=' * 72)
+    print(f"QUANTIZATION BENCHMARK: {summary['model']} (best of {summary['runs']}, "
+          f"{summary['torch_threads']} threads)")
+    print('=' * 72)
+    print(f"{'sentence':<40} {'RTF f32':>8} {'RTF int8':>8} {'dur Δ':>7} {'MCD dB':>7}")
+    for s in report['sentences']:
+        text = s['text'] if len(s['text']) <= 40 else s['text'][:37] + '...'
+        print(f"{text:<40} {s['float_rtf']:>8.3f} {s['int8_rtf']:>8.3f} "
+              f"{s['duration_delta']:>+7.1%} {s['mcd_db']:>7.2f}")
+    print('-' * 72)
+    print(f"Overall RTF: float {summary['float_rtf']:.3f}, int8 {summary['int8_rtf']:.3f} "
+          f"(speedup {summary['speedup']:.2f}x)")
+    print(f"MCD: mean {summary['mean_mcd_db']:.2f} dB, max {summary['max_mcd_db']:.2f} dB")
+    print(f"Load time: float {summary['float_load_seconds']:.1f}s, int8 {summary['int8_load_seconds']:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the float and int8 variants of a model')
+    parser.add_argument('--model', required=True, help='Model name in MODEL_BASE_PATH/inactive')
+    parser.add_argument('--base-path', help='Model base path (default: MODEL_BASE_PATH)')
+    parser.add_argument('--runs', type=int, default=3, help='Timed runs per sentence (best is kept)')
+    parser.add_argument('--output', help='Write the report as JSON to this file')
+    args = parser.parse_args()
+
+    import application
+
+    if args.base_path:
+        application.Config.MODEL_BASE_PATH = args.base_path
+    model_dir = application.get_model_paths()['inactive'] / args.model
+    if not model_dir.is_dir():
+        print(f"✗ Model not found: {model_dir}")
+        sys.exit(1)
+
+    report = run_benchmark(model_dir, max(1, args.runs))
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n✓ Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
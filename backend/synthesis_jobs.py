@@ -0,0 +1,364 @@
+"""
+Synthesis Jobs - Long-Form Text to Speech
+Articles and book chapters are synthesized on a small background pool
+instead of inside an HTTP request. Every finished sentence is checkpointed
+as 16-bit PCM, so a job interrupted by a worker restart resumes where it
+stopped. Job state lives on disk and can be polled through any worker.
+
+Layout per job:
+    <jobs_dir>/<job_id>/input.json    sentences and synthesis parameters
+    <jobs_dir>/<job_id>/job.json      status and progress
+    <jobs_dir>/<job_id>/parts/        one .pcm checkpoint per sentence
+    <jobs_dir>/<job_id>/audio.wav     result
+"""
+
+import fcntl
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from audio_processing import wav_header
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATES = ('queued', 'running')
+_JOB_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are waiting in this worker"""
+
+
+def _write_json_atomic(path: Path, data: Dict):
+    temp_path = path.parent / f".{path.name}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _process_start(pid: int) -> int:
+    """Start time of a process in clock ticks since boot (0 if unknown)"""
+    try:
+        with open(f'/proc/{pid}/stat', 'rb') as stat:
+            # Fields after the command name, which may contain spaces; starttime is field 22
+            return int(stat.read().rsplit(b')', 1)[1].split()[19])
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def _owner_alive(state: Dict) -> bool:
+    """Whether the worker that owns a job still runs (not another process with its pid)"""
+    pid = int(state.get('pid', 0))
+    if not pid or not _pid_alive(pid):
+        return False
+    started = int(state.get('pid_started') or 0)
+    return not started or _process_start(pid) in (0, started)
+
+
+class SynthesisJobManager:
+    """Runs long-form synthesis jobs on a bounded thread pool with sentence checkpoints"""
+
+    def __init__(self, jobs_dir: str = "./models/synthesis_jobs", max_workers: int = 1,
+                 max_pending: int = 20, sample_rate: int = 22050, pause_samples: int = 10000,
+                 ttl_hours: float = 24, synthesize_fn: Optional[Callable] = None):
+        """
+        Initialize job manager. The pool starts on first use.
+
+        Args:
+            jobs_dir: Directory for job state and audio (shared by all workers)
+            max_workers: Jobs synthesized concurrently by this worker
+            max_pending: Queued + running jobs this worker accepts
+            sample_rate: Sample rate of the synthesized PCM
+            pause_samples: Silence inserted between sentences
+            ttl_hours: Finished jobs are deleted after this many hours
+            synthesize_fn: Callable(sentence, params) -> int16 PCM array
+        """
+        self.jobs_dir = Path(jobs_dir)
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self.sample_rate = sample_rate
+        self.pause_samples = pause_samples
+        self.ttl = ttl_hours * 3600
+        self.synthesize_fn = synthesize_fn
+
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+        self._pending = set()
+        self._cancelled = set()
+
+    # ------------------------------------------------------------------
+    # Job files
+    # ------------------------------------------------------------------
+
+    def _job_dir(self, job_id: str) -> Optional[Path]:
+        if not _JOB_ID.match(job_id or ''):
+            return None
+        return self.jobs_dir / job_id
+
+    def _read_state(self, job_dir: Path) -> Optional[Dict]:
+        try:
+            with open(job_dir / 'job.json', 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error reading synthesis job {job_dir.name}: {e}")
+            return None
+
+    def _update_state(self, job_dir: Path, **changes) -> Dict:
+        state = self._read_state(job_dir) or {}
+        state.update(changes, updated_at=datetime.now().isoformat())
+        _write_json_atomic(job_dir / 'job.json', state)
+        return state
+
+    # ------------------------------------------------------------------
+    # Pool
+    # ------------------------------------------------------------------
+
+    def _ensure_pool(self):
+        """Create the pool (again after fork, threads do not survive it)"""
+        if self._pool is not None and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._pending.clear()
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                        thread_name_prefix='synthesis-job')
+
+    def _enqueue(self, job_id: str):
+        self._pending.add(job_id)
+        self._pool.submit(self._run, job_id)
+
+    def submit(self, sentences: List[str], params: Dict, model_name: Optional[str] = None) -> Dict:
+        """
+        Create a job and queue it.
+
+        Args:
+            sentences: Normalized sentences to synthesize in order
+            params: Clamped synthesis parameters
+            model_name: Model serving when the job was created
+
+        Returns:
+            The job state
+
+        Raises:
+            JobQueueFull: If this worker already has max_pending jobs
+        """
+        self.expire()
+
+        with self._lock:
+            self._ensure_pool()
+            if len(self._pending) >= self.max_pending:
+                raise JobQueueFull(f"Too many synthesis jobs queued (max {self.max_pending})")
+
+            job_id = uuid.uuid4().hex
+            job_dir = self.jobs_dir / job_id
+            (job_dir / 'parts').mkdir(parents=True)
+            _write_json_atomic(job_dir / 'input.json', {'sentences': sentences, 'params': params})
+            state = self._update_state(
+                job_dir,
+                job_id=job_id,
+                status='queued',
+                model_name=model_name,
+                total_sentences=len(sentences),
+                completed_sentences=0,
+                progress=0.0,
+                characters=sum(len(sentence) for sentence in sentences),
+                error=None,
+                pid=os.getpid(),
+                pid_started=_process_start(os.getpid()),
+                created_at=datetime.now().isoformat(),
+                finished_at=None,
+                audio_seconds=None
+            )
+            self._enqueue(job_id)
+
+        logger.info(f"Synthesis job {job_id} queued ({len(sentences)} sentences)")
+        return state
+
+    def resume_orphaned(self) -> int:
+        """
+        Take over unfinished jobs whose worker died (e.g. after a worker restart).
+
+        Returns:
+            Number of resumed jobs
+        """
+        if not self.jobs_dir.exists():
+            return 0
+
+        resumed = 0
+        with open(self.jobs_dir / 'claim.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                with self._lock:
+                    self._ensure_pool()
+                    for job_dir in self.jobs_dir.iterdir():
+                        state = self._read_state(job_dir) if job_dir.is_dir() else None
+                        if not state or state.get('status') not in ACTIVE_STATES:
+                            continue
+                        if _owner_alive(state):
+                            continue
+                        self._update_state(job_dir, status='queued', pid=os.getpid(),
+                                           pid_started=_process_start(os.getpid()))
+                        self._enqueue(job_dir.name)
+                        resumed += 1
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+        if resumed:
+            logger.info(f"Resumed {resumed} interrupted synthesis job(s)")
+        return resumed
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def _run(self, job_id: str):
+        job_dir = self.jobs_dir / job_id
+        try:
+            with open(job_dir / 'input.json', 'r') as f:
+                job_input = json.load(f)
+            sentences = job_input['sentences']
+            params = job_input['params']
+            parts_dir = job_dir / 'parts'
+
+            self._update_state(job_dir, status='running')
+            for index, sentence in enumerate(sentences):
+                if job_id in self._cancelled:
+                    return
+                part = parts_dir / f"{index:05d}.pcm"
+                if part.exists():
+                    continue  # Checkpoint from before an interruption
+
+                pcm = np.asarray(self.synthesize_fn(sentence, params), dtype='<i2')
+                temp_part = parts_dir / f".{index:05d}.tmp"
+                with open(temp_part, 'wb') as f:
+                    f.write(pcm.tobytes())
+                os.replace(temp_part, part)
+
+                self._update_state(job_dir, completed_sentences=index + 1,
+                                   progress=round((index + 1) / len(sentences), 3))
+
+            audio_seconds = self._assemble(job_dir, len(sentences))
+            shutil.rmtree(parts_dir, ignore_errors=True)
+            self._update_state(job_dir, status='completed', progress=1.0,
+                               completed_sentences=len(sentences), audio_seconds=audio_seconds,
+                               finished_at=datetime.now().isoformat())
+            logger.info(f"✓ Synthesis job {job_id} completed ({audio_seconds:.1f}s audio)")
+        except Exception as e:
+            logger.error(f"Synthesis job {job_id} failed: {e}", exc_info=True)
+            if job_dir.exists():
+                self._update_state(job_dir, status='failed', error=str(e),
+                                   finished_at=datetime.now().isoformat())
+        finally:
+            with self._lock:
+                self._pending.discard(job_id)
+                self._cancelled.discard(job_id)
+
+    def _assemble(self, job_dir: Path, count: int) -> float:
+        """Concatenate sentence checkpoints into audio.wav without loading them all at once"""
+        parts = [job_dir / 'parts' / f"{index:05d}.pcm" for index in range(count)]
+        pause = bytes(2 * self.pause_samples)
+        data_bytes = sum(part.stat().st_size for part in parts) + len(pause) * max(0, count - 1)
+
+        temp_path = job_dir / '.audio.wav.tmp'
+        with open(temp_path, 'wb') as out:
+            out.write(wav_header(data_bytes // 2, self.sample_rate))
+            for index, part in enumerate(parts):
+                if index:
+                    out.write(pause)
+                with open(part, 'rb') as f:
+                    shutil.copyfileobj(f, out)
+        os.replace(temp_path, job_dir / 'audio.wav')
+        return data_bytes / 2 / self.sample_rate
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Job state (from any worker), or None if unknown"""
+        job_dir = self._job_dir(job_id)
+        return self._read_state(job_dir) if job_dir is not None else None
+
+    def audio_path(self, job_id: str) -> Optional[Path]:
+        """Path of the finished audio, or None if the job is not completed"""
+        state = self.get(job_id)
+        if not state or state.get('status') != 'completed':
+            return None
+        return self.jobs_dir / job_id / 'audio.wav'
+
+    def delete(self, job_id: str) -> bool:
+        """Cancel a job (if it runs in this worker) and delete its files"""
+        job_dir = self._job_dir(job_id)
+        if job_dir is None or not job_dir.exists():
+            return False
+        with self._lock:
+            if job_id in self._pending:
+                self._cancelled.add(job_id)
+        shutil.rmtree(job_dir, ignore_errors=True)
+        logger.info(f"Synthesis job {job_id} deleted")
+        return True
+
+    def expire(self) -> int:
+        """Delete finished jobs older than the TTL"""
+        if not self.jobs_dir.exists():
+            return 0
+        cutoff = time.time() - self.ttl
+        expired = 0
+        for job_dir in self.jobs_dir.iterdir():
+            state = self._read_state(job_dir) if job_dir.is_dir() else None
+            if not state or state.get('status') in ACTIVE_STATES:
+                continue
+            if (job_dir / 'job.json').stat().st_mtime < cutoff:
+                shutil.rmtree(job_dir, ignore_errors=True)
+                expired += 1
+        return expired
+
+    def get_stats(self) -> Dict:
+        """Get pool statistics for this worker"""
+        return {
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'pending': len(self._pending) if self._pid == os.getpid() else 0
+        }
+
+
+# Global synthesis job manager instance
+synthesis_jobs = None
+
+
+def init_synthesis_jobs(jobs_dir: str = "./models/synthesis_jobs", **kwargs):
+    """Initialize the global synthesis job manager"""
+    global synthesis_jobs
+    synthesis_jobs = SynthesisJobManager(jobs_dir, **kwargs)
+    logger.info(f"Synthesis jobs initialized at {jobs_dir}")
+
+
+def get_synthesis_jobs() -> SynthesisJobManager:
+    """Get the global synthesis job manager (initialize if needed)"""
+    global synthesis_jobs
+    if synthesis_jobs is None:
+        init_synthesis_jobs()
+    return synthesis_jobs
@@ -0,0 +1,95 @@
+"""
+Tests for admission control.
+Verifies load shedding against the SLO, the instance-wide outstanding work
+shared between processes and stale slots.
+"""
+
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_controller(**kwargs):
+    from admission import AdmissionController
+
+    state_path = os.path.join(tempfile.mkdtemp(prefix='tts-admission-'), 'state')
+    return AdmissionController(state_path=state_path, **kwargs)
+
+
+def test_rejects_beyond_slo():
+    """Test that requests are shed once the estimated wait exceeds the SLO."""
+    from admission import Overloaded
+
+    admission = make_controller(slo_seconds=10, capacity=2)
+
+    first = admission.admit(15.0)    # wait 0
+    second = admission.admit(10.0)   # wait 7.5s
+    stats = admission.get_stats()
+    assert stats['queue_depth'] == 2 and stats['estimated_wait_seconds'] == 12.5, f"Unexpected stats: {stats}"
+
+    try:
+        admission.admit(1.0)
+        assert False, "Expected Overloaded"
+    except Overloaded as e:
+        assert e.retry_after == 3, f"Retry-After should cover the excess wait: {e.retry_after}"
+    assert admission.admit(1.0, force=True) == 1.0, "Forced work is never shed"
+
+    admission.finish(first)
+    admission.finish(1.0)
+    admission.admit(1.0)  # wait 5s again
+    stats = admission.get_stats()
+    assert stats['rejected'] == 1, "Rejections should be counted"
+    assert 'seconds_per_char' not in stats, "Costs come from the cost model"
+
+    print("✓ Load shedding passed")
+
+
+def test_outstanding_work_is_shared_between_processes():
+    """Test that work admitted by another process counts, and is dropped when it dies."""
+    admission = make_controller(slo_seconds=5, capacity=1)
+    admitted_read, admitted_write = os.pipe()
+    exit_read, exit_write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # A second worker admits work and dies without finishing it
+        admission.admit(4.0)
+        os.write(admitted_write, b'x')
+        os.read(exit_read, 1)
+        os._exit(0)
+
+    os.read(admitted_read, 1)
+    stats = admission.get_stats()
+    assert stats['queue_depth'] == 1 and stats['outstanding_seconds'] == 4.0, f"Unexpected stats: {stats}"
+    os.write(exit_write, b'x')
+    os.waitpid(pid, 0)
+    assert admission.get_stats()['queue_depth'] == 0, "Work of a dead process should be dropped"
+
+    print("✓ Shared outstanding work passed")
+
+
+def test_stale_slots_are_dropped():
+    """Test that slots of an earlier run are dropped, even if their pid belongs to a live process."""
+    import struct
+    from admission import reset_state
+
+    admission = make_controller(slo_seconds=5, capacity=1)
+    with open(admission.state_path, 'wb') as state:
+        # Left behind by a worker whose pid now belongs to another process
+        state.write(struct.pack('<qqqd', os.getppid(), 1, 3, 50.0))
+    assert admission.get_stats()['queue_depth'] == 0, "A reused pid should not keep stale work"
+
+    admission.admit(2.0)
+    reset_state(admission.state_path)
+    assert os.path.getsize(admission.state_path) == 0, "Reset should empty the state file"
+    reset_state(admission.state_path + '.missing')
+
+    print("✓ Stale slots passed")
+
+
+if __name__ == '__main__':
+    test_rejects_beyond_slo()
+    test_outstanding_work_is_shared_between_processes()
+    test_stale_slots_are_dropped()
@@ -0,0 +1,135 @@
+"""
+Tests for the in-process and on-disk audio caches.
+Verifies LRU ordering, byte budgets, eviction, compaction and statistics.
+"""
+
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_cache_hit_and_miss():
+    """Test that stored audio is returned and lookups are counted."""
+    from audio_cache import AudioCache
+
+    cache = AudioCache(max_bytes=1024)
+    key = cache.make_key('Moin moin.', 1.03, 0.78, 0.92, 'model-a')
+
+    assert cache.get(key) is None, "Empty cache should miss"
+    cache.put(key, b'RIFF' + b'\x00' * 60)
+    assert cache.get(key) == b'RIFF' + b'\x00' * 60, "Stored audio should be returned"
+
+    stats = cache.get_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1, f"Unexpected stats: {stats}"
+
+    print("✓ Cache hit/miss passed")
+
+
+def test_cache_key_depends_on_params_and_model():
+    """Test that parameters and the model fingerprint are part of the key."""
+    from audio_cache import AudioCache
+
+    base = AudioCache.make_key('Moin.', 1.03, 0.78, 0.92, 'model-a')
+    assert base == AudioCache.make_key('Moin.', 1.03, 0.78, 0.92, 'model-a'), "Key must be stable"
+    assert base != AudioCache.make_key('Moin.', 1.2, 0.78, 0.92, 'model-a'), "length_scale must change key"
+    assert base != AudioCache.make_key('Moin.', 1.03, 0.78, 0.92, 'model-b'), "Model must change key"
+
+    print("✓ Cache key passed")
+
+
+def test_cache_evicts_least_recently_used():
+    """Test that the byte budget evicts the least recently used entry."""
+    from audio_cache import AudioCache
+
+    cache = AudioCache(max_bytes=300)
+    cache.put('a', b'a' * 100)
+    cache.put('b', b'b' * 100)
+    cache.put('c', b'c' * 100)
+    cache.get('a')  # 'b' is now least recently used
+    cache.put('d', b'd' * 100)
+
+    assert cache.get('b') is None, "LRU entry should be evicted"
+    assert cache.get('a') is not None, "Recently used entry should survive"
+    assert cache.get_stats()['evictions'] == 1, "Eviction should be counted"
+    assert cache.get_stats()['bytes'] <= 300, "Cache must respect byte budget"
+
+    cache.put('huge', b'x' * 301)
+    assert cache.get('huge') is None, "Entries larger than the budget are not cached"
+
+    cache.clear()
+    assert cache.get_stats()['entries'] == 0, "Clear should drop all entries"
+
+    print("✓ Cache eviction passed")
+
+
+def test_disk_cache_persists_across_instances():
+    """Test that a new cache instance (new worker) sees stored audio."""
+    from disk_cache import DiskAudioCache
+
+    base = tempfile.mkdtemp(prefix='disk-cache-')
+    DiskAudioCache(base).put('k1', b'audio-1', model_name='platt-v1')
+
+    reopened = DiskAudioCache(base)
+    assert reopened.get('k1') == b'audio-1', "Audio should survive a restart"
+    assert reopened.get('missing') is None, "Unknown key should miss"
+
+    assert reopened.drop_model('platt-v1') == 1, "Model scoped entries should be dropped"
+    assert reopened.get('k1') is None, "Dropped entry should miss"
+
+    print("✓ Disk cache persistence passed")
+
+
+def test_disk_cache_evicts_and_compacts_segments():
+    """Test size-based eviction and compaction of sparse segments."""
+    from disk_cache import DiskAudioCache
+
+    base = tempfile.mkdtemp(prefix='disk-cache-')
+    cache = DiskAudioCache(base, max_bytes=2000, segment_bytes=500)
+    for i in range(20):
+        cache.put(f'k{i}', bytes([i]) * 200, model_name='platt-v1')
+
+    stats = cache.get_stats()
+    assert stats['bytes'] <= 2000, f"Store must respect byte budget: {stats}"
+    assert stats['evictions'] > 0, "Old segments should be evicted"
+    assert cache.get('k0') is None, "Oldest entry should be evicted"
+    assert cache.get('k19') == bytes([19]) * 200, "Newest entry should survive"
+
+    segments_before = stats['segments']
+    cache.put('other', b'x' * 200, model_name='platt-v2')
+    cache.drop_model('platt-v1')
+    cache.compact()
+    stats = cache.get_stats()
+    assert stats['entries'] == 1, f"Only the other model should remain: {stats}"
+    assert stats['segments'] <= segments_before, "Sparse segments should be compacted"
+    assert cache.get('other') == b'x' * 200, "Live entry should survive compaction"
+
+    print("✓ Disk cache eviction/compaction passed")
+
+
+def test_disk_cache_budget_below_segment_size():
+    """Test that the byte budget holds when it is smaller than one segment."""
+    from disk_cache import DiskAudioCache
+
+    base = tempfile.mkdtemp(prefix='disk-cache-')
+    cache = DiskAudioCache(base, max_bytes=1000, segment_bytes=64 * 1024)
+    for i in range(20):
+        cache.put(f'k{i}', bytes([i]) * 200)
+        stats = cache.get_stats()
+        assert stats['bytes'] <= 1000, f"Store must respect byte budget after put {i}: {stats}"
+
+    assert cache.get('k19') == bytes([19]) * 200, "Newest entry should survive"
+    assert cache.get('k0') is None, "Oldest entry should be evicted"
+
+    print("✓ Disk cache small budget passed")
+
+
+if __name__ == '__main__':
+    test_cache_hit_and_miss()
+    test_cache_key_depends_on_params_and_model()
+    test_cache_evicts_least_recently_used()
+    test_disk_cache_persists_across_instances()
+    test_disk_cache_evicts_and_compacts_segments()
+    test_disk_cache_budget_below_segment_size()
@@ -0,0 +1,59 @@
+"""
+Tests for audio post-processing.
+Verifies normalization/quantization against the previous float64 path and
+the hand-built WAV format.
+"""
+
+import sys
+import os
+from io import BytesIO
+
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_pcm16_matches_reference():
+    """Test that single-pass quantization matches normalize-then-astype."""
+    from audio_processing import audio_to_pcm16
+
+    rng = np.random.default_rng(0)
+    wav = (rng.standard_normal(22050) * 0.3).astype(np.float32)
+    wav[100] = -1.7  # Negative peak
+
+    reference = (wav.astype(np.float64) / np.max(np.abs(wav)) * 0.95 * 32767).astype(np.int16)
+    pcm = audio_to_pcm16(wav.tolist())
+    assert pcm.dtype == np.int16, f"Unexpected dtype: {pcm.dtype}"
+    assert np.max(np.abs(pcm.astype(np.int32) - reference)) <= 1, "Should match within one LSB"
+    assert pcm[100] == -int(0.95 * 32767), f"Peak should map to 95% full scale: {pcm[100]}"
+
+    assert not audio_to_pcm16(np.zeros(10, dtype=np.float32)).any(), "Silence stays silent"
+    assert len(audio_to_pcm16([])) == 0, "Empty output stays empty"
+
+    print("✓ PCM16 conversion passed")
+
+
+def test_wav_buffer_round_trip():
+    """Test that samples quantized into the preallocated buffer form a valid WAV."""
+    from scipy.io import wavfile
+
+    from audio_processing import allocate_wav, as_float32, peak_scale, quantize, read_pcm16
+
+    wav = as_float32(np.sin(np.arange(1000) / 10.0) * 0.5)
+    buffer, pcm = allocate_wav(len(wav), 22050)
+    quantize(wav, peak_scale(wav), out=pcm)
+    assert np.shares_memory(pcm, np.frombuffer(buffer, dtype=np.uint8)), "Samples should be written in place"
+
+    audio = bytes(buffer)
+    sample_rate, samples = wavfile.read(BytesIO(audio))
+    assert sample_rate == 22050 and samples.dtype == np.int16, "Header should describe mono 16-bit PCM"
+    assert np.array_equal(samples, pcm), "scipy should read back the same samples"
+    assert np.array_equal(read_pcm16(audio), pcm), "read_pcm16 should read back the same samples"
+
+    print("✓ WAV buffer passed")
+
+
+if __name__ == '__main__':
+    test_pcm16_matches_reference()
+    test_wav_buffer_round_trip()
@@ -0,0 +1,57 @@
+"""
+Tests for the benchmark suite.
+Verifies stage timings, latency summaries and the baseline comparison.
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeModel:
+    """Stand-in model returning 0.1s of audio per call"""
+
+    def tts(self, text, **kwargs):
+        return np.full(2205, 0.5, dtype=np.float32)
+
+
+def test_measure_corpus_reports_stages():
+    """Test that the corpus run reports latency percentiles, RTF and every stage."""
+    from benchmark import measure_corpus, STAGES
+
+    report = measure_corpus(FakeModel(), runs=2, presets=['default', 'klar'], buckets=['short'])
+
+    assert [(g['bucket'], g['preset']) for g in report['groups']] == [('short', 'default'), ('short', 'klar')]
+    overall = report['overall']
+    assert overall['requests'] == 2 * 2 * 4, f"Unexpected request count: {overall['requests']}"
+    assert overall['p50_ms'] <= overall['p95_ms'] <= overall['p99_ms'], "Percentiles should be ordered"
+    assert overall['audio_seconds'] > 0 and overall['rtf'] > 0, "RTF should be measured"
+    assert set(report['stages']) == set(STAGES), f"Missing stages: {report['stages'].keys()}"
+    assert abs(sum(s['share'] for s in report['stages'].values()) - 1.0) < 0.01, "Shares should add up"
+
+    print("✓ Corpus measurement passed")
+
+
+def test_compare_reports_flags_regressions():
+    """Test that metrics beyond the tolerance are reported as regressions."""
+    from benchmark import compare_reports
+
+    baseline = {'overall': {'p50_ms': 100.0, 'p95_ms': 200.0, 'rtf': 0.5}, 'peak_rss_mb': 1000.0}
+    result = {'overall': {'p50_ms': 105.0, 'p95_ms': 260.0, 'rtf': 0.4}, 'peak_rss_mb': 1000.0}
+
+    rows = {row['metric']: row for row in compare_reports(result, baseline, tolerance=0.1)}
+    assert not rows['p50 latency']['regression'], "5% is within tolerance"
+    assert rows['p95 latency']['regression'], "30% slower should be a regression"
+    assert not rows['real-time factor']['regression'], "Faster is not a regression"
+    assert 'p99 latency' not in rows, "Metrics missing from the baseline are skipped"
+
+    print("✓ Baseline comparison passed")
+
+
+if __name__ == '__main__':
+    test_measure_corpus_reports_stages()
+    test_compare_reports_flags_regressions()
@@ -0,0 +1,210 @@
+"""
+Tests for API client identification and fair scheduling in the inference pool.
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_parse_clients():
+    """Test that client entries are parsed and invalid ones are skipped."""
+    from clients import ClientRegistry, PUBLIC_CLIENT
+
+    registry = ClientRegistry('reader:k1:4, archive:k2:1:bulk, broken, public:k3, odd:k4:x, other:k5::bulk',
+                              public_weight=2)
+    assert sorted(registry.clients) == ['archive', 'other', 'reader'], f"Unexpected clients: {registry.clients}"
+    assert registry.identify('k1').weight == 4.0 and not registry.identify('k1').bulk
+    assert registry.identify('k2').bulk and registry.identify('k5').weight == 1.0
+    assert registry.identify(None).name == PUBLIC_CLIENT and registry.identify(None).weight == 2.0
+    assert registry.identify('nope') is None, "Unknown keys are not the public client"
+    assert registry.get('removed').name == PUBLIC_CLIENT
+    assert [client.name for client in registry.all()] == ['public', 'archive', 'other', 'reader']
+
+    print("✓ Client parsing passed")
+
+
+def _wait_queued(pool, count):
+    deadline = time.monotonic() + 5
+    while pool.get_stats()['queued'] < count:
+        assert time.monotonic() < deadline, "Calls did not reach the queue"
+        time.sleep(0.005)
+
+
+def test_fair_queue_order():
+    """Test weighted fair order between clients and interactive calls ahead of bulk ones."""
+    from inference_pool import InferencePool
+
+    pool = InferencePool(max_workers=1, max_pending=16)
+    release = threading.Event()
+    order = []
+
+    def call(name):
+        order.append(name)
+
+    blocker = threading.Thread(target=pool.run, args=(release.wait,))
+    blocker.start()
+    while pool.get_stats()['running'] < 1:
+        time.sleep(0.005)
+
+    # Submitted in this order while the only inference thread is busy
+    submissions = [('bulk-1', 'archive', 1.0, True),
+                   ('a-1', 'a', 1.0, False), ('a-2', 'a', 1.0, False), ('a-3', 'a', 1.0, False),
+                   ('b-1', 'b', 3.0, False), ('b-2', 'b', 3.0, False), ('b-3', 'b', 3.0, False)]
+    threads = []
+    for index, (name, client, weight, bulk) in enumerate(submissions):
+        thread = threading.Thread(target=pool.run, args=(call, name),
+                                  kwargs={'client': client, 'weight': weight, 'bulk': bulk})
+        thread.start()
+        threads.append(thread)
+        _wait_queued(pool, index + 1)
+
+    stats = pool.get_stats()
+    assert stats['queued'] == 7 and stats['queued_bulk'] == 1, f"Unexpected stats: {stats}"
+
+    release.set()
+    for thread in threads + [blocker]:
+        thread.join(5)
+
+    # b has three times the share of a; the bulk call waits for all interactive calls
+    assert order == ['a-1', 'b-1', 'b-2', 'b-3', 'a-2', 'a-3', 'bulk-1'], f"Unexpected order: {order}"
+
+    usage = pool.client_stats()
+    assert usage['a']['requests'] == 3 and usage['a']['queued'] == 0, f"Unexpected usage: {usage['a']}"
+    assert usage['archive']['max_queue_wait_ms'] >= usage['b']['max_queue_wait_ms'] > 0
+    assert usage['b']['requests_per_minute'] == 3.0
+
+    print("✓ Fair queue order passed")
+
+
+def test_timed_out_call_is_skipped():
+    """Test that a call that timed out in the queue is never run."""
+    from inference_pool import InferencePool
+
+    pool = InferencePool(max_workers=1)
+    release = threading.Event()
+    ran = []
+
+    blocker = threading.Thread(target=pool.run, args=(release.wait,))
+    blocker.start()
+    while pool.get_stats()['running'] < 1:
+        time.sleep(0.005)
+
+    try:
+        pool.run(ran.append, 'late', timeout=0.05)
+        assert False, "Expected TimeoutError"
+    except TimeoutError:
+        pass
+    assert pool.get_stats()['queued'] == 0, "Timed out calls are not counted as queued"
+
+    release.set()
+    blocker.join(5)
+    assert pool.run(lambda: 'next') == 'next'
+    assert ran == [], "Timed out call should not run"
+    assert pool.get_stats()['timeouts'] == 1
+
+    print("✓ Timed out call passed")
+
+
+def test_shortest_interactive_call_first():
+    """Test that a client's interactive calls run shortest first and bulk calls in order."""
+    from inference_pool import InferencePool
+
+    pool = InferencePool(max_workers=1, max_pending=16)
+    release = threading.Event()
+    order = []
+
+    blocker = threading.Thread(target=pool.run, args=(release.wait,))
+    blocker.start()
+    while pool.get_stats()['running'] < 1:
+        time.sleep(0.005)
+
+    submissions = [('long', 5.0, False), ('short', 0.5, False), ('medium', 2.0, False),
+                   ('bulk-long', 5.0, True), ('bulk-short', 0.5, True)]
+    threads = []
+    for index, (name, cost, bulk) in enumerate(submissions):
+        thread = threading.Thread(target=pool.run, args=(order.append, name),
+                                  kwargs={'cost': cost, 'bulk': bulk})
+        thread.start()
+        threads.append(thread)
+        _wait_queued(pool, index + 1)
+
+    release.set()
+    for thread in threads + [blocker]:
+        thread.join(5)
+
+    assert order == ['short', 'medium', 'long', 'bulk-long', 'bulk-short'], f"Unexpected order: {order}"
+
+    print("✓ Shortest job first passed")
+
+
+def test_timed_out_running_call_keeps_slot():
+    """Test that a model call outliving its request still counts against max_pending."""
+    from inference_pool import InferencePool
+
+    pool = InferencePool(max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    assert pool.try_admit()
+    try:
+        pool.run(release.wait, timeout=0.05)
+        assert False, "Expected TimeoutError"
+    except TimeoutError:
+        pass
+    pool.release()
+    assert not pool.try_admit(), "The still running call should keep the slot"
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while pool.get_stats()['running']:
+        assert time.monotonic() < deadline, "Call did not finish"
+        time.sleep(0.005)
+    assert pool.try_admit(), "The slot should be free once the call finished"
+    pool.release()
+
+    print("✓ Slot held by running call passed")
+
+
+def test_bulk_keeps_minimum_share():
+    """Test that bulk calls still run while interactive calls keep arriving."""
+    from inference_pool import InferencePool
+
+    pool = InferencePool(max_workers=1, max_pending=32, bulk_share=0.2)
+    release = threading.Event()
+    order = []
+
+    blocker = threading.Thread(target=pool.run, args=(release.wait,))
+    blocker.start()
+    while pool.get_stats()['running'] < 1:
+        time.sleep(0.005)
+
+    submissions = [('bulk-1', True), ('bulk-2', True)] + [(f'a-{index}', False) for index in range(20)]
+    threads = []
+    for index, (name, bulk) in enumerate(submissions):
+        thread = threading.Thread(target=pool.run, args=(order.append, name),
+                                  kwargs={'client': 'archive' if bulk else 'a', 'bulk': bulk})
+        thread.start()
+        threads.append(thread)
+        _wait_queued(pool, index + 1)
+
+    release.set()
+    for thread in threads + [blocker]:
+        thread.join(5)
+
+    # One bulk second per four interactive seconds
+    assert order.index('bulk-1') == 4 and order.index('bulk-2') == 9, f"Unexpected order: {order}"
+
+    print("✓ Bulk share passed")
+
+
+if __name__ == '__main__':
+    test_parse_clients()
+    test_fair_queue_order()
+    test_timed_out_call_is_skipped()
+    test_timed_out_running_call_keeps_slot()
+    test_shortest_interactive_call_first()
+    test_bulk_keeps_minimum_share()
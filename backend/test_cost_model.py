@@ -0,0 +1,107 @@
+"""
+Tests for the synthesis cost model.
+Verifies the prior, online refitting per model and the saved state,
+also when several workers save at once.
+"""
+
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def synthetic_seconds(characters, phonemes, length_scale):
+    """Timing of a made-up model: fixed overhead, encoder per phoneme, decoder per output frame."""
+    return 0.05 + 0.0005 * characters + 0.002 * phonemes + 0.006 * phonemes * length_scale
+
+
+def test_prior_before_observations():
+    """Test that an unseen model is predicted from the seconds per character."""
+    from cost_model import CostModel
+
+    model = CostModel(seconds_per_char=0.01, instance='test')
+    assert abs(model.predict('m1', 200) - 2.0) < 1e-9, f"Unexpected prior: {model.predict('m1', 200)}"
+    assert model.get_stats('m1')['observations'] == 0
+
+    print("✓ Prior passed")
+
+
+def test_refits_from_observed_timings():
+    """Test that predictions follow observed timings, with phonemes and length_scale."""
+    from cost_model import CostModel
+
+    model = CostModel(seconds_per_char=0.01, forgetting=0.99, instance='test')
+    for index in range(200):
+        characters = 20 + (index * 37) % 400
+        phonemes = int(characters * (1.1 + 0.2 * (index % 3)))
+        length_scale = 0.8 + 0.1 * (index % 5)
+        model.observe('m1', characters, phonemes, length_scale,
+                      synthetic_seconds(characters, phonemes, length_scale))
+
+    for characters, phonemes, length_scale in [(50, 60, 1.0), (300, 390, 1.2), (150, 170, 0.8)]:
+        expected = synthetic_seconds(characters, phonemes, length_scale)
+        predicted = model.predict('m1', characters, length_scale, phonemes)
+        assert abs(predicted - expected) < 0.05 * expected, f"Predicted {predicted}, expected {expected}"
+
+    slow, fast = model.predict('m1', 200, 1.5), model.predict('m1', 200, 0.8)
+    assert slow > fast, "Slower speech should take longer to synthesize"
+    assert abs(model.get_stats('m1')['phonemes_per_char'] - 1.3) < 0.1, "Phoneme ratio should be learned"
+    assert model.predict('m2', 200) == 2.0, "Other models keep their own fit"
+
+    print("✓ Online refit passed")
+
+
+def test_state_is_saved_per_instance_type():
+    """Test that fitted state seeds new workers of the same instance type only."""
+    from cost_model import CostModel
+
+    state_path = os.path.join(tempfile.mkdtemp(prefix='tts-cost-'), 'cost_model.json')
+    model = CostModel(state_path, seconds_per_char=0.01, save_every=5, instance='c7g.xlarge')
+    for _ in range(10):
+        model.observe('m1', 100, 120, 1.0, 3.0)
+    assert os.path.exists(state_path), "State should be saved"
+
+    restarted = CostModel(state_path, seconds_per_char=0.01, instance='c7g.xlarge')
+    assert abs(restarted.predict('m1', 100, 1.0, 120) - model.predict('m1', 100, 1.0, 120)) < 1e-9
+    assert restarted.get_stats('m1')['observations'] == 10
+
+    other = CostModel(state_path, seconds_per_char=0.01, instance='m7i.large')
+    assert other.get_stats('m1')['observations'] == 0, "Other instance types start from the prior"
+
+    print("✓ Saved state passed")
+
+
+def test_concurrent_saves_keep_every_fit():
+    """Test that workers saving at the same time do not drop each other's fits."""
+    import json
+    from cost_model import CostModel
+
+    state_path = os.path.join(tempfile.mkdtemp(prefix='tts-cost-'), 'cost_model.json')
+    start_read, start_write = os.pipe()
+    pids = []
+    for worker in range(16):
+        pid = os.fork()
+        if pid == 0:
+            model = CostModel(state_path, seconds_per_char=0.01, save_every=1, instance=f'worker-{worker}')
+            os.read(start_read, 1)
+            model.observe('m1', 100, 120, 1.0, 3.0)
+            os._exit(0)
+        pids.append(pid)
+    os.write(start_write, b'x' * len(pids))
+    for pid in pids:
+        os.waitpid(pid, 0)
+
+    with open(state_path) as f:
+        saved = json.load(f)
+    assert len(saved) == len(pids), f"Lost fits: {sorted(saved)}"
+
+    print("✓ Concurrent saves passed")
+
+
+if __name__ == '__main__':
+    test_prior_before_observations()
+    test_refits_from_observed_timings()
+    test_state_is_saved_per_instance_type()
+    test_concurrent_saves_keep_every_fit()
@@ -0,0 +1,53 @@
+"""
+Tests for the worker CPU layout.
+Verifies core splitting and a short autotune measurement.
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_layout_is_disjoint():
+    """Test that workers get disjoint core sets covering all CPUs."""
+    from cpu_affinity import plan_cpu_layout
+
+    layout = plan_cpu_layout(2, list(range(4)))
+    assert layout == [[0, 1], [2, 3]], f"Unexpected layout: {layout}"
+
+    layout = plan_cpu_layout(3, [0, 1, 2, 3, 4, 5, 6])
+    assert layout == [[0, 1, 2], [3, 4], [5, 6]], f"Uneven split should favour first slots: {layout}"
+
+    layout = plan_cpu_layout(3, [4, 5])
+    assert layout == [[4], [5], [4]], f"More workers than CPUs should share round-robin: {layout}"
+
+    print("✓ CPU layout passed")
+
+
+def test_autotune_measures_layout():
+    """Test one autotune layout with a stand-in model."""
+    from benchmark import candidate_layouts, run_layout
+
+    combos = candidate_layouts(4)
+    assert (2, 2) in combos and (4, 1) in combos, f"Missing layouts: {combos}"
+    assert all(w * t <= 4 for w, t in combos), f"Layouts should fit the CPUs: {combos}"
+
+    class FakeModel:
+        def tts(self, text, **kwargs):
+            return np.zeros(2205, dtype=np.float32)
+
+    result = run_layout(FakeModel(), 2, 1, ['Moin.'], duration=0.2)
+    assert result['workers'] == 2 and len(result['cpus']) == 2, f"Unexpected result: {result}"
+    assert result['requests'] > 0, "Workers should have synthesized"
+    assert result['p50_ms'] <= result['p99_ms'], "p50 should not exceed p99"
+
+    print("✓ Autotune layout passed")
+
+
+if __name__ == '__main__':
+    test_layout_is_disjoint()
+    test_autotune_measures_layout()
@@ -0,0 +1,155 @@
+"""
+Tests for the inference process pool.
+Runs real forked inference processes with a stand-in synthesis function
+and verifies the shared-memory hand-off and error propagation.
+"""
+
+import sys
+import os
+import signal
+import time
+
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def fake_synthesize(text, params, fingerprint):
+    """Stand-in for the model: a ramp whose length depends on text and length_scale."""
+    if text == 'fail':
+        raise ValueError('broken sentence')
+    if text == 'slow':
+        time.sleep(0.5)
+    if text == 'crash':
+        os._exit(1)
+    samples = int(len(text) * 1000 * params['length_scale'])
+    return np.linspace(-1, 1, samples, dtype=np.float32), {'phonemize_seconds': 0.01, 'tokens': len(text)}
+
+
+def make_pool(num_processes=2):
+    from inference_processes import InferenceProcessPool
+
+    pool = InferenceProcessPool(num_processes, synthesize_fn=fake_synthesize)
+    pool.start()
+    return pool
+
+
+def wait_for_pids(pool, count, replaced=()):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        pids = pool.get_stats()['pids']
+        if len(pids) >= count and not set(pids) & set(replaced):
+            break
+        time.sleep(0.05)
+    return pool.get_stats()['pids']
+
+
+def shared_memory_leftovers():
+    if not os.path.isdir('/dev/shm'):
+        return []
+    return [name for name in os.listdir('/dev/shm') if name.startswith('psm_')]
+
+
+def test_audio_returned_through_shared_memory():
+    """Test that waveforms come back intact and their segments are removed."""
+    from metrics import track_phonemization
+    from inference_processes import RemoteModel
+
+    pool = make_pool()
+    pool.attach()
+    try:
+        wav, details = pool.synthesize('Moin', {'length_scale': 1.5}, timeout=30)
+        assert np.array_equal(wav, np.linspace(-1, 1, 6000, dtype=np.float32)), "Waveform should be intact"
+        assert details['tokens'] == 4 and details['process'] in (0, 1), f"Unexpected details: {details}"
+
+        model = RemoteModel(pool, timeout=30)
+        with track_phonemization() as frontend:
+            assert len(model.tts('Moin moin')) == 9000, "RemoteModel should return the samples"
+        assert frontend['tokens'] == 9, "Front-end stats should reach the caller's tracker"
+
+        # Wait for the supervisor to record both process pids
+        wait_for_pids(pool, 2)
+        stats = pool.get_stats()
+        assert len(stats['pids']) == 2 and stats['completed'] == 2, f"Unexpected stats: {stats}"
+        assert not shared_memory_leftovers(), "Shared memory segments should be unlinked"
+
+        print("✓ Shared-memory hand-off passed")
+    finally:
+        pool.stop()
+
+
+def test_errors_are_reported_to_the_caller():
+    """Test that a failed synthesis raises in the web worker and the process keeps serving."""
+    pool = make_pool(num_processes=1)
+    pool.attach()
+    try:
+        try:
+            pool.synthesize('fail', {'length_scale': 1.0}, timeout=30)
+            assert False, "Expected an error"
+        except RuntimeError as e:
+            assert 'broken sentence' in str(e), f"Unexpected error: {e}"
+
+        wav, _ = pool.synthesize('ok', {'length_scale': 1.0}, timeout=30)
+        assert len(wav) == 2000, "Process should keep serving after an error"
+        assert pool.get_stats()['errors'] == 1, "Errors should be counted"
+
+        print("✓ Error propagation passed")
+    finally:
+        pool.stop()
+
+
+def test_dead_inference_process_is_replaced():
+    """Test that killed inference processes, idle or busy, neither hang nor lose the pool."""
+    pool = make_pool(num_processes=1)
+    pool.attach()
+    try:
+        first_pid = wait_for_pids(pool, 1)[0]
+        os.kill(first_pid, signal.SIGKILL)
+        assert first_pid not in wait_for_pids(pool, 1, replaced=[first_pid]), "Process should have been respawned"
+        wav, _ = pool.synthesize('ok', {'length_scale': 1.0}, timeout=30)
+        assert len(wav) == 2000, "Replacement process should serve"
+
+        try:
+            pool.synthesize('crash', {'length_scale': 1.0}, timeout=30)
+            assert False, "Expected an error"
+        except RuntimeError as e:
+            assert 'exited' in str(e), f"Unexpected error: {e}"
+        wav, _ = pool.synthesize('ok', {'length_scale': 1.0}, timeout=30)
+        assert len(wav) == 2000, "Pool should keep serving after a crash"
+
+        print("✓ Dead inference process passed")
+    finally:
+        pool.stop()
+
+
+def test_exited_web_worker_does_not_block_others():
+    """Test that a web worker leaving with a request in flight does not affect the others."""
+    pool = make_pool(num_processes=1)
+    try:
+        pid = os.fork()
+        if pid == 0:
+            # A web worker recycled while its request is being synthesized
+            try:
+                pool.synthesize('slow', {'length_scale': 1.0}, timeout=0.1)
+            except TimeoutError:
+                pass
+            os._exit(0)
+        os.waitpid(pid, 0)
+
+        pool.attach()
+        for text in ('one', 'two', 'three'):
+            wav, _ = pool.synthesize(text, {'length_scale': 1.0}, timeout=30)
+            assert len(wav) == len(text) * 1000, f"Wrong answer for {text!r}"
+        assert not shared_memory_leftovers(), "Audio of the exited worker should be discarded"
+
+        print("✓ Exited web worker passed")
+    finally:
+        pool.stop()
+
+
+if __name__ == '__main__':
+    test_audio_returned_through_shared_memory()
+    test_errors_are_reported_to_the_caller()
+    test_dead_inference_process_is_replaced()
+    test_exited_web_worker_does_not_block_others()
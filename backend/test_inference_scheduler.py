@@ -0,0 +1,100 @@
+"""
+Tests for the micro-batching inference scheduler.
+Uses a recording inference function instead of a VITS model.
+"""
+
+import sys
+import os
+import threading
+
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class RecordingInfer:
+    """Batched inference stand-in that records the batch sizes it receives."""
+
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.fail_on = fail_on
+
+    def __call__(self, model, texts, length_scale, noise_scale, noise_scale_w):
+        self.batches.append(list(texts))
+        if self.fail_on in texts:
+            raise ValueError(f"cannot synthesize {self.fail_on}")
+        return [np.full(len(text), length_scale, dtype=np.float32) for text in texts]
+
+
+def test_concurrent_requests_are_batched():
+    """Test that requests arriving within the window share one forward pass."""
+    from inference_scheduler import InferenceScheduler
+
+    infer = RecordingInfer()
+    scheduler = InferenceScheduler(max_batch_size=8, max_wait_ms=200, infer_fn=infer)
+    results = {}
+
+    def worker(text):
+        results[text] = scheduler.submit('model', [text], 1.0, 0.5, 0.5)[0]
+
+    threads = [threading.Thread(target=worker, args=(f"Satz nummer {i}.",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert len(results) == 4, "Every caller should get a result"
+    assert all(len(wave) == len(text) for text, wave in results.items()), "Each caller gets its own waveform"
+    assert len(infer.batches) == 1, f"Expected a single batch, got {infer.batches}"
+    assert scheduler.get_stats()['max_batch_seen'] == 4, "Stats should record the batch size"
+
+    print("✓ Concurrent batching passed")
+
+
+def test_batches_split_by_params_size_and_length():
+    """Test bucketing by parameters, max batch size and text length."""
+    from inference_scheduler import InferenceScheduler
+
+    infer = RecordingInfer()
+    scheduler = InferenceScheduler(max_batch_size=2, max_wait_ms=0, bucket_width=10, infer_fn=infer)
+
+    texts = ['kort', 'ok kort', 'noch kort', 'dit is en bannig langen Satz']
+    waves = scheduler.submit('model', texts, 1.0, 0.5, 0.5)
+    assert [len(w) for w in waves] == [len(t) for t in texts], "Results must keep request order"
+    assert all(len(batch) <= 2 for batch in infer.batches), "Batches must respect max size"
+    assert ['dit is en bannig langen Satz'] in infer.batches, "Long text should get its own bucket"
+
+    print("✓ Bucketing passed")
+
+
+def test_failing_item_does_not_fail_neighbours():
+    """Test that a batch failure is retried per item."""
+    from inference_scheduler import InferenceScheduler
+
+    infer = RecordingInfer(fail_on='kaputt')
+    scheduler = InferenceScheduler(max_batch_size=8, max_wait_ms=200, infer_fn=infer)
+    outcome = {}
+
+    def worker(text):
+        try:
+            outcome[text] = scheduler.submit('model', [text], 1.0, 0.5, 0.5)[0]
+        except ValueError as e:
+            outcome[text] = e
+
+    threads = [threading.Thread(target=worker, args=(text,)) for text in ('heel', 'kaputt')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert isinstance(outcome['kaputt'], ValueError), "Failing item should raise"
+    assert isinstance(outcome['heel'], np.ndarray), "Neighbour should still succeed"
+
+    print("✓ Failure isolation passed")
+
+
+if __name__ == '__main__':
+    test_concurrent_requests_are_batched()
+    test_batches_split_by_params_size_and_length()
+    test_failing_item_does_not_fail_neighbours()
@@ -0,0 +1,97 @@
+"""
+Tests for model artifact resolution.
+Verifies which checkpoint/config pair the loader picks from a model directory.
+"""
+
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_model_dir(*files):
+    """Create a temporary model directory containing empty files."""
+    model_dir = Path(tempfile.mkdtemp(prefix='model-'))
+    for name in files:
+        (model_dir / name).write_bytes(b'')
+    return model_dir
+
+
+def test_resolve_prefers_slim_checkpoint():
+    """Test that the slim inference artifact is preferred when complete."""
+    from model_artifacts import resolve_model_files
+
+    model_dir = make_model_dir('best_model.pth', 'config.json',
+                               'inference_model.pth', 'inference_config.json')
+    model_path, config_path = resolve_model_files(model_dir)
+    assert model_path.name == 'inference_model.pth', f"Unexpected model: {model_path}"
+    assert config_path.name == 'inference_config.json', f"Unexpected config: {config_path}"
+
+    print("✓ Slim checkpoint preferred")
+
+
+def test_resolve_falls_back_to_training_checkpoint():
+    """Test fallback to best_model.pth when no complete slim pair exists."""
+    from model_artifacts import resolve_model_files, remove_derived_artifacts
+
+    model_dir = make_model_dir('best_model.pth', 'config.json', 'inference_model.pth')
+    model_path, config_path = resolve_model_files(model_dir)
+    assert model_path.name == 'best_model.pth', "Incomplete slim pair must be ignored"
+    assert config_path.name == 'config.json', "Original config expected"
+
+    remove_derived_artifacts(model_dir)
+    assert not (model_dir / 'inference_model.pth').exists(), "Derived artifacts should be removed"
+    assert (model_dir / 'best_model.pth').exists(), "Original checkpoint must be kept"
+
+    print("✓ Training checkpoint fallback passed")
+
+
+def test_resolve_prefers_safetensors_when_available():
+    """Test that model.safetensors wins over the slim checkpoint if importable."""
+    from unittest import mock
+    import model_artifacts
+
+    model_dir = make_model_dir('config.json', 'inference_model.pth',
+                               'inference_config.json', 'model.safetensors')
+
+    with mock.patch.object(model_artifacts, 'safetensors_available', return_value=True):
+        model_path, config_path = model_artifacts.resolve_model_files(model_dir)
+    assert model_path.name == 'model.safetensors', f"Unexpected model: {model_path}"
+    assert config_path.name == 'inference_config.json', "Safetensors pairs with the inference config"
+
+    with mock.patch.object(model_artifacts, 'safetensors_available', return_value=False):
+        model_path, _ = model_artifacts.resolve_model_files(model_dir)
+    assert model_path.name == 'inference_model.pth', "Without safetensors the slim checkpoint is used"
+
+    print("✓ Safetensors preferred")
+
+
+def test_resolve_int8_variant():
+    """Test that the int8 variant uses quantized weights once they exist."""
+    from model_artifacts import resolve_model_files, remove_derived_artifacts
+
+    model_dir = make_model_dir('best_model.pth', 'config.json',
+                               'inference_model.pth', 'inference_config.json')
+    model_path, _ = resolve_model_files(model_dir, 'int8')
+    assert model_path.name == 'inference_model.pth', "Without int8 weights the float model is quantized"
+
+    (model_dir / 'model_int8.pth').write_bytes(b'')
+    model_path, config_path = resolve_model_files(model_dir, 'int8')
+    assert model_path.name == 'model_int8.pth', f"Unexpected model: {model_path}"
+    assert config_path.name == 'inference_config.json', f"Unexpected config: {config_path}"
+    assert resolve_model_files(model_dir)[0].name == 'inference_model.pth', "Float variant is unaffected"
+
+    remove_derived_artifacts(model_dir)
+    assert not (model_dir / 'model_int8.pth').exists(), "Re-upload should drop int8 weights"
+
+    print("✓ int8 variant resolution passed")
+
+
+if __name__ == '__main__':
+    test_resolve_prefers_slim_checkpoint()
+    test_resolve_falls_back_to_training_checkpoint()
+    test_resolve_prefers_safetensors_when_available()
+    test_resolve_int8_variant()
@@ -0,0 +1,76 @@
+"""
+Tests for model activation via the atomic active pointer.
+Verifies that activation swaps a pointer instead of copying model files.
+"""
+
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_manager(*model_names):
+    """Create a ModelManager in a temp directory with empty models."""
+    from model_manager import ModelManager
+
+    manager = ModelManager(tempfile.mkdtemp(prefix='models-'))
+    for name in model_names:
+        model_dir = manager.inactive_dir / name
+        model_dir.mkdir()
+        (model_dir / 'config.json').write_text('{}')
+        (model_dir / 'best_model.pth').write_bytes(b'weights')
+    return manager
+
+
+def test_activation_swaps_pointer_without_copy():
+    """Test that activating a model does not copy it into active/."""
+    from model_manager import read_active_pointer
+
+    manager = make_manager('platt-v1', 'platt-v2')
+
+    assert manager.activate_model('platt-v1'), "Activation should succeed"
+    assert read_active_pointer(manager.active_dir) == 'platt-v1', "Pointer should name the model"
+    assert not (manager.active_dir / 'platt-v1').exists(), "Model must not be copied"
+    assert manager.get_active_model()['path'] == str(manager.inactive_dir / 'platt-v1'), "Active path is in place"
+
+    assert manager.activate_model('platt-v2'), "Switching should succeed"
+    assert read_active_pointer(manager.active_dir) == 'platt-v2', "Pointer should be replaced"
+    leftovers = [p.name for p in manager.active_dir.iterdir() if p.name != 'current.json']
+    assert not leftovers, f"No temporary files should remain: {leftovers}"
+
+    print("✓ Pointer activation passed")
+
+
+def test_deactivate_and_delete_guard():
+    """Test deactivation and that the active model cannot be deleted."""
+    manager = make_manager('platt-v1')
+    manager.activate_model('platt-v1')
+
+    assert not manager.delete_model('platt-v1'), "Active model must not be deleted"
+    assert manager.deactivate_model(), "Deactivation should succeed"
+    assert manager.get_active_model() is None, "No model should be active"
+    assert manager.delete_model('platt-v1'), "Inactive model can be deleted"
+
+    print("✓ Deactivate/delete passed")
+
+
+def test_legacy_active_copies_are_removed():
+    """Test that copies from the old copy-based activation are cleaned up."""
+    manager = make_manager('platt-v1')
+    legacy = manager.active_dir / 'old-model'
+    legacy.mkdir()
+    (legacy / 'best_model.pth').write_bytes(b'old')
+
+    manager.activate_model('platt-v1')
+    assert not legacy.exists(), "Legacy copy should be removed after the pointer swap"
+
+    print("✓ Legacy cleanup passed")
+
+
+if __name__ == '__main__':
+    test_activation_swaps_pointer_without_copy()
+    test_deactivate_and_delete_guard()
+    test_legacy_active_copies_are_removed()
@@ -0,0 +1,106 @@
+"""
+Tests for cross-worker model generation tracking.
+Two ModelSync instances on one directory stand in for two gunicorn workers.
+"""
+
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_published_generation_reaches_other_worker():
+    """Test that a worker follows an activation published by another worker."""
+    from model_sync import ModelSync, read_generation
+
+    base = tempfile.mkdtemp(prefix='model-sync-')
+    applied = []
+    worker_a = ModelSync(base, interval=0)
+    worker_b = ModelSync(base, interval=0, reload_fn=applied.append)
+    worker_a.start()
+    worker_b.start()
+
+    assert not worker_b.check(), "Nothing published yet - nothing to do"
+
+    generation = worker_a.publish('platt-v2')
+    assert read_generation(base)['generation'] == generation == 1, "Generation should be bumped"
+
+    assert worker_b.check(), "Worker B should apply the new generation"
+    assert applied[-1]['active_model'] == 'platt-v2', "Reload should get the published model"
+    assert worker_b.generation == generation, "Worker B should record the applied generation"
+    assert not worker_b.check(), "Same generation must not reload again"
+
+    print("✓ Generation propagation passed")
+
+
+def test_failed_reload_is_retried():
+    """Test that a failed reload keeps the old generation so the next check retries."""
+    from model_sync import ModelSync
+
+    base = tempfile.mkdtemp(prefix='model-sync-')
+    attempts = []
+
+    def flaky_reload(state):
+        attempts.append(state['generation'])
+        if len(attempts) == 1:
+            raise RuntimeError("model files not there yet")
+
+    worker = ModelSync(base, interval=0, reload_fn=flaky_reload)
+    worker.start()
+    ModelSync(base, interval=0).publish(None)
+
+    assert not worker.check(), "Failed reload should not count as applied"
+    assert worker.generation == 0 and worker.last_error, "Error should be recorded"
+    assert worker.check(), "Next check should retry and succeed"
+    assert attempts == [1, 1], f"Unexpected reload attempts: {attempts}"
+
+    states = worker.worker_states()
+    assert [state['pid'] for state in states] == [os.getpid()], f"Unexpected worker states: {states}"
+    assert states[0]['generation'] == 1, "Worker state should report the applied generation"
+
+    print("✓ Reload retry passed")
+
+
+def test_previous_model_drains_outside_the_lock():
+    """Test that draining the previous model neither blocks check() nor holds the sync lock."""
+    import threading
+    from model_sync import ModelSync
+
+    base = tempfile.mkdtemp(prefix='model-sync-')
+    drained = threading.Event()
+    release = threading.Event()
+
+    def drain():
+        release.wait(5)
+        drained.set()
+
+    worker = ModelSync(base, interval=0, reload_fn=lambda state: drain)
+    worker.start()
+    ModelSync(base, interval=0).publish('platt-v2')
+
+    assert worker.check(), "Worker should apply the new generation"
+    assert not drained.is_set(), "check() should not wait for the drain"
+    acquired = []
+
+    def activate():
+        # A local activation in another thread of the same worker
+        acquired.append(worker.lock.acquire(timeout=1))
+        worker.lock.release()
+
+    thread = threading.Thread(target=activate)
+    thread.start()
+    thread.join(5)
+    assert acquired == [True], "Sync lock should be free while the old model drains"
+
+    release.set()
+    assert drained.wait(5), "Previous model should still be released"
+
+    print("✓ Drain outside lock passed")
+
+
+if __name__ == '__main__':
+    test_published_generation_reaches_other_worker()
+    test_failed_reload_is_retried()
+    test_previous_model_drains_outside_the_lock()
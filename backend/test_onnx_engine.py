@@ -0,0 +1,133 @@
+"""
+Tests for the ONNX Runtime engine.
+Verifies the torch-free text front end and serving an exported graph.
+"""
+
+import sys
+import os
+import json
+import tempfile
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+VOCAB = ['<BLNK>', ' ', '!', ',', '.', '?', 'a', 'd', 'e', 'g', 'h', 'i', 'n', 'o', 't', 'w']
+
+
+def make_spec(**overrides):
+    """Front end description of a character-based model, as written at export."""
+    spec = {
+        'vocab': VOCAB,
+        'blank': '<BLNK>',
+        'bos': None,
+        'eos': None,
+        'add_blank': True,
+        'use_eos_bos': False,
+        'text_cleaner': None,
+        'use_phonemes': False,
+        'punctuations': ';:,.!?',
+        'sample_rate': 22050,
+        'hop_length': 1,
+        'win_length': 1024,
+        'do_trim_silence': False,
+        'trim_db': 45,
+        'checks': []
+    }
+    spec.update(overrides)
+    return spec
+
+
+def test_punctuation_restore():
+    """Test that punctuation split off for phonemization is put back in place."""
+    from onnx_engine import Punctuation
+
+    punctuation = Punctuation()
+    for text in ["Moin, wo geiht di dat?", "«Moin»", "Ja!", "...", "Moin wo geiht"]:
+        parts, puncs = punctuation.strip_to_restore(text)
+        assert punctuation.restore(parts, puncs)[0] == text, f"Round trip failed for {text!r}"
+
+    parts, _ = punctuation.strip_to_restore("Moin, wo geiht di dat?")
+    assert parts == ['Moin', 'wo geiht di dat'], f"Unexpected parts: {parts}"
+
+    print("✓ Punctuation restore passed")
+
+
+def test_frontend_tokenizes_like_coqui():
+    """Test id encoding, blank interspersing and the export check vectors."""
+    from onnx_engine import TextFrontend
+
+    frontend = TextFrontend(make_spec())
+    ids = frontend.text_to_ids("tag!")
+    assert ids == [0, 14, 0, 6, 0, 9, 0, 2, 0], f"Unexpected ids: {ids}"
+    assert frontend.text_to_ids("tXg") == [0, 14, 0, 9, 0], "Unknown symbols should be dropped"
+
+    checked = TextFrontend(make_spec(checks=[{'text': 'dat', 'ids': [0, 7, 0, 6, 0, 14, 0]},
+                                             {'text': 'wat', 'ids': [0, 1, 0]}]))
+    assert checked.verify() == ['wat'], "Mismatching check vectors should be reported"
+
+    print("✓ Text front end passed")
+
+
+def test_onnx_engine_serves_graph():
+    """Test synthesis through ONNX Runtime with a stand-in graph."""
+    if importlib.util.find_spec('onnx') is None:
+        print("- onnx not installed, skipping graph check")
+        return
+
+    from onnx import TensorProto, helper
+    from onnx_engine import OnnxTTS, has_onnx_artifacts, onnxruntime_available, ONNX_MODEL, ONNX_FRONTEND
+
+    if not onnxruntime_available():
+        print("- onnxruntime not installed, skipping graph check")
+        return
+
+    # Echoes the token ids scaled by length_scale, one "sample" per token
+    nodes = [
+        helper.make_node('Cast', ['input'], ['ids'], to=TensorProto.FLOAT),
+        helper.make_node('Constant', [], ['index'], value=helper.make_tensor('index', TensorProto.INT64, [], [1])),
+        helper.make_node('Gather', ['scales', 'index'], ['length_scale']),
+        helper.make_node('Mul', ['ids', 'length_scale'], ['scaled']),
+        helper.make_node('Constant', [], ['axis'], value=helper.make_tensor('axis', TensorProto.INT64, [1], [1])),
+        helper.make_node('Unsqueeze', ['scaled', 'axis'], ['output']),
+        helper.make_node('Abs', ['output'], ['magnitude']),
+        helper.make_node('Sign', ['magnitude'], ['nonzero']),
+        helper.make_node('Constant', [], ['one'], value=helper.make_tensor('one', TensorProto.FLOAT, [], [1.0])),
+        helper.make_node('Max', ['nonzero', 'one'], ['output_mask']),
+    ]
+    graph = helper.make_graph(
+        nodes, 'stand_in',
+        [helper.make_tensor_value_info('input', TensorProto.INT64, [1, 'phonemes']),
+         helper.make_tensor_value_info('input_lengths', TensorProto.INT64, [1]),
+         helper.make_tensor_value_info('scales', TensorProto.FLOAT, [3])],
+        [helper.make_tensor_value_info('output', TensorProto.FLOAT, [1, 1, 'phonemes']),
+         helper.make_tensor_value_info('output_mask', TensorProto.FLOAT, [1, 1, 'phonemes'])]
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 15)])
+    model.ir_version = 8
+
+    model_dir = Path(tempfile.mkdtemp(prefix='model-'))
+    (model_dir / ONNX_MODEL).write_bytes(model.SerializeToString())
+    (model_dir / ONNX_FRONTEND).write_text(json.dumps(make_spec(
+        checks=[{'text': 'dat', 'ids': [0, 7, 0, 6, 0, 14, 0]}])))
+    assert has_onnx_artifacts(model_dir), "Artifacts should be detected"
+
+    engine = OnnxTTS(model_dir)
+    wav = engine.tts("dat. tag!", length_scale=2.0)
+    assert wav.dtype == np.float32, f"Unexpected dtype: {wav.dtype}"
+    first = [0, 7, 0, 6, 0, 14, 0, 4, 0]
+    second = [0, 14, 0, 6, 0, 9, 0, 2, 0]
+    assert len(wav) == len(first) + 10000 + len(second), f"Unexpected length: {len(wav)}"
+    assert wav[:len(first)].tolist() == [2.0 * i for i in first], "Tokens should reach the graph"
+    assert not wav[len(first):len(first) + 10000].any(), "Sentences should be joined by silence"
+
+    print("✓ ONNX engine passed")
+
+
+if __name__ == '__main__':
+    test_punctuation_restore()
+    test_frontend_tokenizes_like_coqui()
+    test_onnx_engine_serves_graph()
@@ -0,0 +1,116 @@
+"""
+Tests for long-form synthesis jobs.
+Verifies sentence checkpointing, WAV assembly and resuming interrupted jobs.
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def fake_synthesize(sentence, params):
+    """One 100-sample ramp per character."""
+    return np.arange(len(sentence) * 100, dtype=np.int16)
+
+
+def wait_for(manager, job_id, timeout=5.0):
+    import time
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        state = manager.get(job_id)
+        if state['status'] not in ('queued', 'running'):
+            return state
+        time.sleep(0.01)
+    raise AssertionError(f"Job did not finish: {manager.get(job_id)}")
+
+
+def test_job_assembles_sentences_into_wav():
+    """Test that a job synthesizes every sentence and writes a valid WAV."""
+    from scipy.io import wavfile
+    from synthesis_jobs import SynthesisJobManager
+
+    manager = SynthesisJobManager(tempfile.mkdtemp(prefix='jobs-'), pause_samples=50,
+                                  synthesize_fn=fake_synthesize)
+    job = manager.submit(['Moin.', 'Wo geiht di dat?'], {'length_scale': 1.0})
+    state = wait_for(manager, job['job_id'])
+
+    assert state['status'] == 'completed', f"Unexpected state: {state}"
+    assert state['completed_sentences'] == 2 and state['progress'] == 1.0
+
+    rate, audio = wavfile.read(str(manager.audio_path(job['job_id'])))
+    assert rate == 22050, "WAV should use the configured sample rate"
+    assert len(audio) == 500 + 50 + 1600, f"Unexpected sample count: {len(audio)}"
+
+    assert manager.delete(job['job_id']), "Finished job should be deletable"
+    assert manager.get(job['job_id']) is None, "Deleted job should be gone"
+    assert manager.get('../etc') is None, "Invalid job ids must be rejected"
+
+    print("✓ Job assembly passed")
+
+
+def test_interrupted_job_resumes_from_checkpoint():
+    """Test that a job of a dead worker resumes without redoing finished sentences."""
+    from synthesis_jobs import SynthesisJobManager
+
+    jobs_dir = tempfile.mkdtemp(prefix='jobs-')
+    calls = []
+
+    def counting_synthesize(sentence, params):
+        calls.append(sentence)
+        return fake_synthesize(sentence, params)
+
+    manager = SynthesisJobManager(jobs_dir, synthesize_fn=counting_synthesize)
+    job_id = 'a' * 32
+    job_dir = os.path.join(jobs_dir, job_id)
+    os.makedirs(os.path.join(job_dir, 'parts'))
+    with open(os.path.join(job_dir, 'input.json'), 'w') as f:
+        json.dump({'sentences': ['Een.', 'Twee.', 'Dree.'], 'params': {}}, f)
+    with open(os.path.join(job_dir, 'job.json'), 'w') as f:
+        # Worker with a pid that cannot exist was running it
+        json.dump({'job_id': job_id, 'status': 'running', 'pid': 2 ** 22 + 1,
+                   'total_sentences': 3, 'completed_sentences': 1}, f)
+    fake_synthesize('Een.', {}).tofile(os.path.join(job_dir, 'parts', '00000.pcm'))
+
+    assert manager.resume_orphaned() == 1, "Orphaned job should be picked up"
+    state = wait_for(manager, job_id)
+
+    assert state['status'] == 'completed', f"Unexpected state: {state}"
+    assert calls == ['Twee.', 'Dree.'], f"Checkpointed sentence was redone: {calls}"
+    assert manager.resume_orphaned() == 0, "Completed jobs are not resumed"
+
+    print("✓ Job resume passed")
+
+
+def test_job_of_reused_pid_is_resumed():
+    """Test that a job is resumed when its worker's pid now belongs to another process."""
+    from synthesis_jobs import SynthesisJobManager
+
+    jobs_dir = tempfile.mkdtemp(prefix='jobs-')
+    manager = SynthesisJobManager(jobs_dir, synthesize_fn=fake_synthesize)
+    job_id = 'b' * 32
+    job_dir = os.path.join(jobs_dir, job_id)
+    os.makedirs(os.path.join(job_dir, 'parts'))
+    with open(os.path.join(job_dir, 'input.json'), 'w') as f:
+        json.dump({'sentences': ['Een.'], 'params': {}}, f)
+    with open(os.path.join(job_dir, 'job.json'), 'w') as f:
+        # The pid is alive, but the process was started after the worker that ran the job
+        json.dump({'job_id': job_id, 'status': 'running', 'pid': os.getppid(), 'pid_started': 1,
+                   'total_sentences': 1, 'completed_sentences': 0}, f)
+
+    assert manager.resume_orphaned() == 1, "Job of a reused pid should be picked up"
+    assert wait_for(manager, job_id)['status'] == 'completed'
+
+    print("✓ Reused pid resume passed")
+
+
+if __name__ == '__main__':
+    test_job_assembles_sentences_into_wav()
+    test_interrupted_job_resumes_from_checkpoint()
+    test_job_of_reused_pid_is_resumed()
@@ -0,0 +1,618 @@
+"""
+Test suite for the synthesis endpoints.
+Uses a lightweight stand-in for the Coqui model so the request handling
+can be verified without torch or a trained checkpoint.
+"""
+
+import sys
+import os
+import math
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeModel:
+    """Minimal stand-in for TTS.api.TTS returning a sine wave per character."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def tts(self, text, length_scale=1.0, noise_scale=0.667, noise_scale_w=0.8, **kwargs):
+        self.calls += 1
+        samples = int(len(text) * 220 * length_scale)
+        return [0.5 * math.sin(i / 10.0) for i in range(samples)]
+
+
+def make_client_with_model():
+    """Create a test client with the fake model installed as active model."""
+    import application
+
+    application.Config.MODEL_BASE_PATH = tempfile.mkdtemp(prefix='tts-test-')
+    app = application.create_app()
+    model = FakeModel()
+    application.tts_model = model
+    application.model_info = {
+        'loaded': True,
+        'name': 'fake',
+        'loaded_at': None,
+        'error': None,
+        'fingerprint': 'fake-fingerprint'
+    }
+    return app.test_client(), model
+
+
+def reset_model():
+    """Remove the fake model again."""
+    import application
+
+    application.tts_model = None
+    application.model_info = {'loaded': False, 'name': None, 'loaded_at': None, 'error': None}
+
+
+def test_tts_returns_wav():
+    """Test that /api/tts returns a WAV file."""
+    client, model = make_client_with_model()
+    try:
+        response = client.post('/api/tts', json={'text': 'Moin, wo geiht di dat?'})
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+        assert response.data[:4] == b'RIFF', "Response should be a WAV file"
+        assert model.calls == 1, "Model should be called once"
+
+        print("✓ TTS returns WAV")
+    finally:
+        reset_model()
+
+
+def test_tts_repeats_are_cached():
+    """Test that repeated requests are served from the audio cache."""
+    client, model = make_client_with_model()
+    try:
+        payload = {'text': 'Moin moin.', 'length_scale': 1.0}
+        first = client.post('/api/tts', json=payload)
+        second = client.post('/api/tts', json={'text': '  Moin  moin .', 'length_scale': 1.0})
+
+        assert first.headers.get('X-Cache') == 'MISS', "First request should miss"
+        assert second.headers.get('X-Cache') == 'HIT', "Normalized repeat should hit"
+        assert first.data == second.data, "Cached audio should be identical"
+        assert model.calls == 1, "Model should only run once"
+
+        third = client.post('/api/tts', json={'text': 'Moin moin.', 'length_scale': 1.5})
+        assert third.headers.get('X-Cache') == 'MISS', "Different parameters should miss"
+
+        print("✓ TTS cache passed")
+    finally:
+        reset_model()
+
+
+def test_tts_disk_cache_survives_worker_restart():
+    """Test that audio is served from disk after the in-memory cache is gone."""
+    client, model = make_client_with_model()
+    try:
+        first = client.post('/api/tts', json={'text': 'Dat Wedder is good.'})
+        assert first.headers.get('X-Cache') == 'MISS', "First request should miss"
+
+        # Simulate a restarted worker: fresh in-memory cache, same disk store
+        from audio_cache import get_audio_cache
+        get_audio_cache().clear()
+
+        second = client.post('/api/tts', json={'text': 'Dat Wedder is good.'})
+        assert second.headers.get('X-Cache') == 'HIT-DISK', "Repeat should hit the disk cache"
+        assert first.data == second.data, "Disk cached audio should be identical"
+        assert model.calls == 1, "Model should only run once"
+
+        print("✓ TTS disk cache passed")
+    finally:
+        reset_model()
+
+
+def test_tts_stream_sends_sentences_incrementally():
+    """Test that /api/tts/stream yields a header and one PCM chunk per sentence."""
+    client, model = make_client_with_model()
+    try:
+        response = client.post('/api/tts/stream', json={'text': 'Moin! Wo geiht di dat? Mi geiht dat good.'})
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+        assert response.headers.get('X-Sentence-Count') == '3', "Text should be split into 3 sentences"
+
+        chunks = list(response.response)
+        assert chunks[0][:4] == b'RIFF' and len(chunks[0]) == 44, "First chunk should be a WAV header"
+        assert len(chunks) == 4, f"Expected header + 3 PCM chunks, got {len(chunks)}"
+        assert model.calls == 3, "Each sentence should be synthesized separately"
+
+        print("✓ TTS stream passed")
+    finally:
+        reset_model()
+
+
+def test_tts_with_batch_inference():
+    """Test that /api/tts works through the micro-batching scheduler."""
+    import application
+
+    client, model = make_client_with_model()
+    application.Config.BATCH_INFERENCE = True
+    completed = application.get_inference_pool().get_stats()['completed']
+    try:
+        response = client.post('/api/tts', json={'text': 'Moin! Wo geiht di dat?'})
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+        assert response.data[:4] == b'RIFF', "Response should be a WAV file"
+        assert model.calls == 2, "Each sentence should be synthesized"
+
+        stats = client.get('/api/status').get_json()['batching']
+        assert stats['enabled'] and stats['items'] == 2, f"Scheduler should have run: {stats}"
+        assert application.get_inference_pool().get_stats()['completed'] == completed + 1, \
+            "Batched requests should go through the fair queue"
+
+        print("✓ TTS batch inference passed")
+    finally:
+        application.Config.BATCH_INFERENCE = False
+        reset_model()
+
+
+def test_tts_batch_returns_zip_with_per_item_errors():
+    """Test that /api/tts/batch returns a ZIP and reports per-item failures."""
+    import io
+    import json
+    import zipfile
+
+    client, model = make_client_with_model()
+    try:
+        response = client.post('/api/tts/batch', json={'items': [
+            {'id': 'eins', 'text': 'Moin!'},
+            {'id': 'twee', 'text': 'Wo geiht di dat?', 'params': {'length_scale': 5}},
+            {'id': 'dree', 'text': ''},
+            {'id': 'eins', 'text': 'Duplicate.'}
+        ]})
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+        assert response.headers.get('X-Batch-Failed') == '2', "Two items should fail"
+
+        archive = zipfile.ZipFile(io.BytesIO(response.data))
+        assert sorted(archive.namelist()) == ['eins.wav', 'manifest.json', 'twee.wav'], archive.namelist()
+        assert archive.read('eins.wav')[:4] == b'RIFF', "Items should be WAV files"
+
+        manifest = {e['id']: e for e in json.loads(archive.read('manifest.json'))['items'][:3]}
+        assert manifest['dree']['status'] == 'error', "Empty text should fail"
+        assert manifest['twee']['status'] == 'ok', "Out of range params should be clamped"
+
+        print("✓ TTS batch passed")
+    finally:
+        reset_model()
+
+
+def test_tts_batch_isolates_bad_params_and_keeps_ids():
+    """Test that malformed params fail only their item and client ids survive sanitizing."""
+    import io
+    import json
+    import zipfile
+
+    client, model = make_client_with_model()
+    try:
+        response = client.post('/api/tts/batch', json={'items': [
+            {'id': 'a/b', 'text': 'Moin!'},
+            {'id': 'a_b', 'text': 'Wo geiht di dat?'},
+            {'id': 'fast', 'text': 'Moin!', 'params': 'fast'}
+        ]})
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+        assert response.headers.get('X-Batch-Failed') == '1', "Only the item with bad params should fail"
+
+        archive = zipfile.ZipFile(io.BytesIO(response.data))
+        manifest = {e['id']: e for e in json.loads(archive.read('manifest.json'))['items']}
+        assert manifest['a/b']['status'] == 'ok' and manifest['a_b']['status'] == 'ok', manifest
+        assert manifest['a/b']['file'] != manifest['a_b']['file'], "Items need their own files"
+        assert manifest['fast']['error'].startswith('Invalid params'), manifest['fast']
+        assert sorted(archive.namelist()) == sorted([manifest['a/b']['file'], manifest['a_b']['file'],
+                                                     'manifest.json'])
+
+        print("✓ TTS batch item isolation passed")
+    finally:
+        reset_model()
+
+
+def test_tts_batch_rejects_invalid_payload():
+    """Test that a batch without items is rejected."""
+    client, model = make_client_with_model()
+    try:
+        response = client.post('/api/tts/batch', json={'items': []})
+        assert response.status_code == 400, f"Expected 400, got {response.status_code}"
+
+        print("✓ TTS batch validation passed")
+    finally:
+        reset_model()
+
+
+def test_activation_hot_swaps_in_background():
+    """Test that activation returns a job and swaps the model once it is warmed up."""
+    import time
+    import application
+
+    client, old_model = make_client_with_model()
+    new_model = FakeModel()
+    paths = application.get_model_paths()
+    (paths['inactive'] / 'platt-v2').mkdir(parents=True)
+
+    original_build = application.build_model
+    application.build_model = lambda model_path, config_path, variant='float': (
+        new_model, {'loaded': True, 'name': 'platt-v2', 'variant': variant, 'loaded_at': None,
+                    'error': None, 'fingerprint': 'new-fingerprint'})
+    try:
+        # A request still running on the old model delays its release
+        lease = application.acquire_model_lease()
+        response = client.post('/api/admin/models/activate', json={'name': 'platt-v2', 'quantized': True})
+        assert response.status_code == 202, f"Expected 202, got {response.status_code}"
+        status_url = response.get_json()['status_url']
+
+        for _ in range(100):
+            if application.tts_model is new_model:
+                break
+            time.sleep(0.01)
+        assert application.tts_model is new_model, "New model should serve after the swap"
+        assert new_model.calls == 1, "New model should be warmed up before the swap"
+        # The pointer and metadata are written after the swap, then the job starts draining
+        deadline = time.monotonic() + 5
+        while client.get(status_url).get_json()['status'] != 'draining' and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert client.get(status_url).get_json()['status'] == 'draining', \
+            "Old model should be kept until its request finished"
+
+        application.release_model_lease(lease)
+        application.get_activation_jobs().running_job().done.wait(5)
+        job = client.get(status_url).get_json()
+        assert job['status'] == 'completed', f"Unexpected job state: {job}"
+        assert application.read_active_pointer(paths['active']) == 'platt-v2', "Pointer should move"
+        assert client.get('/api/status').get_json()['quantization']['active_variant'] == 'int8', \
+            "Status should report the quantized variant"
+
+        print("✓ Hot swap activation passed")
+    finally:
+        application.build_model = original_build
+        reset_model()
+
+
+def test_failed_activation_keeps_previous_model():
+    """Test that a model that fails to load never replaces the serving model."""
+    import application
+
+    client, old_model = make_client_with_model()
+    paths = application.get_model_paths()
+    (paths['inactive'] / 'broken').mkdir(parents=True)
+    try:
+        response = client.post('/api/admin/models/activate', json={'name': 'broken', 'wait': True})
+        assert response.status_code == 500, f"Expected 500, got {response.status_code}"
+        assert response.get_json()['job']['status'] == 'failed', "Job should be marked failed"
+        assert application.tts_model is old_model, "Previous model should keep serving"
+        assert client.get('/api/admin/models/activate/unknown').status_code == 404
+
+        print("✓ Failed activation passed")
+    finally:
+        reset_model()
+
+
+def test_tts_job_for_long_text():
+    """Test that text beyond the /api/tts cap is synthesized as a background job."""
+    import time
+
+    client, model = make_client_with_model()
+    try:
+        text = 'Dat is en langen Satz över dat Wedder an de Küst. ' * 30
+        assert client.post('/api/tts', json={'text': text}).status_code == 400, \
+            "Long text should be rejected by /api/tts"
+
+        response = client.post('/api/tts/jobs', json={'text': text})
+        assert response.status_code == 202, f"Expected 202, got {response.status_code}"
+        job = response.get_json()
+
+        for _ in range(200):
+            status = client.get(job['status_url']).get_json()
+            if status['status'] == 'completed':
+                break
+            time.sleep(0.01)
+        assert status['status'] == 'completed', f"Job did not complete: {status}"
+        assert model.calls == job['total_sentences'] == 30, "One synthesis per sentence"
+
+        audio = client.get(job['audio_url'])
+        assert audio.status_code == 200 and audio.data[:4] == b'RIFF', "Audio should be a WAV file"
+        assert client.get('/api/tts/jobs/' + 'f' * 32).status_code == 404
+
+        print("✓ TTS job passed")
+    finally:
+        reset_model()
+
+
+def test_tts_encodes_requested_format():
+    """Test format negotiation and server-side MP3/Opus encoding."""
+    from mp3_handler import encoder_available
+
+    client, model = make_client_with_model()
+    try:
+        response = client.post('/api/tts', json={'text': 'Moin.', 'format': 'aiff'})
+        assert response.status_code == 406, f"Expected 406, got {response.status_code}"
+
+        if not encoder_available():
+            print("- Encoder not installed, skipping MP3/Opus checks")
+            return
+
+        wav = client.post('/api/tts', json={'text': 'Moin, wo geiht di dat?'})
+        mp3 = client.post('/api/tts', json={'text': 'Moin, wo geiht di dat?'},
+                          headers={'Accept': 'audio/mpeg'})
+        assert mp3.status_code == 200 and mp3.mimetype == 'audio/mpeg', "Accept should select MP3"
+        assert mp3.headers['X-Cache'] == 'TRANSCODED', "Cached WAV should be transcoded, not resynthesized"
+        assert len(mp3.data) < len(wav.data) / 3, "MP3 should be much smaller than WAV"
+        assert model.calls == 1, "Model should only run for the WAV request"
+
+        stream = client.post('/api/tts/stream?format=opus', json={'text': 'Moin. Wo geiht di dat?'})
+        assert stream.mimetype == 'audio/ogg' and stream.data[:4] == b'OggS', "Stream should be Ogg/Opus"
+
+        print("✓ TTS format encoding passed")
+    finally:
+        reset_model()
+
+
+def test_metrics_report_synthesis_stages():
+    """Test that /metrics exposes per-stage histograms after a synthesis."""
+    from metrics import metrics_available
+
+    client, model = make_client_with_model()
+    try:
+        if not metrics_available():
+            assert client.get('/metrics').status_code == 503, "Metrics need prometheus_client"
+            print("- prometheus_client not installed, skipping metrics checks")
+            return
+
+        client.post('/api/tts', json={'text': 'Moin, wo geiht di dat? Goot.'})
+        response = client.get('/metrics')
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+        body = response.get_data(as_text=True)
+        for stage in ('normalize', 'phonemize', 'inference', 'peak_normalize', 'int16', 'encode'):
+            assert f'tts_stage_duration_seconds_count{{stage="{stage}"}}' in body, f"Missing stage {stage}"
+        assert 'tts_input_characters_bucket' in body, "Input lengths should be recorded"
+        assert 'tts_output_audio_seconds_bucket' in body, "Audio durations should be recorded"
+        assert 'tts_http_requests_total{endpoint="text_to_speech",method="POST",status="200"}' in body
+        assert 'tts_http_requests_in_flight' in body, "In-flight gauge should be exposed"
+
+        print("✓ Metrics passed")
+    finally:
+        reset_model()
+
+
+def test_tts_reports_server_timing_and_trace():
+    """Test the Server-Timing header and the opt-in debug trace."""
+    import json
+
+    client, model = make_client_with_model()
+    try:
+        plain = client.post('/api/tts', json={'text': 'Moin, wo geiht di dat?'})
+        timing = plain.headers.get('Server-Timing', '')
+        for stage in ('normalize', 'phonemize', 'inference', 'peak_normalize', 'int16', 'encode', 'total'):
+            assert f'{stage};dur=' in timing, f"Missing {stage} in Server-Timing: {timing}"
+        assert 'cache;dur=' in timing and 'desc="MISS"' in timing, "Cache outcome should be reported"
+        assert 'X-TTS-Trace' not in plain.headers, "Trace is opt-in"
+
+        traced = client.post('/api/tts?debug=1', json={'text': 'Dat Wedder is good.'})
+        trace = json.loads(traced.headers['X-TTS-Trace'])
+        assert trace['samples'] > 0 and trace['audio_seconds'] > 0, f"Unexpected trace: {trace}"
+        assert trace['rtf'] is not None and trace['queue_wait_ms'] >= 0, f"Unexpected trace: {trace}"
+        assert set(trace['stages_ms']) >= {'normalize', 'inference', 'encode'}, "Stages should be included"
+
+        hit = client.post('/api/tts', json={'text': 'Dat Wedder is good.', 'debug': True})
+        assert json.loads(hit.headers['X-TTS-Trace'])['cache'] == 'HIT', "Cache hits should be traced too"
+        assert 'inference;dur=' not in hit.headers['Server-Timing'], "Cache hits run no inference"
+
+        print("✓ Server-Timing and trace passed")
+    finally:
+        reset_model()
+
+
+def test_health_answers_while_inference_busy():
+    """Test that health and status do not queue behind synthesis, and excess synthesis gets 503."""
+    import threading
+    import time
+    import application
+    from inference_pool import init_inference_pool
+
+    client, model = make_client_with_model()
+    init_inference_pool(max_workers=1, max_pending=1)
+    release = threading.Event()
+    original_tts = model.tts
+
+    def blocking_tts(*args, **kwargs):
+        release.wait(10)
+        return original_tts(*args, **kwargs)
+
+    model.tts = blocking_tts
+    try:
+        results = []
+        worker = threading.Thread(target=lambda: results.append(
+            client.post('/api/tts', json={'text': 'Dat duert en Stoot.'})))
+        worker.start()
+        deadline = time.monotonic() + 5
+        while application.get_inference_pool().get_stats()['running'] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        started = time.monotonic()
+        health = client.get('/api/health')
+        assert health.status_code == 200, f"Expected 200, got {health.status_code}"
+        status = client.get('/api/status').get_json()
+        assert time.monotonic() - started < 1.0, "Health and status should not wait for inference"
+        assert status['inference_pool']['running'] == 1, f"Unexpected pool stats: {status['inference_pool']}"
+
+        busy = client.post('/api/tts', json={'text': 'Noch een.'})
+        assert busy.status_code == 503, f"Expected 503, got {busy.status_code}"
+        assert busy.headers.get('Retry-After'), "Busy responses should carry Retry-After"
+
+        release.set()
+        worker.join(10)
+        assert results and results[0].status_code == 200, "Admitted request should finish"
+        assert client.post('/api/tts', json={'text': 'Noch een.'}).status_code == 200, "Slot should be free again"
+
+        print("✓ Health during inference passed")
+    finally:
+        release.set()
+        init_inference_pool(application.Config.INFERENCE_WORKERS, application.Config.INFERENCE_MAX_PENDING,
+                            bulk_share=application.Config.INFERENCE_BULK_SHARE)
+        reset_model()
+
+
+def test_tts_sheds_load_beyond_slo():
+    """Test that /api/tts answers 429 while queued work exceeds the SLO, but still serves cache hits."""
+    import application
+    from admission import init_admission, get_admission
+
+    client, model = make_client_with_model()
+    init_admission(slo_seconds=5, capacity=1,
+                   state_path=os.path.join(tempfile.mkdtemp(prefix='tts-admission-'), 'state'))
+    try:
+        assert client.post('/api/tts', json={'text': 'Moin.'}).status_code == 200
+
+        backlog = get_admission().admit(30.0, force=True)
+        shed = client.post('/api/tts', json={'text': 'Wo geiht di dat?'})
+        assert shed.status_code == 429, f"Expected 429, got {shed.status_code}"
+        assert int(shed.headers['Retry-After']) == 25, f"Unexpected Retry-After: {shed.headers['Retry-After']}"
+        assert shed.get_json()['code'] == 'OVERLOADED'
+        assert client.post('/api/tts', json={'text': 'Moin.'}).status_code == 200, "Cache hits need no inference"
+
+        status = client.get('/api/status').get_json()['admission']
+        assert status['queue_depth'] == 1 and status['estimated_wait_seconds'] == 30.0, f"Unexpected status: {status}"
+
+        get_admission().finish(backlog)
+        assert client.post('/api/tts', json={'text': 'Wo geiht di dat?'}).status_code == 200
+
+        print("✓ Load shedding passed")
+    finally:
+        init_admission(application.Config.ADMISSION_SLO_SECONDS, application.admission_capacity(),
+                       state_path=str(application.get_model_paths()['admission']))
+        reset_model()
+
+
+def test_tts_identifies_api_clients():
+    """Test that API keys select the client, unknown keys are rejected and usage is listed per client."""
+    import application
+    from clients import init_clients
+
+    client, model = make_client_with_model()
+    init_clients('reader:reader-key:4,archive:archive-key:1:bulk')
+    try:
+        assert client.post('/api/tts', json={'text': 'Moin.'}).status_code == 200
+        response = client.post('/api/tts', json={'text': 'Wo geiht di dat?'},
+                               headers={'X-API-Key': 'reader-key'})
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+
+        rejected = client.post('/api/tts', json={'text': 'Goden Dag.'}, headers={'X-API-Key': 'wrong'})
+        assert rejected.status_code == 401 and rejected.get_json()['code'] == 'UNKNOWN_API_KEY'
+        assert client.post('/api/tts/jobs?api_key=wrong', json={'text': 'Goden Dag.'}).status_code == 401
+
+        usage = {entry['name']: entry for entry in client.get('/api/admin/clients').get_json()['clients']}
+        assert set(usage) == {'public', 'reader', 'archive'}, f"Unexpected clients: {list(usage)}"
+        assert usage['reader']['weight'] == 4.0 and usage['reader']['requests'] == 1
+        assert usage['archive']['class'] == 'bulk' and 'requests' not in usage['archive']
+        assert 'key' not in usage['reader'], "API keys must not be listed"
+
+        print("✓ API client identification passed")
+    finally:
+        init_clients(application.Config.API_CLIENTS, application.Config.PUBLIC_CLIENT_WEIGHT)
+        reset_model()
+
+
+def test_tts_estimate_predicts_from_observed_timings():
+    """Test that /api/tts/estimate predicts without synthesizing and follows observed timings."""
+    import application
+    from cost_model import get_cost_model
+
+    client, model = make_client_with_model()
+    try:
+        first = client.post('/api/tts/estimate', json={'text': 'Moin, wo geiht di dat?'})
+        assert first.status_code == 200, f"Expected 200, got {first.status_code}"
+        estimate = first.get_json()
+        assert model.calls == 0, "Estimating must not synthesize"
+        assert estimate['characters'] == 22 and estimate['phonemes_estimated'], f"Unexpected: {estimate}"
+        assert abs(estimate['estimated_seconds'] - 22 * application.Config.ADMISSION_SECONDS_PER_CHAR) < 1e-3
+
+        for _ in range(50):
+            get_cost_model().observe('fake-fingerprint', 22, 30, 1.0, 1.5)
+        slower = client.post('/api/tts/estimate', json={'text': 'Moin, wo geiht di dat?'}).get_json()
+        assert abs(slower['estimated_seconds'] - 1.5) < 0.1, f"Unexpected estimate: {slower}"
+        assert slower['cost_model']['observations'] == 50
+
+        longer = client.post('/api/tts/estimate', json={'text': 'Moin, wo geiht di dat?', 'length_scale': 1.5})
+        assert longer.get_json()['estimated_seconds'] > slower['estimated_seconds'], "Slower speech costs more"
+        assert client.post('/api/tts/estimate', json={}).status_code == 400
+
+        print("✓ TTS estimate passed")
+    finally:
+        reset_model()
+
+
+def test_upload_refuses_to_replace_active_model():
+    """Test that an upload under the active model's name leaves the serving files alone."""
+    import io
+    import application
+
+    client, _ = make_client_with_model()
+    paths = application.get_model_paths()
+    live_dir = paths['inactive'] / 'platt-live'
+    live_dir.mkdir(parents=True)
+    (live_dir / 'best_model.pth').write_bytes(b'serving weights')
+    application.write_active_pointer(paths['active'], 'platt-live')
+    try:
+        response = client.post('/api/admin/models/upload',
+                               data={'name': 'platt-live', 'model': (io.BytesIO(b'broken'), 'model.zip')},
+                               content_type='multipart/form-data')
+        assert response.status_code == 409, f"Expected 409, got {response.status_code}"
+        assert (live_dir / 'best_model.pth').read_bytes() == b'serving weights', "Active model must stay intact"
+
+        print("✓ Upload over active model refused")
+    finally:
+        reset_model()
+
+
+def test_activation_during_worker_load_is_followed():
+    """Test that an activation published while a worker loads its model is applied afterwards."""
+    import application
+    from model_sync import ModelSync
+
+    client, model = make_client_with_model()
+    application.tts_model = None
+    sync = application.get_model_sync()
+    sync.interval = 0  # Checked by hand below
+    original_load, original_reload = application.try_load_active_model, sync.reload_fn
+    applied = []
+
+    def slow_load():
+        # Another worker activates a model while this one is still loading
+        ModelSync(application.get_model_paths()['base'], interval=0).publish('platt-v2')
+        application.tts_model = model
+        return True
+
+    application.try_load_active_model = slow_load
+    sync.reload_fn = applied.append
+    try:
+        application.follow_active_model()
+        assert sync.generation == 0, f"Load started before generation 1, adopted {sync.generation}"
+        assert sync.check() and applied[-1]['active_model'] == 'platt-v2', "Activation should be applied"
+
+        print("✓ Activation during load passed")
+    finally:
+        application.try_load_active_model, sync.reload_fn = original_load, original_reload
+        reset_model()
+
+
+if __name__ == '__main__':
+    test_tts_returns_wav()
+    test_tts_repeats_are_cached()
+    test_tts_disk_cache_survives_worker_restart()
+    test_tts_stream_sends_sentences_incrementally()
+    test_tts_with_batch_inference()
+    test_tts_batch_returns_zip_with_per_item_errors()
+    test_tts_batch_isolates_bad_params_and_keeps_ids()
+    test_tts_batch_rejects_invalid_payload()
+    test_activation_hot_swaps_in_background()
+    test_failed_activation_keeps_previous_model()
+    test_upload_refuses_to_replace_active_model()
+    test_activation_during_worker_load_is_followed()
+    test_tts_job_for_long_text()
+    test_tts_encodes_requested_format()
+    test_metrics_report_synthesis_stages()
+    test_tts_reports_server_timing_and_trace()
+    test_health_answers_while_inference_busy()
+    test_tts_sheds_load_beyond_slo()
+    test_tts_identifies_api_clients()
+    test_tts_estimate_predicts_from_observed_timings()
@@ -0,0 +1,101 @@
+"""
+VITS Inference Helpers
+Direct access to the VITS model inside the Coqui TTS.api wrapper so that
+several texts can be synthesized in one padded forward pass.
+Falls back to one tts() call per text for models that do not expose the
+Coqui internals.
+"""
+
+import logging
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Model attributes are set per batch, so forward passes must not interleave
+_inference_lock = threading.Lock()
+
+
+def get_vits(tts_model):
+    """Return the underlying Coqui Vits module of a TTS.api.TTS object (or None)."""
+    synthesizer = getattr(tts_model, 'synthesizer', None)
+    vits = getattr(synthesizer, 'tts_model', None)
+    if vits is None or not hasattr(vits, 'inference') or getattr(vits, 'tokenizer', None) is None:
+        return None
+    return vits
+
+
+def get_hop_length(vits) -> int:
+    """Number of output samples per spectrogram frame."""
+    try:
+        return int(vits.config.audio.hop_length)
+    except AttributeError:
+        return 256
+
+
+def text_to_ids(tts_model, text: str) -> Optional[List[int]]:
+    """Run the model's phonemizer/tokenizer front end. Returns None if unavailable."""
+    vits = get_vits(tts_model)
+    if vits is None:
+        return None
+    return vits.tokenizer.text_to_ids(text)
+
+
+def infer_batch(tts_model, texts: List[str], length_scale: float = 1.0,
+                noise_scale: float = 0.667, noise_scale_w: float = 0.8,
+                token_ids: Optional[List[List[int]]] = None) -> List[np.ndarray]:
+    """
+    Synthesize several texts with one padded VITS forward pass.
+
+    Args:
+        tts_model: Loaded TTS.api.TTS instance
+        texts: Normalized input texts
+        length_scale: Duration multiplier (higher = slower speech)
+        noise_scale: Noise applied to the prior
+        noise_scale_w: Noise applied to the stochastic duration predictor
+        token_ids: Pre-computed token ids per text (skips the front end)
+
+    Returns:
+        List of float32 waveforms, one per input text, trimmed to their length
+    """
+    vits = get_vits(tts_model)
+    if vits is None:
+        # Not a Coqui VITS model - run one call per text
+        return [
+            np.asarray(tts_model.tts(text=text, length_scale=length_scale,
+                                     noise_scale=noise_scale, noise_scale_w=noise_scale_w),
+                       dtype=np.float32)
+            for text in texts
+        ]
+
+    import torch
+
+    if token_ids is None:
+        token_ids = [vits.tokenizer.text_to_ids(text) for text in texts]
+
+    lengths = [len(ids) for ids in token_ids]
+    x = torch.zeros((len(token_ids), max(lengths)), dtype=torch.long)
+    for i, ids in enumerate(token_ids):
+        x[i, :len(ids)] = torch.tensor(ids, dtype=torch.long)
+    x_lengths = torch.tensor(lengths, dtype=torch.long)
+
+    device = next(vits.parameters()).device
+    hop_length = get_hop_length(vits)
+
+    with _inference_lock:
+        previous = (vits.length_scale, vits.inference_noise_scale, vits.inference_noise_scale_dp)
+        vits.length_scale = length_scale
+        vits.inference_noise_scale = noise_scale
+        vits.inference_noise_scale_dp = noise_scale_w
+        try:
+            with torch.no_grad():
+                outputs = vits.inference(x.to(device), aux_input={'x_lengths': x_lengths.to(device)})
+        finally:
+            vits.length_scale, vits.inference_noise_scale, vits.inference_noise_scale_dp = previous
+
+    audio = outputs['model_outputs'].squeeze(1).cpu().float().numpy()
+    frames = outputs['y_mask'].sum(dim=(1, 2)).long().cpu().numpy()
+
+    return [audio[i, :int(frames[i]) * hop_length] for i in range(len(token_ids))]